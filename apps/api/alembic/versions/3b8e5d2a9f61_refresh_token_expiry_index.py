@@ -0,0 +1,23 @@
+"""index refresh_tokens.expires_at for the reaper
+
+Revision ID: 3b8e5d2a9f61
+Revises: e7a3f1c9d402
+Create Date: 2026-10-18 15:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3b8e5d2a9f61'
+down_revision: Union[str, None] = 'e7a3f1c9d402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
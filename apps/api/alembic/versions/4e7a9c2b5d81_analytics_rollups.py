@@ -0,0 +1,50 @@
+"""habit and user completion rollups
+
+Revision ID: 4e7a9c2b5d81
+Revises: d6b2e8a4c3f7
+Create Date: 2026-10-18 20:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '4e7a9c2b5d81'
+down_revision: Union[str, None] = 'd6b2e8a4c3f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('checks', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def _counts() -> list:
+    return [
+        sa.Column('period', sa.String(length=5), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        *(sa.Column(name, sa.Integer(), nullable=False) for name in COUNTERS),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table('habit_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('non_negotiable_id', sa.Integer(), nullable=False),
+        *_counts(),
+        sa.ForeignKeyConstraint(['non_negotiable_id'], ['non_negotiables.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('non_negotiable_id', 'period', 'period_start')
+    )
+    op.create_table('user_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        *_counts(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'period', 'period_start')
+    )
+    # Rollups are populated by `python -m app.scripts.rebuild_rollups`.
+
+
+def downgrade() -> None:
+    op.drop_table('user_rollups')
+    op.drop_table('habit_rollups')
@@ -0,0 +1,23 @@
+"""user token version
+
+Revision ID: 5c1e2f9a7d10
+Revises: 37a4a7b8943e
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5c1e2f9a7d10'
+down_revision: Union[str, None] = '37a4a7b8943e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,33 @@
+"""calendar cache
+
+Revision ID: 8d3b6a41c2e5
+Revises: 5c1e2f9a7d10
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8d3b6a41c2e5'
+down_revision: Union[str, None] = '5c1e2f9a7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('calendar_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('total_habits', sa.Integer(), nullable=False),
+    sa.Column('completed_habits', sa.Integer(), nullable=False),
+    sa.Column('completion_pct', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('calendar_cache')
@@ -0,0 +1,72 @@
+"""partnerships, digest outbox and run checkpoints
+
+Revision ID: 9f4c1b7e2d38
+Revises: 3b8e5d2a9f61
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9f4c1b7e2d38'
+down_revision: Union[str, None] = '3b8e5d2a9f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('partnerships',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('inviter_id', sa.Integer(), nullable=False),
+        sa.Column('partner_id', sa.Integer(), nullable=True),
+        sa.Column('partner_email', sa.String(length=255), nullable=False),
+        sa.Column('share_frequency', sa.String(length=10), nullable=False),
+        sa.Column('share_level', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('last_digest_end', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['inviter_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['partner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_partnerships_inviter_id'), 'partnerships', ['inviter_id'], unique=False)
+    op.create_index('ix_partnerships_status_frequency_id', 'partnerships', ['status', 'share_frequency', 'id'], unique=False)
+    op.create_table('digest_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('partnership_id', sa.Integer(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('recipient', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['partnership_id'], ['partnerships.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('partnership_id', 'period_end')
+    )
+    op.create_index('ix_digest_outbox_status_id', 'digest_outbox', ['status', 'id'], unique=False)
+    op.create_table('digest_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('frequency', sa.String(length=10), nullable=False),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('last_partnership_id', sa.Integer(), nullable=False),
+        sa.Column('queued', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('frequency', 'period_end')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('digest_runs')
+    op.drop_index('ix_digest_outbox_status_id', table_name='digest_outbox')
+    op.drop_table('digest_outbox')
+    op.drop_index('ix_partnerships_status_frequency_id', table_name='partnerships')
+    op.drop_index(op.f('ix_partnerships_inviter_id'), table_name='partnerships')
+    op.drop_table('partnerships')
@@ -0,0 +1,93 @@
+"""streak runs and grace days
+
+Revision ID: a41f0c7e9b23
+Revises: 8d3b6a41c2e5
+Create Date: 2026-10-18 11:00:00.000000
+"""
+from datetime import timedelta
+from itertools import groupby
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a41f0c7e9b23'
+down_revision: Union[str, None] = '8d3b6a41c2e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 10000
+
+
+def _runs(days: list) -> list[tuple]:
+    # Same runs as app.services.streaks.build_runs with no grace days (the default
+    # for every habit here), inlined so the migration stays frozen.
+    runs: list[list] = []
+    for day in days:
+        if runs and day - runs[-1][1] <= timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [(start, end, (end - start).days + 1) for start, end in runs]
+
+
+def _backfill_runs() -> None:
+    """Build every habit's run index from its completed checks and refresh its streak summary.
+
+    Without it, the first check on an existing habit would recompute the
+    summary from an empty index and reset a live streak.
+    """
+    conn = op.get_bind()
+    checks = sa.table('daily_checks', sa.column('non_negotiable_id', sa.Integer), sa.column('check_date', sa.Date),
+                      sa.column('is_completed', sa.Boolean))
+    runs_t = sa.table('streak_runs', sa.column('non_negotiable_id', sa.Integer), sa.column('start_date', sa.Date),
+                      sa.column('end_date', sa.Date), sa.column('length', sa.Integer))
+    streaks = sa.table('streaks', sa.column('non_negotiable_id', sa.Integer), sa.column('current_streak', sa.Integer),
+                       sa.column('longest_streak', sa.Integer), sa.column('last_check_date', sa.Date))
+    rows = conn.execute(
+        sa.select(checks.c.non_negotiable_id, checks.c.check_date)
+        .where(checks.c.is_completed.is_(True))
+        .distinct()
+        .order_by(checks.c.non_negotiable_id, checks.c.check_date)
+    )
+    run_rows, summaries = [], []
+    for nn_id, group in groupby(rows, key=lambda r: r.non_negotiable_id):
+        habit_runs = _runs([r.check_date for r in group])
+        run_rows.extend({'non_negotiable_id': nn_id, 'start_date': a, 'end_date': b, 'length': n} for a, b, n in habit_runs)
+        latest = habit_runs[-1]
+        summaries.append({'nn_id': nn_id, 'current': latest[2], 'longest': max(n for _, _, n in habit_runs), 'last': latest[1]})
+    for start in range(0, len(run_rows), BATCH):
+        conn.execute(runs_t.insert(), run_rows[start:start + BATCH])
+    # Habits without completed checks keep no runs: zero streaks
+    conn.execute(streaks.update().values(current_streak=0, longest_streak=0, last_check_date=None))
+    if summaries:
+        conn.execute(
+            streaks.update().where(streaks.c.non_negotiable_id == sa.bindparam('nn_id')).values(
+                current_streak=sa.bindparam('current'), longest_streak=sa.bindparam('longest'), last_check_date=sa.bindparam('last')
+            ),
+            summaries,
+        )
+
+
+def upgrade() -> None:
+    op.create_table('streak_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('non_negotiable_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['non_negotiable_id'], ['non_negotiables.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('non_negotiable_id', 'start_date')
+    )
+    op.create_index('ix_streak_runs_non_negotiable_id_length', 'streak_runs', ['non_negotiable_id', 'length'], unique=False)
+    op.add_column('streaks', sa.Column('grace_days', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_settings', sa.Column('streak_grace_days', sa.Integer(), server_default='0', nullable=False))
+    _backfill_runs()
+
+
+def downgrade() -> None:
+    op.drop_column('user_settings', 'streak_grace_days')
+    op.drop_column('streaks', 'grace_days')
+    op.drop_index('ix_streak_runs_non_negotiable_id_length', table_name='streak_runs')
+    op.drop_table('streak_runs')
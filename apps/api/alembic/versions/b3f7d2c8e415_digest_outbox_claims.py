@@ -0,0 +1,24 @@
+"""digest_outbox.claimed_at for claim-then-send delivery
+
+Revision ID: b3f7d2c8e415
+Revises: 4e7a9c2b5d81
+Create Date: 2026-10-18 21:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b3f7d2c8e415'
+down_revision: Union[str, None] = '4e7a9c2b5d81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('digest_outbox', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("UPDATE digest_outbox SET status = 'pending' WHERE status = 'sending'")
+    op.drop_column('digest_outbox', 'claimed_at')
@@ -0,0 +1,57 @@
+"""sync change sequences and tombstones
+
+Revision ID: c2d95e0b7f14
+Revises: a41f0c7e9b23
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c2d95e0b7f14'
+down_revision: Union[str, None] = 'a41f0c7e9b23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED = [
+    ('personas', 'user_id'),
+    ('milestones', 'persona_id'),
+    ('principles', 'user_id'),
+    ('schedule_blocks', 'user_id'),
+    ('non_negotiables', 'user_id'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('user_settings', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    for table in ('milestones', 'schedule_blocks', 'non_negotiables'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+    for table, owner in SYNCED:
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        op.create_index(f'ix_{table}_{owner}_change_seq', table, [owner, 'change_seq'], unique=False)
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=30), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_id_change_seq', 'sync_tombstones', ['user_id', 'change_seq'], unique=False)
+    # Existing rows keep change_seq 0; clients without a cursor get a full snapshot.
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_tombstones_user_id_change_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    for table, owner in reversed(SYNCED):
+        op.drop_index(f'ix_{table}_{owner}_change_seq', table_name=table)
+        op.drop_column(table, 'change_seq')
+    for table in ('non_negotiables', 'schedule_blocks', 'milestones'):
+        op.drop_column(table, 'updated_at')
+    op.drop_column('user_settings', 'change_seq')
+    op.drop_column('users', 'change_seq')
@@ -0,0 +1,29 @@
+"""daily check monthly bitmaps
+
+Revision ID: d6b2e8a4c3f7
+Revises: 9f4c1b7e2d38
+Create Date: 2026-10-18 19:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd6b2e8a4c3f7'
+down_revision: Union[str, None] = '9f4c1b7e2d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_check_months',
+        sa.Column('non_negotiable_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('mask', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['non_negotiable_id'], ['non_negotiables.id'], ),
+        sa.PrimaryKeyConstraint('non_negotiable_id', 'month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_check_months')
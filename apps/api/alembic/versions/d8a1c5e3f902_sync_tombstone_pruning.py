@@ -0,0 +1,25 @@
+"""users.tombstones_pruned_seq for sync tombstone retention
+
+Revision ID: d8a1c5e3f902
+Revises: b3f7d2c8e415
+Create Date: 2026-10-18 22:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd8a1c5e3f902'
+down_revision: Union[str, None] = 'b3f7d2c8e415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('tombstones_pruned_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index('ix_sync_tombstones_deleted_at', 'sync_tombstones', ['deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_tombstones_deleted_at', table_name='sync_tombstones')
+    op.drop_column('users', 'tombstones_pruned_seq')
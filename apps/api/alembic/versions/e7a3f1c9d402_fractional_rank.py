@@ -0,0 +1,73 @@
+"""fractional rank keys replace integer order
+
+Revision ID: e7a3f1c9d402
+Revises: c2d95e0b7f14
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from itertools import groupby
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e7a3f1c9d402'
+down_revision: Union[str, None] = 'c2d95e0b7f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('personas', 'principles', 'schedule_blocks', 'non_negotiables')
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def _spread_keys(count: int) -> list[str]:
+    # Same keys as app.services.ordering.spread_keys, inlined so the migration stays frozen.
+    width = 1
+    while len(DIGITS) ** width <= count:
+        width += 1
+    keys = []
+    for i in range(1, count + 1):
+        value = i * len(DIGITS) ** width // (count + 1)
+        digits = ''
+        for _ in range(width):
+            value, digit = divmod(value, len(DIGITS))
+            digits = DIGITS[digit] + digits
+        keys.append(digits.rstrip('0'))
+    return keys
+
+
+def _rank_type():
+    return sa.String(length=64, collation='C') if op.get_bind().dialect.name == 'postgresql' else sa.String(length=64)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table in TABLES:
+        op.add_column(table, sa.Column('rank', _rank_type(), nullable=True))
+        t = sa.table(table, sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('order', sa.Integer), sa.column('rank', sa.String))
+        rows = conn.execute(sa.select(t.c.id, t.c.user_id).order_by(t.c.user_id, t.c.order, t.c.id)).all()
+        updates = []
+        for _, group in groupby(rows, key=lambda r: r.user_id):
+            ids = [r.id for r in group]
+            updates.extend({'row_id': row_id, 'rank': key} for row_id, key in zip(ids, _spread_keys(len(ids))))
+        if updates:
+            conn.execute(t.update().where(t.c.id == sa.bindparam('row_id')).values(rank=sa.bindparam('rank')), updates)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('rank', existing_type=_rank_type(), nullable=False)
+            batch_op.drop_column('order')
+        op.create_index(f'ix_{table}_user_id_rank', table, ['user_id', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for table in reversed(TABLES):
+        op.add_column(table, sa.Column('order', sa.Integer(), server_default='0', nullable=False))
+        t = sa.table(table, sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('order', sa.Integer), sa.column('rank', sa.String))
+        rows = conn.execute(sa.select(t.c.id, t.c.user_id).order_by(t.c.user_id, t.c.rank, t.c.id)).all()
+        updates = []
+        for _, group in groupby(rows, key=lambda r: r.user_id):
+            updates.extend({'row_id': r.id, 'position': i} for i, r in enumerate(group))
+        if updates:
+            conn.execute(t.update().where(t.c.id == sa.bindparam('row_id')).values(order=sa.bindparam('position')), updates)
+        op.drop_index(f'ix_{table}_user_id_rank', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('rank')
@@ -0,0 +1,54 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.schemas.analytics import BreakdownResponse, TrendResponse
+from app.services import analytics
+from app.services.changes import conditional
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[Depends(conditional("non_negotiables", daily=True))])
+
+MAX_POINTS = 120
+
+
+def _range(start: date, end: date | None) -> tuple[date, date]:
+    end = end or date.today()
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    return start, end
+
+
+@router.get("/trend", response_model=TrendResponse)
+async def get_trend(
+    period: Literal["week", "month", "year"],
+    start: date = Query(alias="from"),
+    end: date | None = Query(default=None, alias="to"),
+    non_negotiable_id: int | None = None,
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Completion per week, month or year overlapping the range, for all habits or one."""
+    start, end = _range(start, end)
+    if analytics.period_count(period, start, end) > MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_POINTS} points")
+    series = await analytics.trend(db, user.id, period, start, end, date.today(), non_negotiable_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Non-negotiable not found")
+    return TrendResponse(period=period, non_negotiable_id=non_negotiable_id, points=series)
+
+
+@router.get("/breakdown", response_model=BreakdownResponse)
+async def get_breakdown(
+    start: date = Query(alias="from"),
+    end: date | None = Query(default=None, alias="to"),
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Completion over the range in total, per habit, per category and per weekday."""
+    start, end = _range(start, end)
+    return await analytics.breakdown(db, user.id, start, end, date.today())
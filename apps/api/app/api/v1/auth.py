@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.security import PasswordHasherBusy
 from app.models.user import User
 from app.schemas.auth import (
     LoginRequest,
@@ -18,31 +20,65 @@ from app.services.auth import (
     register_user,
     revoke_refresh_token,
 )
+from app.services.ratelimit import enforce_rate_limit
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _session_store_down() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Session store unavailable, retry shortly",
+        headers={"Retry-After": "5"},
+    )
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
+async def register(body: RegisterRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    await enforce_rate_limit("register", request)
     from sqlalchemy import select
     existing = await db.execute(select(User).where(User.email == body.email))
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = await register_user(db, body.email, body.password, body.timezone)
-    return await create_tokens(db, user)
+    try:
+        user = await register_user(db, body.email, body.password, body.timezone)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    try:
+        return await create_tokens(db, user)
+    except RedisError:
+        raise _session_store_down()
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)):
-    user = await authenticate_user(db, body.email, body.password)
+async def login(body: LoginRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    await enforce_rate_limit("login", request, body.email)
+    try:
+        user = await authenticate_user(db, body.email, body.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    return await create_tokens(db, user)
+    try:
+        return await create_tokens(db, user)
+    except RedisError:
+        raise _session_store_down()
 
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
-    tokens = await refresh_tokens(db, body.refresh_token)
+    try:
+        tokens = await refresh_tokens(db, body.refresh_token)
+    except RedisError:
+        raise _session_store_down()
     if not tokens:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
     return tokens
@@ -50,7 +86,10 @@ async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
-    await revoke_refresh_token(db, body.refresh_token)
+    try:
+        await revoke_refresh_token(db, body.refresh_token)
+    except RedisError:
+        raise _session_store_down()
 
 
 @router.get("/me", response_model=UserResponse)
@@ -0,0 +1,56 @@
+import calendar as cal
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.models.calendar import CalendarCache
+from app.models.tracker import DailyCheck, NonNegotiable
+from app.schemas.calendar import CalendarDayDetail, CalendarDaySummary, CalendarHabitStatus
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+
+def _date_or_404(year: int, month: int, day: int = 1) -> date:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Invalid date")
+
+
+@router.get("/{year}/{month}", response_model=list[CalendarDaySummary])
+async def get_month(year: int, month: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    first = _date_or_404(year, month)
+    last = first.replace(day=cal.monthrange(year, month)[1])
+    result = await db.execute(
+        select(CalendarCache.date, CalendarCache.total_habits, CalendarCache.completed_habits, CalendarCache.completion_pct)
+        .where(CalendarCache.user_id == user.id, CalendarCache.date.between(first, last))
+        .order_by(CalendarCache.date)
+    )
+    return [
+        CalendarDaySummary(date=r.date, total=r.total_habits, completed=r.completed_habits, pct=round(r.completion_pct, 1))
+        for r in result
+    ]
+
+
+@router.get("/{year}/{month}/{day}", response_model=CalendarDayDetail)
+async def get_day(year: int, month: int, day: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    target = _date_or_404(year, month, day)
+    result = await db.execute(
+        select(NonNegotiable.id, NonNegotiable.title, NonNegotiable.category, NonNegotiable.created_at, DailyCheck.id.label("check_id"))
+        .outerjoin(DailyCheck, and_(DailyCheck.non_negotiable_id == NonNegotiable.id, DailyCheck.check_date == target))
+        .where(NonNegotiable.user_id == user.id)
+        .order_by(NonNegotiable.rank, NonNegotiable.id)
+    )
+    items = [
+        CalendarHabitStatus(non_negotiable_id=r.id, title=r.title, category=r.category, checked=r.check_id is not None, check_id=r.check_id)
+        for r in result
+        if r.check_id is not None or r.created_at.date() <= target
+    ]
+    completed = sum(1 for i in items if i.checked)
+    pct = round(completed * 100.0 / len(items), 1) if items else 0.0
+    return CalendarDayDetail(date=target, total=len(items), completed=completed, pct=pct, items=items)
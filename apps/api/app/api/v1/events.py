@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.services.events import stream_events
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}})
+async def get_events(user: Principal = Depends(get_current_principal)):
+    """Server-sent events for the user's changes on any device.
+
+    Event types: ``check``/``uncheck`` (habit, day and its streak), ``checks``
+    (a batch), ``change`` (anything else) and ``resync`` (events were dropped;
+    refetch). Each carries the changed ``resources``. Holds no database
+    connection while open.
+    """
+    return StreamingResponse(
+        stream_events(user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
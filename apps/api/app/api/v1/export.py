@@ -0,0 +1,36 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.services import export
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+FORMATS = {
+    "ndjson": (export.ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (export.csv_zip, "application/zip", "zip"),
+}
+
+
+@router.get("", response_class=StreamingResponse)
+async def export_account(
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Everything stored for the user; ``csv`` is a zip with one file per table."""
+    encode, media_type, extension = FORMATS[fmt]
+    # The body is produced after this handler returns, so it reads on its own connection.
+    rows = export.stream_rows(db.bind, user.id, settings.export_chunk_size)
+    return StreamingResponse(
+        encode(rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="niyyah-export-{date.today().isoformat()}.{extension}"'},
+    )
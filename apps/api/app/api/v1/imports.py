@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.models.persona import Persona, ScheduleBlock
+from app.schemas.imports import ImportResponse
+from app.services import imports
+from app.services.changes import record_change
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+NDJSON = "application/x-ndjson"
+
+
+@router.post(
+    "",
+    response_model=ImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"requestBody": {"content": {"application/json": {}, NDJSON: {}}, "required": True}},
+)
+async def import_account(request: Request, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    """Add personas, milestones, principles, schedule blocks, habits and check history in bulk.
+
+    Accepts the NDJSON ``GET /export`` produces, or a JSON object of table
+    name to rows. The whole document is validated before anything is written.
+    """
+    reader = imports.ImportReader(settings.import_max_rows)
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    try:
+        if content_type == NDJSON:
+            await reader.read_ndjson(request.stream())
+        elif content_type == "application/json":
+            reader.read_json(await request.body())
+        else:
+            raise HTTPException(status_code=415, detail=f"Send application/json or {NDJSON}")
+        doc = reader.finish()
+    except imports.InvalidImport as exc:
+        raise HTTPException(status_code=422, detail=[e.model_dump() for e in exc.errors])
+
+    if user.subscription_tier == "free":
+        personas = await db.scalar(select(func.count()).select_from(Persona).where(Persona.user_id == user.id))
+        if personas + len(doc.personas) > 3:
+            raise HTTPException(status_code=403, detail="Free tier limited to 3 personas")
+        blocks = await db.scalar(select(func.count()).select_from(ScheduleBlock).where(ScheduleBlock.user_id == user.id))
+        if blocks + len(doc.schedule_blocks) > 10:
+            raise HTTPException(status_code=403, detail="Free tier limited to 10 schedule blocks")
+
+    try:
+        return await imports.apply_import(db, user.id, doc, settings.import_batch_size)
+    finally:
+        # Each entity type commits on its own, so even a failed import may have written some
+        await record_change(user.id, "personas", "principles", "schedule", "non_negotiables")
@@ -1,50 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_principal
+from app.core.responses import Serializer, columns
+from app.core.security import Principal
 from app.models.persona import Milestone, Persona
-from app.models.user import User
 from app.schemas.persona import (
     MilestoneCreate,
     MilestoneResponse,
     PersonaCreate,
     PersonaResponse,
     PersonaUpdate,
-    ReorderRequest,
 )
+from app.schemas.ordering import MoveRequest, ReorderRequest
+from app.services import ordering
+from app.services.changes import conditional, record_change
 
 router = APIRouter(prefix="/personas", tags=["personas"])
 
+PERSONA_LIST = Serializer(list[PersonaResponse])
 
-@router.get("", response_model=list[PersonaResponse])
-async def list_personas(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Persona)
+
+@router.get("", response_model=list[PersonaResponse], dependencies=[Depends(conditional("personas"))])
+async def list_personas(response: Response, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    personas = (await db.execute(
+        select(*columns(Persona, PersonaResponse, exclude=("milestones",)))
         .where(Persona.user_id == user.id)
-        .options(selectinload(Persona.milestones))
-        .order_by(Persona.order)
-    )
-    return result.scalars().all()
+        .order_by(Persona.rank, Persona.id)
+    )).mappings().all()
+    milestones: dict[int, list] = {}
+    if personas:
+        rows = await db.execute(
+            select(*columns(Milestone, MilestoneResponse))
+            .where(Milestone.persona_id.in_([p["id"] for p in personas]))
+            .order_by(Milestone.persona_id, Milestone.id)
+        )
+        for row in rows.mappings():
+            milestones.setdefault(row["persona_id"], []).append(row)
+    return PERSONA_LIST.render([{**p, "milestones": milestones.get(p["id"], [])} for p in personas], response)
 
 
 @router.post("", response_model=PersonaResponse, status_code=status.HTTP_201_CREATED)
-async def create_persona(body: PersonaCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    count_result = await db.execute(select(Persona).where(Persona.user_id == user.id))
-    count = len(count_result.scalars().all())
+async def create_persona(body: PersonaCreate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    count = await db.scalar(select(func.count()).select_from(Persona).where(Persona.user_id == user.id))
     if user.subscription_tier == "free" and count >= 3:
         raise HTTPException(status_code=403, detail="Free tier limited to 3 personas")
-    persona = Persona(user_id=user.id, order=count, **body.model_dump())
+    persona = Persona(user_id=user.id, rank=await ordering.append_rank(db, Persona, user.id), **body.model_dump())
     db.add(persona)
     await db.commit()
+    await record_change(user.id, "personas")
     await db.refresh(persona, ["milestones"])
     return persona
 
 
 @router.get("/{persona_id}", response_model=PersonaResponse)
-async def get_persona(persona_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_persona(persona_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(Persona)
         .where(Persona.id == persona_id, Persona.user_id == user.id)
@@ -57,7 +70,7 @@ async def get_persona(persona_id: int, user: User = Depends(get_current_user), d
 
 
 @router.patch("/{persona_id}", response_model=PersonaResponse)
-async def update_persona(persona_id: int, body: PersonaUpdate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_persona(persona_id: int, body: PersonaUpdate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Persona).where(Persona.id == persona_id, Persona.user_id == user.id))
     persona = result.scalar_one_or_none()
     if not persona:
@@ -65,32 +78,49 @@ async def update_persona(persona_id: int, body: PersonaUpdate, user: User = Depe
     for k, v in body.model_dump(exclude_unset=True).items():
         setattr(persona, k, v)
     await db.commit()
+    await record_change(user.id, "personas")
     await db.refresh(persona, ["milestones"])
     return persona
 
 
 @router.delete("/{persona_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_persona(persona_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_persona(persona_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Persona).where(Persona.id == persona_id, Persona.user_id == user.id))
     persona = result.scalar_one_or_none()
     if not persona:
         raise HTTPException(status_code=404, detail="Persona not found")
     await db.delete(persona)
     await db.commit()
+    await record_change(user.id, "personas", "schedule")
 
 
 @router.post("/reorder", status_code=status.HTTP_204_NO_CONTENT)
-async def reorder_personas(body: ReorderRequest, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    for idx, pid in enumerate(body.ids):
-        result = await db.execute(select(Persona).where(Persona.id == pid, Persona.user_id == user.id))
-        persona = result.scalar_one_or_none()
-        if persona:
-            persona.order = idx
+async def reorder_personas(body: ReorderRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    await ordering.reorder(db, Persona, user.id, body.ids)
     await db.commit()
+    await record_change(user.id, "personas")
+
+
+@router.post("/{persona_id}/move", response_model=PersonaResponse)
+async def move_persona(persona_id: int, body: MoveRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Persona).where(Persona.id == persona_id, Persona.user_id == user.id))
+    persona = result.scalar_one_or_none()
+    if not persona:
+        raise HTTPException(status_code=404, detail="Persona not found")
+    if body.after_id == persona_id:
+        raise HTTPException(status_code=400, detail="Cannot move an item after itself")
+    rank = await ordering.move_rank(db, Persona, user.id, body.after_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Persona to move after not found")
+    persona.rank = rank
+    await db.commit()
+    await record_change(user.id, "personas")
+    await db.refresh(persona, ["milestones"])
+    return persona
 
 
 @router.post("/{persona_id}/milestones", response_model=MilestoneResponse, status_code=status.HTTP_201_CREATED)
-async def add_milestone(persona_id: int, body: MilestoneCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def add_milestone(persona_id: int, body: MilestoneCreate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Persona).where(Persona.id == persona_id, Persona.user_id == user.id))
     if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Persona not found")
@@ -104,12 +134,13 @@ async def add_milestone(persona_id: int, body: MilestoneCreate, user: User = Dep
     milestone = Milestone(persona_id=persona_id, goal=body.goal, target_date=target)
     db.add(milestone)
     await db.commit()
+    await record_change(user.id, "personas")
     await db.refresh(milestone)
     return milestone
 
 
 @router.delete("/{persona_id}/milestones/{milestone_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_milestone(persona_id: int, milestone_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_milestone(persona_id: int, milestone_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(Milestone).join(Persona).where(
             Milestone.id == milestone_id,
@@ -122,3 +153,4 @@ async def delete_milestone(persona_id: int, milestone_id: int, user: User = Depe
         raise HTTPException(status_code=404, detail="Milestone not found")
     await db.delete(milestone)
     await db.commit()
+    await record_change(user.id, "personas")
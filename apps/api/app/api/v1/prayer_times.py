@@ -0,0 +1,105 @@
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.core.timezones import zone
+from app.models.persona import Persona, ScheduleBlock
+from app.models.user import UserSettings
+from app.schemas.prayer_times import PrayerBlocksRequest, PrayerDay
+from app.schemas.schedule import ScheduleBlockResponse
+from app.services import ordering, prayer_times
+from app.services.changes import record_change
+
+router = APIRouter(prefix="/prayer-times", tags=["prayer-times"])
+
+MAX_RANGE_DAYS = 366
+
+
+async def _location(db: AsyncSession, user_id: int) -> tuple[float, float, str]:
+    s = await db.scalar(select(UserSettings).where(UserSettings.user_id == user_id))
+    if not s or s.latitude is None or s.longitude is None:
+        raise HTTPException(status_code=400, detail="Set latitude and longitude in settings first")
+    if s.prayer_calculation_method not in prayer_times.METHODS:
+        methods = ", ".join(prayer_times.METHODS)
+        raise HTTPException(status_code=400, detail=f"Unknown prayer calculation method, use one of: {methods}")
+    return s.latitude, s.longitude, s.prayer_calculation_method
+
+
+def _hhmm(moment: datetime | None) -> str | None:
+    return moment.strftime("%H:%M") if moment else None
+
+
+@router.get("", response_model=list[PrayerDay])
+async def get_prayer_times(
+    start: date | None = Query(default=None, alias="from"),
+    end: date | None = Query(default=None, alias="to"),
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    tz = zone(user.timezone)
+    start = start or datetime.now(tz).date()
+    end = end or start
+    days = (end - start).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_RANGE_DAYS} days")
+    lat, lng, method = await _location(db, user.id)
+    result = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        times = prayer_times.local_times(lat, lng, method, day, tz)
+        result.append(PrayerDay(date=day, **{name: _hhmm(t) for name, t in times.items()}))
+    return result
+
+
+@router.post("/blocks", response_model=list[ScheduleBlockResponse])
+async def regenerate_prayer_blocks(
+    body: PrayerBlocksRequest,
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Replace all of the user's prayer blocks with one daily block per prayer, starting at its time."""
+    lat, lng, method = await _location(db, user.id)
+    persona_query = select(Persona.id).where(Persona.user_id == user.id)
+    if body.persona_id is not None:
+        persona_query = persona_query.where(Persona.id == body.persona_id)
+    persona_id = await db.scalar(persona_query.order_by(Persona.rank).limit(1))
+    if persona_id is None:
+        raise HTTPException(status_code=404, detail="Persona not found")
+
+    tz = zone(user.timezone)
+    times = prayer_times.local_times(lat, lng, method, body.for_date or datetime.now(tz).date(), tz)
+    prayers = [(name, times[name]) for name in prayer_times.PRAYERS if times[name] is not None]
+
+    old = (
+        await db.execute(select(ScheduleBlock).where(ScheduleBlock.user_id == user.id, ScheduleBlock.is_prayer_block.is_(True)))
+    ).scalars().all()
+    if user.subscription_tier == "free":
+        others = await db.scalar(
+            select(func.count()).select_from(ScheduleBlock)
+            .where(ScheduleBlock.user_id == user.id, ScheduleBlock.is_prayer_block.is_(False))
+        )
+        if others + len(prayers) > 10:
+            raise HTTPException(status_code=403, detail="Free tier limited to 10 schedule blocks")
+
+    for block in old:
+        await db.delete(block)
+    rank = await ordering.append_rank(db, ScheduleBlock, user.id)
+    blocks = []
+    for name, start in prayers:
+        end = start + timedelta(minutes=body.duration_minutes)
+        blocks.append(ScheduleBlock(
+            user_id=user.id, persona_id=persona_id, start_time=_hhmm(start), end_time=_hhmm(end),
+            activity=name.capitalize(), day_type="daily", is_prayer_block=True, rank=rank,
+        ))
+        rank = ordering.key_after(rank)
+    db.add_all(blocks)
+    await db.commit()
+    await record_change(user.id, "schedule")
+    return blocks
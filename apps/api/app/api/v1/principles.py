@@ -3,35 +3,37 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_principal
+from app.core.security import Principal
 from app.models.principle import Principle
-from app.models.user import User
+from app.schemas.ordering import MoveRequest, ReorderRequest
 from app.schemas.principle import PrincipleCreate, PrincipleResponse, PrincipleUpdate
+from app.services import ordering
+from app.services.changes import conditional, record_change
 
 router = APIRouter(prefix="/principles", tags=["principles"])
 
 
-@router.get("", response_model=list[PrincipleResponse])
-async def list_principles(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=list[PrincipleResponse], dependencies=[Depends(conditional("principles"))])
+async def list_principles(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(Principle).where(Principle.user_id == user.id).order_by(Principle.order)
+        select(Principle).where(Principle.user_id == user.id).order_by(Principle.rank, Principle.id)
     )
     return result.scalars().all()
 
 
 @router.post("", response_model=PrincipleResponse, status_code=status.HTTP_201_CREATED)
-async def create_principle(body: PrincipleCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    count_result = await db.execute(select(Principle).where(Principle.user_id == user.id))
-    count = len(count_result.scalars().all())
-    principle = Principle(user_id=user.id, order=count, **body.model_dump())
+async def create_principle(body: PrincipleCreate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    principle = Principle(user_id=user.id, rank=await ordering.append_rank(db, Principle, user.id), **body.model_dump())
     db.add(principle)
     await db.commit()
+    await record_change(user.id, "principles")
     await db.refresh(principle)
     return principle
 
 
 @router.patch("/{principle_id}", response_model=PrincipleResponse)
-async def update_principle(principle_id: int, body: PrincipleUpdate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_principle(principle_id: int, body: PrincipleUpdate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Principle).where(Principle.id == principle_id, Principle.user_id == user.id))
     principle = result.scalar_one_or_none()
     if not principle:
@@ -39,15 +41,42 @@ async def update_principle(principle_id: int, body: PrincipleUpdate, user: User
     for k, v in body.model_dump(exclude_unset=True).items():
         setattr(principle, k, v)
     await db.commit()
+    await record_change(user.id, "principles")
     await db.refresh(principle)
     return principle
 
 
 @router.delete("/{principle_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_principle(principle_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_principle(principle_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Principle).where(Principle.id == principle_id, Principle.user_id == user.id))
     principle = result.scalar_one_or_none()
     if not principle:
         raise HTTPException(status_code=404, detail="Principle not found")
     await db.delete(principle)
     await db.commit()
+    await record_change(user.id, "principles")
+
+
+@router.post("/reorder", status_code=status.HTTP_204_NO_CONTENT)
+async def reorder_principles(body: ReorderRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    await ordering.reorder(db, Principle, user.id, body.ids)
+    await db.commit()
+    await record_change(user.id, "principles")
+
+
+@router.post("/{principle_id}/move", response_model=PrincipleResponse)
+async def move_principle(principle_id: int, body: MoveRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Principle).where(Principle.id == principle_id, Principle.user_id == user.id))
+    principle = result.scalar_one_or_none()
+    if not principle:
+        raise HTTPException(status_code=404, detail="Principle not found")
+    if body.after_id == principle_id:
+        raise HTTPException(status_code=400, detail="Cannot move an item after itself")
+    rank = await ordering.move_rank(db, Principle, user.id, body.after_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Principle to move after not found")
+    principle.rank = rank
+    await db.commit()
+    await record_change(user.id, "principles")
+    await db.refresh(principle)
+    return principle
@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.core.timezones import local_today
+from app.services import reports
+from app.services.changes import trusted_versions
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get(
+    "/{year}/{month}",
+    response_class=Response,
+    responses={200: {"content": {media_type: {} for media_type in reports.FORMATS.values()}}},
+)
+async def get_report(
+    year: int,
+    month: int,
+    fmt: Literal["pdf", "png"] = Query(default="pdf", alias="format"),
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download the month's progress report; rendered once per version of the month's data."""
+    if user.subscription_tier == "free":
+        raise HTTPException(status_code=403, detail="Progress reports are a Pro feature")
+    try:
+        first = date(year, month, 1)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Invalid date")
+    today = local_today(user.timezone)
+    if first > today:
+        raise HTTPException(status_code=404, detail="No report for a future month")
+
+    versions = await trusted_versions(user.id, reports.REPORT_RESOURCES)
+    hit = await reports.cached(user.id, year, month, fmt, reports.report_as_of(year, month, today), versions)
+    if hit is not None:
+        digest, content = hit
+        cached = True
+    else:
+        report = await reports.load_report(db, user.id, year, month, today)
+        content, cached = await reports.render(user.id, report, fmt, versions)
+        digest = report.digest()
+    return Response(
+        content,
+        media_type=reports.FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="niyyah-report-{year}-{month:02d}.{fmt}"',
+            "ETag": f'"{digest}"',
+            "Cache-Control": "private, no-cache",
+            "X-Report-Cache": "hit" if cached else "miss",
+        },
+    )
@@ -1,45 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_principal
+from app.core.security import Principal
 from app.models.persona import Persona, ScheduleBlock
-from app.models.user import User
+from app.schemas.ordering import MoveRequest, ReorderRequest
 from app.schemas.schedule import ScheduleBlockCreate, ScheduleBlockResponse, ScheduleBlockUpdate
+from app.services import ordering
+from app.services.changes import conditional, record_change
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
 
-@router.get("", response_model=list[ScheduleBlockResponse])
-async def list_blocks(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=list[ScheduleBlockResponse], dependencies=[Depends(conditional("schedule"))])
+async def list_blocks(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(ScheduleBlock).where(ScheduleBlock.user_id == user.id).order_by(ScheduleBlock.start_time)
+        select(ScheduleBlock).where(ScheduleBlock.user_id == user.id).order_by(ScheduleBlock.start_time, ScheduleBlock.rank)
     )
     return result.scalars().all()
 
 
 @router.post("", response_model=ScheduleBlockResponse, status_code=status.HTTP_201_CREATED)
-async def create_block(body: ScheduleBlockCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_block(body: ScheduleBlockCreate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     # Verify persona ownership
     result = await db.execute(select(Persona).where(Persona.id == body.persona_id, Persona.user_id == user.id))
     if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Persona not found")
 
-    count_result = await db.execute(select(ScheduleBlock).where(ScheduleBlock.user_id == user.id))
-    count = len(count_result.scalars().all())
+    count = await db.scalar(select(func.count()).select_from(ScheduleBlock).where(ScheduleBlock.user_id == user.id))
     if user.subscription_tier == "free" and count >= 10:
         raise HTTPException(status_code=403, detail="Free tier limited to 10 schedule blocks")
 
-    block = ScheduleBlock(user_id=user.id, order=count, **body.model_dump())
+    block = ScheduleBlock(user_id=user.id, rank=await ordering.append_rank(db, ScheduleBlock, user.id), **body.model_dump())
     db.add(block)
     await db.commit()
+    await record_change(user.id, "schedule")
     await db.refresh(block)
     return block
 
 
 @router.patch("/{block_id}", response_model=ScheduleBlockResponse)
-async def update_block(block_id: int, body: ScheduleBlockUpdate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_block(block_id: int, body: ScheduleBlockUpdate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(ScheduleBlock).where(ScheduleBlock.id == block_id, ScheduleBlock.user_id == user.id))
     block = result.scalar_one_or_none()
     if not block:
@@ -47,15 +50,42 @@ async def update_block(block_id: int, body: ScheduleBlockUpdate, user: User = De
     for k, v in body.model_dump(exclude_unset=True).items():
         setattr(block, k, v)
     await db.commit()
+    await record_change(user.id, "schedule")
     await db.refresh(block)
     return block
 
 
 @router.delete("/{block_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_block(block_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_block(block_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(ScheduleBlock).where(ScheduleBlock.id == block_id, ScheduleBlock.user_id == user.id))
     block = result.scalar_one_or_none()
     if not block:
         raise HTTPException(status_code=404, detail="Block not found")
     await db.delete(block)
     await db.commit()
+    await record_change(user.id, "schedule")
+
+
+@router.post("/reorder", status_code=status.HTTP_204_NO_CONTENT)
+async def reorder_blocks(body: ReorderRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    await ordering.reorder(db, ScheduleBlock, user.id, body.ids)
+    await db.commit()
+    await record_change(user.id, "schedule")
+
+
+@router.post("/{block_id}/move", response_model=ScheduleBlockResponse)
+async def move_block(block_id: int, body: MoveRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(ScheduleBlock).where(ScheduleBlock.id == block_id, ScheduleBlock.user_id == user.id))
+    block = result.scalar_one_or_none()
+    if not block:
+        raise HTTPException(status_code=404, detail="Block not found")
+    if body.after_id == block_id:
+        raise HTTPException(status_code=400, detail="Cannot move an item after itself")
+    rank = await ordering.move_rank(db, ScheduleBlock, user.id, body.after_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Block to move after not found")
+    block.rank = rank
+    await db.commit()
+    await record_change(user.id, "schedule")
+    await db.refresh(block)
+    return block
@@ -3,15 +3,18 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.models.user import User, UserSettings
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.models.user import UserSettings
 from app.schemas.settings import UserSettingsResponse, UserSettingsUpdate
+from app.services import streaks
+from app.services.changes import conditional, record_change
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
 
-@router.get("", response_model=UserSettingsResponse)
-async def get_settings(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=UserSettingsResponse, dependencies=[Depends(conditional("settings"))])
+async def get_settings(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(UserSettings).where(UserSettings.user_id == user.id))
     s = result.scalar_one_or_none()
     if not s:
@@ -23,15 +26,21 @@ async def get_settings(user: User = Depends(get_current_user), db: AsyncSession
 
 
 @router.patch("", response_model=UserSettingsResponse)
-async def update_settings(body: UserSettingsUpdate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_settings(body: UserSettingsUpdate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(UserSettings).where(UserSettings.user_id == user.id))
     s = result.scalar_one_or_none()
     if not s:
         s = UserSettings(user_id=user.id)
         db.add(s)
         await db.flush()
-    for k, v in body.model_dump(exclude_unset=True).items():
+    changes = body.model_dump(exclude_unset=True)
+    for k, v in changes.items():
         setattr(s, k, v)
+    resources = ["settings"]
+    if changes.get("streak_grace_days") is not None:
+        await streaks.apply_grace(db, user.id, changes["streak_grace_days"])
+        resources.append("non_negotiables")
     await db.commit()
+    await record_change(user.id, *resources)
     await db.refresh(s)
     return s
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import get_current_principal
+from app.core.security import Principal
+from app.models.persona import Milestone, Persona, ScheduleBlock
+from app.models.principle import Principle
+from app.models.sync import SyncTombstone
+from app.models.tracker import NonNegotiable
+from app.models.user import User, UserSettings
+from app.schemas.sync import SyncResponse, Tombstone
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(since: str | None = None, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    try:
+        cursor = int(since) if since else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    row = (await db.execute(select(User.change_seq, User.tombstones_pruned_seq).where(User.id == user.id))).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    current, pruned = row
+    # A cursor from before the pruned tombstones may have missed deletes
+    full = since is None or cursor > current or cursor < pruned
+    if not full and cursor == current:
+        return SyncResponse(cursor=str(current), full=False)
+
+    def changed(model, *criteria):
+        query = select(model).where(*criteria)
+        return query if full else query.where(model.change_seq > cursor)
+
+    personas = (await db.execute(changed(Persona, Persona.user_id == user.id).order_by(Persona.rank, Persona.id))).scalars().all()
+    milestones = (
+        await db.execute(changed(Milestone, Persona.user_id == user.id).join(Persona).order_by(Milestone.id))
+    ).scalars().all()
+    principles = (await db.execute(changed(Principle, Principle.user_id == user.id).order_by(Principle.rank, Principle.id))).scalars().all()
+    blocks = (
+        await db.execute(changed(ScheduleBlock, ScheduleBlock.user_id == user.id).order_by(ScheduleBlock.start_time))
+    ).scalars().all()
+    non_negotiables = (
+        await db.execute(changed(NonNegotiable, NonNegotiable.user_id == user.id).order_by(NonNegotiable.rank, NonNegotiable.id))
+    ).scalars().all()
+    settings = (await db.execute(changed(UserSettings, UserSettings.user_id == user.id))).scalar_one_or_none()
+    deleted = []
+    if not full:
+        tombstones = await db.execute(
+            select(SyncTombstone.entity, SyncTombstone.entity_id)
+            .where(SyncTombstone.user_id == user.id, SyncTombstone.change_seq > cursor)
+            .order_by(SyncTombstone.change_seq)
+        )
+        deleted = [Tombstone(entity=entity, id=entity_id) for entity, entity_id in tombstones]
+
+    return SyncResponse(
+        cursor=str(current),
+        full=full,
+        personas=personas,
+        milestones=milestones,
+        principles=principles,
+        schedule_blocks=blocks,
+        non_negotiables=non_negotiables,
+        settings=settings,
+        deleted=deleted,
+    )
@@ -1,52 +1,67 @@
-from datetime import date, timedelta
+from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.models.tracker import DailyCheck, NonNegotiable, Streak
-from app.models.user import User
+from app.core.deps import get_current_principal
+from app.core.responses import Serializer, columns
+from app.core.security import Principal
+from app.models.tracker import DailyCheck, DailyCheckMonth, NonNegotiable, Streak
+from app.models.user import UserSettings
+from app.schemas.ordering import MoveRequest, ReorderRequest
 from app.schemas.tracker import (
+    DailyCheckBatchRequest,
+    DailyCheckBatchResponse,
     DailyCheckRequest,
     DailyCheckResponse,
     NonNegotiableCreate,
     NonNegotiableResponse,
     NonNegotiableUpdate,
+    StreakResponse,
     TrackerDayResponse,
+    TrackerRangeResponse,
 )
+from app.services import analytics, bitset, calendar, check_months, checks, ordering, streaks
+from app.services.changes import conditional, record_change
 
 router = APIRouter(prefix="/tracker", tags=["tracker"])
 
+MAX_RANGE_DAYS = 366
+TRACKER_DAY = Serializer(TrackerDayResponse)
+
 
-@router.get("/non-negotiables", response_model=list[NonNegotiableResponse])
-async def list_non_negotiables(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@router.get("/non-negotiables", response_model=list[NonNegotiableResponse], dependencies=[Depends(conditional("non_negotiables"))])
+async def list_non_negotiables(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(NonNegotiable)
         .where(NonNegotiable.user_id == user.id)
         .options(selectinload(NonNegotiable.streak))
-        .order_by(NonNegotiable.order)
+        .order_by(NonNegotiable.rank, NonNegotiable.id)
     )
     return result.scalars().all()
 
 
 @router.post("/non-negotiables", response_model=NonNegotiableResponse, status_code=status.HTTP_201_CREATED)
-async def create_non_negotiable(body: NonNegotiableCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    count_result = await db.execute(select(NonNegotiable).where(NonNegotiable.user_id == user.id))
-    count = len(count_result.scalars().all())
-    nn = NonNegotiable(user_id=user.id, order=count, **body.model_dump())
+async def create_non_negotiable(body: NonNegotiableCreate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    nn = NonNegotiable(user_id=user.id, rank=await ordering.append_rank(db, NonNegotiable, user.id), **body.model_dump())
     db.add(nn)
     await db.flush()
-    db.add(Streak(non_negotiable_id=nn.id))
+    grace = await db.scalar(select(UserSettings.streak_grace_days).where(UserSettings.user_id == user.id))
+    db.add(Streak(non_negotiable_id=nn.id, grace_days=grace or 0))
+    await calendar.record_habit_created(db, nn)
     await db.commit()
+    await record_change(user.id, "non_negotiables")
     await db.refresh(nn, ["streak"])
     return nn
 
 
 @router.patch("/non-negotiables/{nn_id}", response_model=NonNegotiableResponse)
-async def update_non_negotiable(nn_id: int, body: NonNegotiableUpdate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_non_negotiable(nn_id: int, body: NonNegotiableUpdate, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(NonNegotiable).where(NonNegotiable.id == nn_id, NonNegotiable.user_id == user.id))
     nn = result.scalar_one_or_none()
     if not nn:
@@ -54,22 +69,59 @@ async def update_non_negotiable(nn_id: int, body: NonNegotiableUpdate, user: Use
     for k, v in body.model_dump(exclude_unset=True).items():
         setattr(nn, k, v)
     await db.commit()
+    await record_change(user.id, "non_negotiables")
     await db.refresh(nn, ["streak"])
     return nn
 
 
 @router.delete("/non-negotiables/{nn_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_non_negotiable(nn_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_non_negotiable(nn_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(NonNegotiable).where(NonNegotiable.id == nn_id, NonNegotiable.user_id == user.id))
     nn = result.scalar_one_or_none()
     if not nn:
         raise HTTPException(status_code=404, detail="Non-negotiable not found")
+    await calendar.record_habit_deleted(db, nn)
+    await analytics.record_habit_deleted(db, nn)
     await db.delete(nn)
     await db.commit()
+    await record_change(user.id, "non_negotiables")
+
+
+@router.post("/non-negotiables/reorder", status_code=status.HTTP_204_NO_CONTENT)
+async def reorder_non_negotiables(body: ReorderRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    await ordering.reorder(db, NonNegotiable, user.id, body.ids)
+    await db.commit()
+    await record_change(user.id, "non_negotiables")
+
+
+@router.post("/non-negotiables/{nn_id}/move", response_model=NonNegotiableResponse)
+async def move_non_negotiable(nn_id: int, body: MoveRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(NonNegotiable).where(NonNegotiable.id == nn_id, NonNegotiable.user_id == user.id))
+    nn = result.scalar_one_or_none()
+    if not nn:
+        raise HTTPException(status_code=404, detail="Non-negotiable not found")
+    if body.after_id == nn_id:
+        raise HTTPException(status_code=400, detail="Cannot move an item after itself")
+    rank = await ordering.move_rank(db, NonNegotiable, user.id, body.after_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Non-negotiable to move after not found")
+    nn.rank = rank
+    await db.commit()
+    await record_change(user.id, "non_negotiables")
+    await db.refresh(nn, ["streak"])
+    return nn
+
+
+def _check_event(nn_id: int, check_date: date, streak: Streak | None) -> dict:
+    return {
+        "non_negotiable_id": nn_id,
+        "check_date": check_date,
+        "streak": StreakResponse.model_validate(streak).model_dump() if streak else None,
+    }
 
 
 @router.post("/check", response_model=DailyCheckResponse, status_code=status.HTTP_201_CREATED)
-async def check_item(body: DailyCheckRequest, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def check_item(body: DailyCheckRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     # Verify ownership
     result = await db.execute(select(NonNegotiable).where(NonNegotiable.id == body.non_negotiable_id, NonNegotiable.user_id == user.id))
     nn = result.scalar_one_or_none()
@@ -87,51 +139,142 @@ async def check_item(body: DailyCheckRequest, user: User = Depends(get_current_u
 
     check = DailyCheck(non_negotiable_id=nn.id, check_date=check_date)
     db.add(check)
+    await check_months.record_checks(db, [(nn.id, check_date)])
+    await calendar.record_check(db, nn, check_date)
+    await analytics.record_checks(db, user.id, [(nn.id, check_date, 1)])
 
     # Update streak
     streak_result = await db.execute(select(Streak).where(Streak.non_negotiable_id == nn.id))
     streak = streak_result.scalar_one_or_none()
     if streak:
-        if streak.last_check_date and (check_date - streak.last_check_date) == timedelta(days=1):
-            streak.current_streak += 1
-        elif streak.last_check_date != check_date:
-            streak.current_streak = 1
-        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
-        streak.last_check_date = check_date
+        await streaks.record_check(db, streak, check_date)
 
     await db.commit()
+    await record_change(user.id, "non_negotiables", event="check", data=_check_event(nn.id, check_date, streak))
     await db.refresh(check)
     return check
 
 
+@router.post("/checks:batch", response_model=DailyCheckBatchResponse)
+async def batch_checks(body: DailyCheckBatchRequest, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    results = await checks.apply_batch(db, user.id, body.items, date.today())
+    await db.commit()
+    # Only rows the batch wrote; one event item per changed day
+    changed = list({
+        (r.non_negotiable_id, r.check_date): r.model_dump(include={"non_negotiable_id", "check_date", "op"})
+        for r in results if r.status in ("created", "deleted")
+    }.values())
+    await record_change(user.id, "non_negotiables", event="checks", data={"items": changed})
+    return DailyCheckBatchResponse(results=results)
+
+
 @router.delete("/check/{check_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def uncheck_item(check_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(DailyCheck).join(NonNegotiable).where(DailyCheck.id == check_id, NonNegotiable.user_id == user.id)
-    )
-    check = result.scalar_one_or_none()
-    if not check:
+async def uncheck_item(check_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    if check_id < 0:
+        # Key of a check served from the monthly bitmaps (see check_months.check_key)
+        try:
+            nn_id, check_date = check_months.parse_check_key(check_id)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Check not found")
+        match = and_(DailyCheck.non_negotiable_id == nn_id, DailyCheck.check_date == check_date)
+    else:
+        match = DailyCheck.id == check_id
+    result = await db.execute(select(DailyCheck, NonNegotiable).join(NonNegotiable).where(match, NonNegotiable.user_id == user.id))
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Check not found")
+    check, nn = row
+    await calendar.record_uncheck(db, nn, check.check_date)
     await db.delete(check)
+    await check_months.record_unchecks(db, [(nn.id, check.check_date)])
+    await analytics.record_checks(db, user.id, [(nn.id, check.check_date, -1)])
+    streak_result = await db.execute(select(Streak).where(Streak.non_negotiable_id == nn.id))
+    streak = streak_result.scalar_one_or_none()
+    if streak:
+        await streaks.record_uncheck(db, streak, check.check_date)
     await db.commit()
+    await record_change(user.id, "non_negotiables", event="uncheck", data=_check_event(nn.id, check.check_date, streak))
 
 
 @router.get("/today", response_model=TrackerDayResponse)
-async def get_today(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_today(response: Response, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     today = date.today()
-    nn_result = await db.execute(
-        select(NonNegotiable)
+    nn_rows = await db.execute(
+        select(*columns(NonNegotiable, NonNegotiableResponse, exclude=("streak",)), *columns(Streak, StreakResponse), Streak.id.label("streak_id"))
+        .outerjoin(Streak, Streak.non_negotiable_id == NonNegotiable.id)
         .where(NonNegotiable.user_id == user.id)
-        .options(selectinload(NonNegotiable.streak))
-        .order_by(NonNegotiable.order)
+        .order_by(NonNegotiable.rank, NonNegotiable.id)
     )
-    nns = nn_result.scalars().all()
+    nns = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "category": row.category,
+            "rank": row.rank,
+            "streak": {name: row[name] for name in StreakResponse.model_fields} if row.streak_id is not None else None,
+        }
+        for row in nn_rows.mappings()
+    ]
 
-    checks_result = await db.execute(
-        select(DailyCheck).join(NonNegotiable).where(
-            NonNegotiable.user_id == user.id, DailyCheck.check_date == today
+    if check_months.reads_enabled():
+        checks = await check_months.checks_on(db, user.id, today)
+    else:
+        checks_result = await db.execute(
+            select(*columns(DailyCheck, DailyCheckResponse)).join(NonNegotiable).where(
+                NonNegotiable.user_id == user.id, DailyCheck.check_date == today
+            )
         )
-    )
-    checks = checks_result.scalars().all()
+        checks = checks_result.mappings().all()
 
-    return TrackerDayResponse(date=today, checks=checks, non_negotiables=nns)
+    return TRACKER_DAY.render({"date": today, "checks": checks, "non_negotiables": nns}, response)
+
+
+@router.get("/range", response_model=TrackerRangeResponse)
+async def get_range(
+    start: date = Query(alias="from"),
+    end: date = Query(alias="to"),
+    non_negotiable_id: int | None = None,
+    encoding: Literal["bitset", "rle"] = "bitset",
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    days = (end - start).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_RANGE_DAYS} days")
+
+    habits = select(NonNegotiable.id).where(NonNegotiable.user_id == user.id).order_by(NonNegotiable.rank, NonNegotiable.id)
+    if non_negotiable_id is not None:
+        habits = habits.where(NonNegotiable.id == non_negotiable_id)
+
+    offsets: dict[int, list[int]] = {}
+    if check_months.reads_enabled():
+        query = habits.add_columns(DailyCheckMonth.month, DailyCheckMonth.mask).outerjoin(
+            DailyCheckMonth, check_months.overlapping(start, end)
+        )
+        for nn_id, month, mask in await db.execute(query):
+            series = offsets.setdefault(nn_id, [])
+            if month is not None:
+                series.extend((day - start).days for day in check_months.days_in(month, mask, start, end))
+    else:
+        query = habits.add_columns(DailyCheck.check_date).outerjoin(
+            DailyCheck,
+            and_(DailyCheck.non_negotiable_id == NonNegotiable.id, DailyCheck.check_date.between(start, end)),
+        )
+        for nn_id, check_date in await db.execute(query):
+            series = offsets.setdefault(nn_id, [])
+            if check_date is not None:
+                series.append((check_date - start).days)
+    if non_negotiable_id is not None and not offsets:
+        raise HTTPException(status_code=404, detail="Non-negotiable not found")
+
+    encode = bitset.encode_bitset if encoding == "bitset" else bitset.encode_rle
+    return TrackerRangeResponse(
+        start=start,
+        end=end,
+        days=days,
+        encoding=encoding,
+        ids=list(offsets),
+        data=[encode(series, days) for series in offsets.values()],
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,8 +9,79 @@ class Settings(BaseSettings):
     secret_key: str = "change-me-in-production"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    # "redis" (TTL keys, atomic rotation) or "database" (refresh_tokens table)
+    refresh_token_store: Literal["redis", "database"] = "redis"
+    # With the redis store, still accept tokens issued into refresh_tokens before the switch
+    refresh_token_legacy_fallback: bool = True
     cors_origins: str = "http://localhost:3000"
 
+    # Connection pool, per process: size it so replicas x workers x (size + overflow)
+    # stays under Postgres max_connections (or PgBouncer's client limit)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # asyncpg prepared-statement cache per connection; 0 disables it
+    db_statement_cache_size: int = 100
+    # Behind PgBouncer in transaction mode: no server-side statement cache, unique statement names
+    db_pgbouncer: bool = False
+
+    # Requests slower than this are logged with the SQL fingerprints they ran
+    slow_request_ms: int = 500
+
+    # Make implicit lazy relationship loads raise instead of issuing SQL (tests)
+    strict_loading: bool = False
+
+    # Sliding-window limits on the bcrypt routes, checked before any hashing
+    rate_limit_enabled: bool = True
+    rate_limit_window_seconds: int = 60
+    rate_limit_login_per_ip: int = 30
+    rate_limit_login_per_email: int = 10
+    rate_limit_register_per_ip: int = 10
+
+    # Password hashing runs on a dedicated pool so bcrypt never blocks the event loop
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+
+    # Outgoing mail (partner digests)
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_starttls: bool = False
+    mail_from: str = "Niyyah <no-reply@niyyah.app>"
+
+    # Partner digests: partnerships per transaction, concurrent SMTP sends, retries per digest
+    digest_batch_size: int = 500
+    digest_send_concurrency: int = 8
+    digest_max_attempts: int = 5
+
+    # Worker processes drawing progress reports; 0 renders on a thread instead
+    report_render_processes: int = 2
+
+    # Rows fetched per round trip by the streaming account export
+    export_chunk_size: int = 1000
+    # Bulk import: largest accepted document, and rows per multi-row INSERT
+    import_max_rows: int = 500_000
+    import_batch_size: int = 1000
+
+    # Live events (GET /events): buffered events per connection before it is told to
+    # resync, idle heartbeat interval, and how long a stream stays open before the
+    # client reconnects (which also rebalances streams across replicas)
+    events_queue_size: int = 64
+    events_heartbeat_seconds: float = 15.0
+    events_max_stream_seconds: float = 3600.0
+
+    # Days a delete stays visible to delta sync; devices offline for longer get a full sync
+    sync_tombstone_retention_days: int = 90
+
+    # Daily check storage: "rows" (daily_checks only), "dual" (also keep the monthly
+    # bitmaps in daily_check_months; run backfill_check_months) or "bitmap" (dual
+    # writes, range/today/streak reads served from the bitmaps)
+    check_storage: Literal["rows", "dual", "bitmap"] = "rows"
+
     # For tests, swap asyncpg → aiosqlite
     test_database_url: str = "sqlite+aiosqlite:///./test.db"
 
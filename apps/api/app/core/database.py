@@ -1,9 +1,81 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+import time
+from uuid import uuid4
 
-from app.core.config import settings
+from sqlalchemy import String, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-engine = create_async_engine(settings.database_url, echo=False)
+from app.core.config import Settings, settings
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        # Only checkouts that got a connection count towards the wait averages
+        waited = time.perf_counter() - started
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return conn
+
+
+def engine_options(config: Settings) -> dict:
+    """``create_async_engine`` keyword arguments for ``config.database_url``."""
+    options: dict = {"echo": False, "pool_pre_ping": config.db_pool_pre_ping}
+    if make_url(config.database_url).get_backend_name() != "postgresql":
+        return options
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        connect_args={"prepared_statement_cache_size": config.db_statement_cache_size},
+    )
+    if config.db_pgbouncer:
+        # Transaction pooling hands each transaction a different server
+        # connection, so named prepared statements cannot be reused.
+        options["connect_args"] = {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
+def pool_stats(bind: AsyncEngine) -> dict:
+    pool = bind.pool
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(size=pool.size(), checked_in=pool.checkedin(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            acquired=pool.acquired,
+            timeouts=pool.timeouts,
+            wait_ms_avg=round(pool.wait_seconds_total / pool.acquired * 1000, 3) if pool.acquired else 0.0,
+            wait_ms_max=round(pool.wait_seconds_max * 1000, 3),
+        )
+    return stats
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings))
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -11,6 +83,28 @@ class Base(DeclarativeBase):
     pass
 
 
+# Fractional order keys (see app.services.ordering) must compare byte-wise.
+RankKey = String(64, collation="C").with_variant(String(64), "sqlite")
+
+
+def upsert(db: AsyncSession, model):
+    """Dialect-specific INSERT supporting ``on_conflict_do_update`` (Postgres and SQLite)."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def _raise_on_lazy_load(state) -> None:
+    if state.is_select and not state.is_column_load and not state.is_relationship_load:
+        state.statement = state.statement.options(raiseload("*", sql_only=True))
+
+
+if settings.strict_loading:
+    event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
@@ -1,24 +1,65 @@
+import logging
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from redis.exceptions import RedisError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.redis import get_redis
+from app.core.security import Principal, decode_access_token, token_version_key
 from app.models.user import User
+from app.services.auth import publish_token_version
+
+logger = logging.getLogger(__name__)
 
 bearer_scheme = HTTPBearer()
 
 
-async def get_current_user(
+async def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
-    user_id = decode_access_token(credentials.credentials)
-    if user_id is None:
+) -> Principal:
+    """Authenticate from token claims, checked against the user's current token version.
+
+    Tier, status and credential changes bump ``users.token_version`` (see
+    ``app.models.user``), which is mirrored to Redis. A token carrying another
+    version is rejected so the client has to refresh and pick up fresh claims.
+    Normally only Redis is read; if the mirrored version is missing (evicted,
+    flushed or expired) it is read from Postgres and re-published, and while
+    Redis is unreachable every request reads it from Postgres, so revocation
+    never fails open.
+    """
+    principal = decode_access_token(credentials.credentials)
+    if principal is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User inactive")
+    redis_up = True
+    try:
+        current = await get_redis().get(token_version_key(principal.id))
+    except RedisError:
+        logger.warning("token version lookup failed; checking the database", exc_info=True)
+        current, redis_up = None, False
+    if current is None:
+        row = (await db.execute(select(User.token_version, User.is_active).where(User.id == principal.id))).one_or_none()
+        if row is None or not row.is_active:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        current = row.token_version
+        if redis_up:
+            await publish_token_version(principal.id, current)
+    if int(current) != principal.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Load the full ``User`` row for handlers that need more than the claims."""
+    user = await db.get(User, principal.id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
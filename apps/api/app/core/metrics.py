@@ -0,0 +1,241 @@
+"""Request and database metrics in Prometheus text format.
+
+Kept dependency-free and cheap enough to leave on: recording a request is a
+few dict lookups, and each SQL statement costs two engine-event callbacks
+that append to a per-request accumulator held in a context variable. SQL
+text is only normalized into fingerprints when a request turns out to be
+slow and gets logged.
+
+Values are per process; Prometheus scrapes each replica separately.
+"""
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import Counter as Tally
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        REGISTRY.append(self)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(v)}" for labels, v in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (last is +Inf), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being served.", ("method",))
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements issued per HTTP request.", ("route",), buckets=STATEMENT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request.", ("route",))
+STATEMENTS = Counter("db_statements_total", "SQL statements executed, inside or outside requests.")
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class SqlStats:
+    statements: int = 0
+    seconds: float = 0.0
+    texts: list[tuple[str, float]] = field(default_factory=list)
+
+
+_sql_stats: ContextVar[SqlStats | None] = ContextVar("sql_stats", default=None)
+
+
+# The start time lives on the statement's execution context rather than on the
+# pooled connection, so a statement that fails (no after_cursor_execute) leaves
+# nothing behind for the next one.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    STATEMENTS.inc()
+    stats = _sql_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+        stats.texts.append((statement, elapsed))
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|%\(\w+\)s|\b\d+(?:\.\d+)?\b|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and parameters replaced, so repeats group together."""
+    normalized = _LITERALS.sub("?", _SPACE.sub(" ", statement.strip()))
+    return _LISTS.sub("(?, ...)", normalized)
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, e.g. ``/api/v1/tracker/check/{check_id}``."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "<unmatched>"
+    # Some FastAPI versions report routes of included routers relative to the
+    # router prefix; take the missing leading segments from the request path.
+    path = scope["path"]
+    keep = path.count("/") - template.count("/") + 1
+    return "/".join(path.split("/")[:keep]) + template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each HTTP request and its SQL."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = SqlStats()
+        token = _sql_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_PROGRESS.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _sql_stats.reset(token)
+            IN_PROGRESS.dec(method)
+            route = _route_template(scope)
+            REQUESTS.inc(method, route, str(status))
+            LATENCY.observe(elapsed, method, route)
+            REQUEST_STATEMENTS.observe(stats.statements, route)
+            REQUEST_DB_TIME.observe(stats.seconds, route)
+            if elapsed * 1000 >= settings.slow_request_ms:
+                _log_slow(method, route, status, elapsed, stats)
+
+
+def _log_slow(method: str, route: str, status: int, elapsed: float, stats: SqlStats) -> None:
+    counts: Tally[str] = Tally()
+    seconds: Tally[str] = Tally()
+    for statement, took in stats.texts:
+        key = fingerprint(statement)
+        counts[key] += 1
+        seconds[key] += took
+    top = [f"{counts[k]}x {seconds[k] * 1000:.1f}ms {k}" for k, _ in seconds.most_common(5)]
+    logger.warning(
+        "slow request %s %s -> %s in %.1fms (%d statements, %.1fms in SQL)%s",
+        method,
+        route,
+        status,
+        elapsed * 1000,
+        stats.statements,
+        stats.seconds * 1000,
+        "".join(f"\n  {line}" for line in top),
+    )
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+MEMORY_URL_PREFIX = "memory://"
+
+
+class MemoryPubSub:
+    """Subscriber side of ``MemoryRedis`` pub/sub, shaped like ``redis.asyncio.client.PubSub``."""
+
+    def __init__(self, hub: "MemoryRedis"):
+        self._hub = hub
+        self._messages: asyncio.Queue[dict] = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._hub._channels.setdefault(channel, set()).add(self)
+            self.channels.add(channel)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self.channels):
+            self._hub._channels.get(channel, set()).discard(self)
+            self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0) -> dict | None:
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class MemoryPipeline:
+    """Buffered commands for ``MemoryRedis``, shaped like ``redis.asyncio.client.Pipeline``."""
+
+    def __init__(self, hub: "MemoryRedis"):
+        self._hub = hub
+        self._commands: list = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self._hub, name)
+
+        def queue(*args, **kwargs) -> "MemoryPipeline":
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class MemoryRedis:
+    """In-process stand-in for the subset of the Redis API the app relies on.
+
+    Used when ``REDIS_URL`` starts with ``memory://`` (tests, single-process dev).
+    Values are stored as bytes to match what ``redis.asyncio`` returns.
+    """
+
+    def __init__(self):
+        self._data: dict[str, bytes] = {}
+        self._expires: dict[str, float] = {}
+        self._channels: dict[str, set[MemoryPubSub]] = {}
+
+    def _alive(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    async def get(self, key: str) -> bytes | None:
+        return self._data[key] if self._alive(key) else None
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [await self.get(k) for k in keys]
+
+    async def set(self, key: str, value, ex: int | None = None, nx: bool = False) -> bool:
+        if nx and self._alive(key):
+            return False
+        self._data[key] = self._encode(value)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(self._data[key]) + amount if self._alive(key) else amount
+        self._data[key] = self._encode(value)
+        return value
+
+    async def publish(self, channel: str, message) -> int:
+        receivers = self._channels.get(channel, set())
+        for pubsub in receivers:
+            pubsub._messages.put_nowait({"type": "message", "channel": channel.encode("utf-8"), "data": self._encode(message)})
+        return len(receivers)
+
+    def pubsub(self) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        return MemoryPipeline(self)
+
+    async def flushdb(self) -> None:
+        self._data.clear()
+        self._expires.clear()
+
+    async def aclose(self) -> None:
+        pass
+
+
+_client: Redis | MemoryRedis | None = None
+
+
+def get_redis() -> Redis | MemoryRedis:
+    global _client
+    if _client is None:
+        if settings.redis_url.startswith(MEMORY_URL_PREFIX):
+            _client = MemoryRedis()
+        else:
+            _client = Redis.from_url(settings.redis_url)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,39 @@
+"""Precompiled JSON encoding for hot read routes.
+
+A route declared with ``response_model=`` and returning ORM instances pays
+twice: SQLAlchemy builds and tracks an instance per row, then FastAPI
+validates every attribute again (``from_attributes``) before encoding. Hot
+routes instead select plain rows with ``columns``, shape them into dicts and
+return ``Serializer.render``: one Rust-side validation of the dicts against
+a ``TypeAdapter`` built at import, and ``dump_json`` straight to bytes. That
+is the adapter and encoder FastAPI uses for ``response_model``, so the body
+is byte-for-byte what the route returned before. Routes keep their
+``response_model`` for the OpenAPI schema.
+"""
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def columns(model, schema: type[BaseModel], exclude: tuple[str, ...] = ()) -> list:
+    """``model``'s columns for ``schema``'s fields, in field order."""
+    return [getattr(model, name) for name in schema.model_fields if name not in exclude]
+
+
+def json_response(body: bytes, response: Response) -> Response:
+    """Already-encoded JSON ``body``, keeping headers dependencies set on ``response`` (ETags)."""
+    out = Response(body, media_type="application/json")
+    out.headers.raw.extend(response.headers.raw)
+    return out
+
+
+class Serializer:
+    def __init__(self, type_: Any):
+        self.adapter = TypeAdapter(type_)
+
+    def encode(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content))
+
+    def render(self, content: Any, response: Response) -> Response:
+        return json_response(self.encode(content), response)
@@ -1,5 +1,8 @@
+import asyncio
 import hashlib
 import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -10,24 +13,83 @@ from app.core.config import settings
 ALGORITHM = "HS256"
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated caller, built from signed access-token claims only."""
 
+    id: int
+    subscription_tier: str
+    timezone: str
+    is_active: bool
+    token_version: int
 
-def verify_password(plain: str, hashed: str) -> bool:
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already queued."""
+
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism while
+# keeping the number of cores spent on hashing bounded per worker process.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+_pending = 0
+
+
+async def _run_password_op(fn, *args):
+    global _pending
+    if _pending >= settings.password_hash_max_pending:
+        raise PasswordHasherBusy()
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+def _hash_password_sync(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def _verify_password_sync(plain: str, hashed: str) -> bool:
+    # The cost factor is read from the stored hash, so hashes made with an
+    # older bcrypt_rounds setting keep verifying.
     return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
 
 
-def create_access_token(user_id: int) -> str:
+async def hash_password(password: str) -> str:
+    return await _run_password_op(_hash_password_sync, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run_password_op(_verify_password_sync, plain, hashed)
+
+
+def create_access_token(user) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    return jwt.encode({"sub": str(user_id), "exp": expire}, settings.secret_key, algorithm=ALGORITHM)
+    claims = {
+        "sub": str(user.id),
+        "tier": user.subscription_tier,
+        "tz": user.timezone,
+        "act": user.is_active,
+        "ver": user.token_version,
+        "exp": expire,
+    }
+    return jwt.encode(claims, settings.secret_key, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> int | None:
+def decode_access_token(token: str) -> Principal | None:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        return int(payload["sub"])
-    except (JWTError, ValueError, KeyError):
+        return Principal(
+            id=int(payload["sub"]),
+            subscription_tier=payload["tier"],
+            timezone=payload["tz"],
+            is_active=bool(payload["act"]),
+            token_version=int(payload["ver"]),
+        )
+    except (JWTError, ValueError, KeyError, TypeError):
         return None
 
 
@@ -37,3 +99,7 @@ def create_refresh_token() -> str:
 
 def hash_token(token: str) -> str:
     return hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_version_key(user_id: int) -> str:
+    return f"user:{user_id}:token_version"
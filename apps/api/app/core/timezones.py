@@ -0,0 +1,15 @@
+"""Users' IANA timezones, with UTC for a missing or unknown name."""
+from datetime import date, datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def zone(name: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def local_today(name: str | None) -> date:
+    """The current date in timezone ``name``."""
+    return datetime.now(zone(name)).date()
@@ -1,11 +1,39 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
 from app.core.config import settings
-from app.api.v1 import auth, personas, schedule, principles, tracker, settings as settings_router, dashboard
+from app.core import metrics
+from app.core.database import engine, pool_stats
+from app.core.redis import close_redis
+from app.api.v1 import auth, personas, schedule, principles, tracker, settings as settings_router, dashboard, calendar, sync, prayer_times, reports, export, imports, analytics, events
+from app.services import reports as report_service
+from app.services.dashboard import snapshot_cache
+from app.services.events import event_broker
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open one pooled connection up front so a bad DATABASE_URL fails the
+    # deploy instead of the first request.
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    logger.info("database pool ready: %s", pool_stats(engine))
+    yield
+    await event_broker.close()
+    await engine.dispose()
+    await close_redis()
+    report_service.shutdown()
 
-app = FastAPI(title="Niyyah API", version="1.0.0", docs_url="/docs", redoc_url="/redoc")
 
+app = FastAPI(title="Niyyah API", version="1.0.0", docs_url="/docs", redoc_url="/redoc", lifespan=lifespan)
+
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins.split(","),
@@ -21,8 +49,36 @@ app.include_router(principles.router, prefix="/api/v1")
 app.include_router(tracker.router, prefix="/api/v1")
 app.include_router(settings_router.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(calendar.router, prefix="/api/v1")
+app.include_router(sync.router, prefix="/api/v1")
+app.include_router(prayer_times.router, prefix="/api/v1")
+app.include_router(reports.router, prefix="/api/v1")
+app.include_router(export.router, prefix="/api/v1")
+app.include_router(imports.router, prefix="/api/v1")
+app.include_router(analytics.router, prefix="/api/v1")
+app.include_router(events.router, prefix="/api/v1")
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/cache")
+async def cache_health():
+    return {"dashboard": snapshot_cache.stats(), "reports": report_service.report_cache.stats()}
+
+
+@app.get("/health/pool")
+async def pool_health():
+    return {"database": pool_stats(engine)}
+
+
+@app.get("/health/events")
+async def events_health():
+    return {"events": event_broker.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
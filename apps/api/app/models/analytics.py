@@ -0,0 +1,39 @@
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class RollupCounts:
+    """Checks in one week (starting Monday), month or year, in total and per weekday."""
+
+    period: Mapped[str] = mapped_column(String(5), nullable=False)  # week/month/year
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    checks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    mon: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    wed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    thu: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fri: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sat: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sun: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class HabitRollup(RollupCounts, Base):
+    __tablename__ = "habit_rollups"
+    __table_args__ = (UniqueConstraint("non_negotiable_id", "period", "period_start"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    non_negotiable_id: Mapped[int] = mapped_column(Integer, ForeignKey("non_negotiables.id"), nullable=False)
+
+
+class UserRollup(RollupCounts, Base):
+    """Sum of a user's ``HabitRollup`` rows for the same period."""
+
+    __tablename__ = "user_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "period", "period_start"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
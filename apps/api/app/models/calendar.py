@@ -0,0 +1,25 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CalendarCache(Base):
+    """Per-user daily completion totals, maintained incrementally by the tracker.
+
+    ``total_habits`` counts the user's non-negotiables that existed on ``date``
+    plus any that were checked that day despite being created later (backdated
+    checks), so a row never reports more completed than total habits.
+    """
+
+    __tablename__ = "calendar_cache"
+    __table_args__ = (UniqueConstraint("user_id", "date"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    total_habits: Mapped[int] = mapped_column(Integer, default=0)
+    completed_habits: Mapped[int] = mapped_column(Integer, default=0)
+    completion_pct: Mapped[float] = mapped_column(Float, default=0.0)
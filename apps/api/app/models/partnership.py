@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Partnership(Base):
+    __tablename__ = "partnerships"
+    __table_args__ = (Index("ix_partnerships_status_frequency_id", "status", "share_frequency", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    inviter_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    partner_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)  # set on accept
+    partner_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    share_frequency: Mapped[str] = mapped_column(String(10), default="weekly")  # daily/weekly/monthly
+    share_level: Mapped[str] = mapped_column(String(20), default="summary")  # full/summary/score_only
+    status: Mapped[str] = mapped_column(String(10), default="pending")  # pending/accepted/declined
+    last_digest_end: Mapped[date | None] = mapped_column(Date, nullable=True)  # last period already queued
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class DigestOutbox(Base):
+    """A rendered digest waiting to be (or already) delivered; one per partnership and period."""
+
+    __tablename__ = "digest_outbox"
+    __table_args__ = (
+        UniqueConstraint("partnership_id", "period_end"),
+        Index("ix_digest_outbox_status_id", "status", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    partnership_id: Mapped[int] = mapped_column(Integer, ForeignKey("partnerships.id", ondelete="CASCADE"), nullable=False)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(10), default="pending")  # pending/sending/sent/failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # set while sending
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class DigestRun(Base):
+    """Checkpoint of one digest run, committed with each batch so a crashed run resumes."""
+
+    __tablename__ = "digest_runs"
+    __table_args__ = (UniqueConstraint("frequency", "period_end"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    frequency: Mapped[str] = mapped_column(String(10), nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    last_partnership_id: Mapped[int] = mapped_column(Integer, default=0)
+    queued: Mapped[int] = mapped_column(Integer, default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
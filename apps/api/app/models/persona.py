@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Date, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, Date, ForeignKey, Index, Integer, JSON, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, RankKey
 
 
 class Persona(Base):
     __tablename__ = "personas"
+    __table_args__ = (
+        Index("ix_personas_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_personas_user_id_rank", "user_id", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -21,13 +25,14 @@ class Persona(Base):
     ritual: Mapped[str | None] = mapped_column(Text, nullable=True)
     guardrail: Mapped[str | None] = mapped_column(Text, nullable=True)
     points: Mapped[dict | None] = mapped_column(JSON, default=list)
-    order: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[str] = mapped_column(RankKey, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="personas", foreign_keys=[user_id])
     milestones: Mapped[list["Milestone"]] = relationship(back_populates="persona", cascade="all, delete-orphan")
@@ -36,6 +41,7 @@ class Persona(Base):
 
 class Milestone(Base):
     __tablename__ = "milestones"
+    __table_args__ = (Index("ix_milestones_persona_id_change_seq", "persona_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     persona_id: Mapped[int] = mapped_column(Integer, ForeignKey("personas.id"), nullable=False, index=True)
@@ -43,12 +49,22 @@ class Milestone(Base):
     goal: Mapped[str] = mapped_column(Text, nullable=False)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     persona: Mapped["Persona"] = relationship(back_populates="milestones", foreign_keys=[persona_id])
 
 
 class ScheduleBlock(Base):
     __tablename__ = "schedule_blocks"
+    __table_args__ = (
+        Index("ix_schedule_blocks_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_schedule_blocks_user_id_rank", "user_id", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -58,8 +74,14 @@ class ScheduleBlock(Base):
     activity: Mapped[str] = mapped_column(String(200), nullable=False)
     day_type: Mapped[str] = mapped_column(String(10), default="weekday")  # weekday/weekend/daily
     is_prayer_block: Mapped[bool] = mapped_column(Boolean, default=False)
-    order: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[str] = mapped_column(RankKey, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     persona: Mapped["Persona"] = relationship(back_populates="schedule_blocks", foreign_keys=[persona_id])
 
@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, RankKey
 
 
 class Principle(Base):
     __tablename__ = "principles"
+    __table_args__ = (
+        Index("ix_principles_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_principles_user_id_rank", "user_id", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -16,13 +20,14 @@ class Principle(Base):
     meaning: Mapped[str] = mapped_column(Text, nullable=False)
     verse: Mapped[str | None] = mapped_column(String(200), nullable=True)
     icon: Mapped[str] = mapped_column(String(50), default="heart")
-    order: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[str] = mapped_column(RankKey, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="principles", foreign_keys=[user_id])
 
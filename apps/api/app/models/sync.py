@@ -0,0 +1,114 @@
+"""Change tracking for delta sync.
+
+Every flush that inserts, updates or deletes a syncable row takes the next
+value of its owner's ``users.change_seq`` (a row-locked per-user counter, so
+values commit in order) and stamps it on the row. Deletes leave a
+``SyncTombstone`` carrying the same sequence number. Bulk UPDATE/DELETE
+statements bypass the ORM and must call ``next_change_seq`` themselves.
+
+Tombstones are kept for ``sync_tombstone_retention_days``, then removed by
+``python -m app.scripts.prune_sync_tombstones``, which records the highest
+pruned sequence in ``users.tombstones_pruned_seq``; a cursor below it may
+have missed deletes, so ``/sync`` answers it with a full sync.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, event, select, update
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.core.database import Base
+
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_sync_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    entity: Mapped[str] = mapped_column(String(30), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+def sync_entities() -> dict[type, str]:
+    from app.models.persona import Milestone, Persona, ScheduleBlock
+    from app.models.principle import Principle
+    from app.models.tracker import NonNegotiable
+    from app.models.user import UserSettings
+
+    return {
+        Persona: "personas",
+        Milestone: "milestones",
+        Principle: "principles",
+        ScheduleBlock: "schedule_blocks",
+        NonNegotiable: "non_negotiables",
+        UserSettings: "settings",
+    }
+
+
+def next_change_seq(conn, user_id: int) -> int | None:
+    """Allocate the next change sequence for ``user_id`` on ``conn`` (sync connection)."""
+    from app.models.user import User
+
+    return conn.execute(
+        update(User).where(User.id == user_id).values(change_seq=User.change_seq + 1).returning(User.change_seq)
+    ).scalar()
+
+
+def _owner(session: Session, obj) -> int | None:
+    from app.models.persona import Milestone, Persona
+
+    if not isinstance(obj, Milestone):
+        return obj.user_id
+    persona = obj.persona if "persona" in obj.__dict__ else None
+    if persona is None:
+        persona = session.identity_map.get(session.identity_key(Persona, obj.persona_id))
+    if persona is not None:
+        return persona.user_id
+    return session.connection().execute(select(Persona.user_id).where(Persona.id == obj.persona_id)).scalar()
+
+
+def _deleted_with(conn, obj, entities: dict[type, str]) -> list[tuple[str, int]]:
+    """``obj`` plus the rows its delete cascades to, which the flush loads too late to see."""
+    from app.models.persona import Milestone, Persona, ScheduleBlock
+
+    deleted = [(entities[type(obj)], obj.id)]
+    if isinstance(obj, Persona):
+        for child in (Milestone, ScheduleBlock):
+            ids = conn.execute(select(child.id).where(child.persona_id == obj.id)).scalars()
+            deleted.extend((entities[child], child_id) for child_id in ids)
+    return deleted
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(session: Session, flush_context, instances) -> None:
+    entities = sync_entities()
+    touched: dict[int, list] = {}
+    removed: dict[int, list] = {}
+    for obj in session.new:
+        if type(obj) in entities:
+            touched.setdefault(_owner(session, obj), []).append(obj)
+    for obj in session.dirty:
+        if type(obj) in entities and session.is_modified(obj, include_collections=False):
+            touched.setdefault(_owner(session, obj), []).append(obj)
+    for obj in session.deleted:
+        if type(obj) in entities:
+            removed.setdefault(_owner(session, obj), []).append(obj)
+
+    conn = session.connection()
+    for user_id in touched.keys() | removed.keys():
+        if user_id is None:
+            continue
+        seq = next_change_seq(conn, user_id)
+        if seq is None:
+            # Owner row is being inserted in this same flush; its first sync is a full one.
+            continue
+        for obj in touched.get(user_id, []):
+            obj.change_seq = seq
+        for obj in removed.get(user_id, []):
+            for entity, entity_id in _deleted_with(conn, obj, entities):
+                session.add(SyncTombstone(user_id=user_id, entity=entity, entity_id=entity_id, change_seq=seq))
@@ -1,24 +1,36 @@
 from datetime import date, datetime, timezone
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, RankKey
 
 
 class NonNegotiable(Base):
     __tablename__ = "non_negotiables"
+    __table_args__ = (
+        Index("ix_non_negotiables_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_non_negotiables_user_id_rank", "user_id", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     category: Mapped[str] = mapped_column(String(20), default="spiritual")  # spiritual/health/growth
-    order: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[str] = mapped_column(RankKey, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="non_negotiables", foreign_keys=[user_id])
     daily_checks: Mapped[list["DailyCheck"]] = relationship(back_populates="non_negotiable", cascade="all, delete-orphan")
+    check_months: Mapped[list["DailyCheckMonth"]] = relationship(cascade="all, delete-orphan")
     streak: Mapped["Streak"] = relationship(back_populates="non_negotiable", uselist=False, cascade="all, delete-orphan")
+    streak_runs: Mapped[list["StreakRun"]] = relationship(cascade="all, delete-orphan")
 
 
 class DailyCheck(Base):
@@ -33,6 +45,16 @@ class DailyCheck(Base):
     non_negotiable: Mapped["NonNegotiable"] = relationship(back_populates="daily_checks", foreign_keys=[non_negotiable_id])
 
 
+class DailyCheckMonth(Base):
+    """Checked days of one habit in one month: bit ``d - 1`` of ``mask`` is day ``d``."""
+
+    __tablename__ = "daily_check_months"
+
+    non_negotiable_id: Mapped[int] = mapped_column(Integer, ForeignKey("non_negotiables.id"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)  # first day of the month
+    mask: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class Streak(Base):
     __tablename__ = "streaks"
 
@@ -41,8 +63,25 @@ class Streak(Base):
     current_streak: Mapped[int] = mapped_column(Integer, default=0)
     longest_streak: Mapped[int] = mapped_column(Integer, default=0)
     last_check_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    grace_days: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     non_negotiable: Mapped["NonNegotiable"] = relationship(back_populates="streak", foreign_keys=[non_negotiable_id])
 
 
+class StreakRun(Base):
+    """A maximal run of checked days for one habit, allowing ``Streak.grace_days`` gaps."""
+
+    __tablename__ = "streak_runs"
+    __table_args__ = (
+        UniqueConstraint("non_negotiable_id", "start_date"),
+        Index("ix_streak_runs_non_negotiable_id_length", "non_negotiable_id", "length"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    non_negotiable_id: Mapped[int] = mapped_column(Integer, ForeignKey("non_negotiables.id"), nullable=False)
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date] = mapped_column(Date, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 from app.models.user import User  # noqa: E402, F401
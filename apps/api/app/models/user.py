@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, Text, event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -16,6 +16,10 @@ class User(Base):
     locale: Mapped[str] = mapped_column(String(10), default="en")
     subscription_tier: Mapped[str] = mapped_column(String(10), default="free")
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # Tombstones up to this change_seq have been pruned; older sync cursors get a full sync
+    tombstones_pruned_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -30,13 +34,25 @@ class User(Base):
     settings: Mapped["UserSettings"] = relationship(back_populates="user", uselist=False, cascade="all, delete-orphan")
 
 
+# Columns carried in access-token claims or guarding them: changing any of these
+# bumps token_version, whatever code makes the change, so outstanding tokens stop working.
+TOKEN_COLUMNS = ("subscription_tier", "is_active", "password_hash")
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, user: User) -> None:
+    state = inspect(user)
+    if any(state.attrs[name].history.has_changes() for name in TOKEN_COLUMNS):
+        user.token_version = (user.token_version or 0) + 1
+
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     token_hash: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     user: Mapped["User"] = relationship(back_populates="refresh_tokens", foreign_keys=[user_id])
@@ -52,6 +68,8 @@ class UserSettings(Base):
     latitude: Mapped[float | None] = mapped_column(nullable=True)
     longitude: Mapped[float | None] = mapped_column(nullable=True)
     theme: Mapped[str] = mapped_column(String(10), default="light")
+    streak_grace_days: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="settings", foreign_keys=[user_id])
 
@@ -60,3 +78,4 @@ class UserSettings(Base):
 from app.models.persona import Persona  # noqa: E402, F401
 from app.models.principle import Principle  # noqa: E402, F401
 from app.models.tracker import NonNegotiable  # noqa: E402, F401
+from app.models import partnership, sync  # noqa: E402, F401
@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class CompletionStats(BaseModel):
+    completed: int
+    possible: int  # habit-days since each habit was created, up to today
+    rate: float
+
+
+class TrendPoint(CompletionStats):
+    start: date
+    end: date
+
+
+class TrendResponse(BaseModel):
+    period: Literal["week", "month", "year"]
+    non_negotiable_id: int | None
+    points: list[TrendPoint]
+
+
+class HabitCompletion(CompletionStats):
+    id: int
+    title: str
+    category: str
+
+
+class CategoryCompletion(CompletionStats):
+    category: str
+
+
+class WeekdayCompletion(CompletionStats):
+    weekday: Literal["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class BreakdownResponse(CompletionStats):
+    start: date
+    end: date
+    habits: list[HabitCompletion]
+    categories: list[CategoryCompletion]
+    weekdays: list[WeekdayCompletion]
@@ -0,0 +1,25 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class CalendarDaySummary(BaseModel):
+    date: date
+    total: int
+    completed: int
+    pct: float
+
+
+class CalendarHabitStatus(BaseModel):
+    non_negotiable_id: int
+    title: str
+    category: str
+    checked: bool
+    check_id: int | None
+
+
+class CalendarDayDetail(BaseModel):
+    date: date
+    total: int
+    completed: int
+    pct: float
+    items: list[CalendarHabitStatus]
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+from app.schemas.persona import PersonaCreate
+from app.schemas.principle import PrincipleCreate
+from app.schemas.schedule import ScheduleBlockCreate
+from app.schemas.tracker import NonNegotiableCreate
+
+# Import rows accept the rows ``GET /export`` writes: unknown columns are
+# ignored, ``id`` is a reference local to the document, and ``persona_id`` /
+# ``non_negotiable_id`` point at ids of rows earlier in the same document.
+
+
+class PersonaImport(PersonaCreate):
+    id: int | None = None
+
+
+class MilestoneImport(BaseModel):
+    persona_id: int
+    goal: str
+    target_date: date | None = None
+    is_completed: bool = False
+
+
+class PrincipleImport(PrincipleCreate):
+    pass
+
+
+class ScheduleBlockImport(ScheduleBlockCreate):
+    pass
+
+
+class NonNegotiableImport(NonNegotiableCreate):
+    id: int | None = None
+    created_at: datetime | None = None  # defaults to the habit's earliest imported check
+
+
+class DailyCheckImport(BaseModel):
+    non_negotiable_id: int
+    check_date: date
+    is_completed: bool = True
+
+
+class ImportIssue(BaseModel):
+    at: str  # "line 12" for NDJSON, "daily_checks[4]" for JSON
+    msg: str
+
+
+class ImportResponse(BaseModel):
+    personas: int
+    milestones: int
+    principles: int
+    schedule_blocks: int
+    non_negotiables: int
+    daily_checks: int
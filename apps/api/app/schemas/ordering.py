@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class ReorderRequest(BaseModel):
+    ids: list[int] = Field(max_length=500)
+
+
+class MoveRequest(BaseModel):
+    after_id: int | None = None  # None moves the item to the front
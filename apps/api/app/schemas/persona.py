@@ -26,7 +26,6 @@ class PersonaUpdate(BaseModel):
     ritual: str | None = None
     guardrail: str | None = None
     points: list[str] | None = None
-    order: int | None = None
 
 
 class PersonaResponse(BaseModel):
@@ -41,7 +40,7 @@ class PersonaResponse(BaseModel):
     ritual: str | None
     guardrail: str | None
     points: list
-    order: int
+    rank: str
     milestones: list["MilestoneResponse"] = []
     created_at: datetime
     updated_at: datetime
@@ -62,7 +61,3 @@ class MilestoneResponse(BaseModel):
     is_completed: bool
 
     model_config = {"from_attributes": True}
-
-
-class ReorderRequest(BaseModel):
-    ids: list[int]
@@ -0,0 +1,19 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class PrayerDay(BaseModel):
+    date: date
+    fajr: str | None  # "HH:MM" local time; None where the sun never reaches the angle
+    sunrise: str | None
+    dhuhr: str | None
+    asr: str | None
+    maghrib: str | None
+    isha: str | None
+
+
+class PrayerBlocksRequest(BaseModel):
+    persona_id: int | None = None  # defaults to the user's first persona
+    for_date: date | None = None  # whose times to use; defaults to today in the user's timezone
+    duration_minutes: int = Field(default=20, ge=5, le=120)
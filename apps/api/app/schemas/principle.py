@@ -16,7 +16,6 @@ class PrincipleUpdate(BaseModel):
     meaning: str | None = None
     verse: str | None = None
     icon: str | None = None
-    order: int | None = None
 
 
 class PrincipleResponse(BaseModel):
@@ -26,7 +25,7 @@ class PrincipleResponse(BaseModel):
     meaning: str
     verse: str | None
     icon: str
-    order: int
+    rank: str
     created_at: datetime
     updated_at: datetime
 
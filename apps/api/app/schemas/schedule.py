@@ -27,6 +27,6 @@ class ScheduleBlockResponse(BaseModel):
     activity: str
     day_type: str
     is_prayer_block: bool
-    order: int
+    rank: str
 
     model_config = {"from_attributes": True}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UserSettingsUpdate(BaseModel):
@@ -7,6 +7,7 @@ class UserSettingsUpdate(BaseModel):
     latitude: float | None = None
     longitude: float | None = None
     theme: str | None = None
+    streak_grace_days: int | None = Field(default=None, ge=0, le=1)
 
 
 class UserSettingsResponse(BaseModel):
@@ -15,5 +16,6 @@ class UserSettingsResponse(BaseModel):
     latitude: float | None
     longitude: float | None
     theme: str
+    streak_grace_days: int
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,63 @@
+from datetime import date, datetime
+from pydantic import BaseModel
+
+from app.schemas.principle import PrincipleResponse
+from app.schemas.schedule import ScheduleBlockResponse
+from app.schemas.settings import UserSettingsResponse
+
+
+class PersonaSyncItem(BaseModel):
+    id: int
+    name: str
+    arabic_name: str
+    domain: str
+    eventually: str
+    icon: str
+    color: str
+    one_thing: str | None
+    ritual: str | None
+    guardrail: str | None
+    points: list
+    rank: str
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class MilestoneSyncItem(BaseModel):
+    id: int
+    persona_id: int
+    target_date: date | None
+    goal: str
+    is_completed: bool
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class NonNegotiableSyncItem(BaseModel):
+    id: int
+    title: str
+    category: str
+    rank: str
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class Tombstone(BaseModel):
+    entity: str
+    id: int
+
+
+class SyncResponse(BaseModel):
+    cursor: str
+    full: bool
+    personas: list[PersonaSyncItem] = []
+    milestones: list[MilestoneSyncItem] = []
+    principles: list[PrincipleResponse] = []
+    schedule_blocks: list[ScheduleBlockResponse] = []
+    non_negotiables: list[NonNegotiableSyncItem] = []
+    settings: UserSettingsResponse | None = None
+    deleted: list[Tombstone] = []
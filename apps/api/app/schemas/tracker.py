@@ -1,5 +1,7 @@
 from datetime import date
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 
 class NonNegotiableCreate(BaseModel):
@@ -10,14 +12,13 @@ class NonNegotiableCreate(BaseModel):
 class NonNegotiableUpdate(BaseModel):
     title: str | None = None
     category: str | None = None
-    order: int | None = None
 
 
 class NonNegotiableResponse(BaseModel):
     id: int
     title: str
     category: str
-    order: int
+    rank: str
     streak: "StreakResponse | None" = None
 
     model_config = {"from_attributes": True}
@@ -49,3 +50,34 @@ class TrackerDayResponse(BaseModel):
     date: date
     checks: list[DailyCheckResponse]
     non_negotiables: list[NonNegotiableResponse]
+
+
+class TrackerRangeResponse(BaseModel):
+    start: date
+    end: date
+    days: int
+    encoding: str
+    ids: list[int]
+    data: list[str] | list[list[int]]
+
+
+class DailyCheckBatchItem(BaseModel):
+    non_negotiable_id: int
+    check_date: date | None = None  # defaults to today
+    op: Literal["check", "uncheck"] = "check"
+
+
+class DailyCheckBatchRequest(BaseModel):
+    items: list[DailyCheckBatchItem] = Field(min_length=1, max_length=500)
+
+
+class DailyCheckBatchResult(BaseModel):
+    non_negotiable_id: int
+    check_date: date
+    op: str
+    status: Literal["created", "deleted", "already_checked", "not_checked", "not_found"]
+    check_id: int | None = None
+
+
+class DailyCheckBatchResponse(BaseModel):
+    results: list[DailyCheckBatchResult]
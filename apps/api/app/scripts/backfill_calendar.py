@@ -0,0 +1,53 @@
+"""Rebuild ``calendar_cache`` from ``daily_checks``.
+
+Processes users in id-ordered chunks, one transaction per chunk, so it can run
+against a live database and be resumed with ``--after-user-id``::
+
+    python -m app.scripts.backfill_calendar --chunk-size 500
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.user import User
+from app.services.calendar import rebuild_days
+
+
+async def backfill(chunk_size: int, after_user_id: int = 0) -> int:
+    total_rows = 0
+    cursor = after_user_id
+    while True:
+        async with async_session() as db:
+            user_ids = list(
+                (await db.execute(select(User.id).where(User.id > cursor).order_by(User.id).limit(chunk_size))).scalars()
+            )
+            if not user_ids:
+                break
+            rows = await rebuild_days(db, user_ids)
+            await db.commit()
+        total_rows += rows
+        cursor = user_ids[-1]
+        print(f"users <= {cursor}: {rows} rows")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill calendar_cache from daily_checks")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--after-user-id", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            total = await backfill(args.chunk_size, args.after_user_id)
+            print(f"done: {total} rows")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Copy ``daily_checks`` into the monthly bitmaps in ``daily_check_months``.
+
+Run with ``CHECK_STORAGE=dual`` already deployed so new checks are written to
+both tables. Processes habits in id-ordered chunks, one transaction per chunk,
+and can be resumed with ``--after-habit-id``. ``--dry-run`` only compares the
+two storages and reports months that differ; switch to ``CHECK_STORAGE=bitmap``
+once a dry run reports none. A check written while its chunk is being copied
+can leave one month behind, which the next pass corrects::
+
+    python -m app.scripts.backfill_check_months --chunk-size 1000
+    python -m app.scripts.backfill_check_months --dry-run
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.tracker import NonNegotiable
+from app.services.check_months import backfill
+
+
+async def run_backfill(chunk_size: int, after_habit_id: int = 0, dry_run: bool = False) -> int:
+    total = 0
+    cursor = after_habit_id
+    while True:
+        async with async_session() as db:
+            habit_ids = list(
+                (
+                    await db.execute(
+                        select(NonNegotiable.id).where(NonNegotiable.id > cursor).order_by(NonNegotiable.id).limit(chunk_size)
+                    )
+                ).scalars()
+            )
+            if not habit_ids:
+                break
+            months = await backfill(db, habit_ids, dry_run=dry_run)
+            await db.commit()
+        total += months
+        cursor = habit_ids[-1]
+        print(f"habits <= {cursor}: {months} months {'differ' if dry_run else 'written'}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill daily_check_months from daily_checks")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--after-habit-id", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="compare only; exit 1 if any month differs")
+    args = parser.parse_args()
+
+    async def run() -> int:
+        try:
+            total = await run_backfill(args.chunk_size, args.after_habit_id, args.dry_run)
+            print(f"done: {total} months {'differ' if args.dry_run else 'written'}")
+            return total
+        finally:
+            await engine.dispose()
+
+    if asyncio.run(run()) and args.dry_run:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
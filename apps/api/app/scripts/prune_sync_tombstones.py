@@ -0,0 +1,67 @@
+"""Delete sync tombstones older than the retention period.
+
+For each user with tombstones deleted before the cutoff, removes every
+tombstone up to the newest of them and raises ``users.tombstones_pruned_seq``
+to its sequence, so ``/sync`` sends a full sync to any cursor that may have
+missed them. One transaction per batch of users; safe to run from cron::
+
+    python -m app.scripts.prune_sync_tombstones --batch-size 500
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session, engine
+from app.models.sync import SyncTombstone
+from app.models.user import User
+
+
+async def prune(session_factory: async_sessionmaker, cutoff: datetime, batch_size: int) -> dict:
+    users = pruned = 0
+    expired = (
+        select(SyncTombstone.user_id, func.max(SyncTombstone.change_seq))
+        .where(SyncTombstone.deleted_at < cutoff)
+        .group_by(SyncTombstone.user_id)
+        .order_by(SyncTombstone.user_id)
+        .limit(batch_size)
+    )
+    while True:
+        async with session_factory() as db:
+            batch = (await db.execute(expired)).all()
+            if not batch:
+                break
+            for user_id, seq in batch:
+                # Raise the floor before the tombstones go, in the same transaction
+                await db.execute(
+                    update(User).where(User.id == user_id, User.tombstones_pruned_seq < seq).values(tombstones_pruned_seq=seq)
+                )
+                result = await db.execute(delete(SyncTombstone).where(SyncTombstone.user_id == user_id, SyncTombstone.change_seq <= seq))
+                pruned += result.rowcount
+            await db.commit()
+        users += len(batch)
+        print(f"users <= {batch[-1].user_id}: tombstones pruned for {len(batch)}")
+    return {"users": users, "tombstones": pruned}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete sync tombstones older than the retention period")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--retention-days", type=int, default=settings.sync_tombstone_retention_days)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=args.retention_days)
+            print(f"done: {await prune(async_session, cutoff, args.batch_size)}")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
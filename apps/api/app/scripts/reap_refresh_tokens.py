@@ -0,0 +1,83 @@
+"""Drain the ``refresh_tokens`` table.
+
+Deletes expired rows in batches, one transaction per batch. With
+``--migrate`` unexpired rows are also copied into the Redis token store
+(keeping their remaining lifetime) and deleted, which empties the table
+after moving to ``REFRESH_TOKEN_STORE=redis``::
+
+    python -m app.scripts.reap_refresh_tokens --migrate --batch-size 1000
+
+Safe to run repeatedly, e.g. from cron while the database store is in use.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import async_session, engine
+from app.core.redis import close_redis, get_redis
+from app.models.user import RefreshToken
+from app.services.tokens import refresh_key
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes for timezone-aware columns; they are UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+async def reap(session_factory: async_sessionmaker, batch_size: int, migrate: bool = False) -> dict:
+    reaped = migrated = 0
+    now = datetime.now(timezone.utc)
+    expired = select(RefreshToken.id).where(RefreshToken.expires_at <= now).order_by(RefreshToken.id).limit(batch_size)
+    while True:
+        async with session_factory() as db:
+            result = await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(expired.scalar_subquery())))
+            await db.commit()
+        if not result.rowcount:
+            break
+        reaped += result.rowcount
+        print(f"{result.rowcount} expired deleted")
+
+    live = (
+        select(RefreshToken.id, RefreshToken.user_id, RefreshToken.token_hash, RefreshToken.expires_at)
+        .where(RefreshToken.expires_at > now)
+        .order_by(RefreshToken.id)
+        .limit(batch_size)
+    )
+    while migrate:
+        async with session_factory() as db:
+            rows = (await db.execute(live)).all()
+            if not rows:
+                break
+            pipe = get_redis().pipeline(transaction=False)
+            for row in rows:
+                ttl = int((_aware(row.expires_at) - now).total_seconds()) + 1
+                pipe.set(refresh_key(row.token_hash), row.user_id, ex=ttl)
+            await pipe.execute()
+            await db.execute(delete(RefreshToken).where(RefreshToken.id.in_([row.id for row in rows])))
+            await db.commit()
+        migrated += len(rows)
+        print(f"ids <= {rows[-1].id}: {len(rows)} moved to redis")
+    return {"reaped": reaped, "migrated": migrated}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired refresh tokens, optionally moving live ones to Redis")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--migrate", action="store_true", help="also move unexpired tokens into Redis")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            print(f"done: {await reap(async_session, args.batch_size, args.migrate)}")
+        finally:
+            await engine.dispose()
+            await close_redis()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
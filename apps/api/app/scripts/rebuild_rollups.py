@@ -0,0 +1,53 @@
+"""Rebuild the analytics rollups (``habit_rollups``, ``user_rollups``) from ``daily_checks``.
+
+Processes users in id-ordered chunks, one transaction per chunk, so it can run
+against a live database and be resumed with ``--after-user-id``::
+
+    python -m app.scripts.rebuild_rollups --chunk-size 500
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.user import User
+from app.services.analytics import rebuild
+
+
+async def rebuild_users(chunk_size: int, after_user_id: int = 0) -> int:
+    total_rows = 0
+    cursor = after_user_id
+    while True:
+        async with async_session() as db:
+            user_ids = list(
+                (await db.execute(select(User.id).where(User.id > cursor).order_by(User.id).limit(chunk_size))).scalars()
+            )
+            if not user_ids:
+                break
+            rows = await rebuild(db, user_ids)
+            await db.commit()
+        total_rows += rows
+        cursor = user_ids[-1]
+        print(f"users <= {cursor}: {rows} habit rollup rows")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from daily_checks")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--after-user-id", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            total = await rebuild_users(args.chunk_size, args.after_user_id)
+            print(f"done: {total} rows")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
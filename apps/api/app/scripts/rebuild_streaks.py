@@ -0,0 +1,57 @@
+"""Rebuild ``streak_runs`` and ``streaks`` summaries from ``daily_checks``.
+
+Processes habits in id-ordered chunks, one transaction per chunk::
+
+    python -m app.scripts.rebuild_streaks --chunk-size 1000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.tracker import Streak
+from app.services.streaks import rebuild
+
+
+async def rebuild_all(chunk_size: int, after_id: int = 0) -> int:
+    done = 0
+    cursor = after_id
+    while True:
+        async with async_session() as db:
+            batch = list(
+                (
+                    await db.execute(
+                        select(Streak).where(Streak.non_negotiable_id > cursor).order_by(Streak.non_negotiable_id).limit(chunk_size)
+                    )
+                ).scalars()
+            )
+            if not batch:
+                break
+            for streak in batch:
+                await rebuild(db, streak)
+            await db.commit()
+        done += len(batch)
+        cursor = batch[-1].non_negotiable_id
+        print(f"habits <= {cursor}: {len(batch)} rebuilt")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild streak run indexes from daily_checks")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--after-id", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            total = await rebuild_all(args.chunk_size, args.after_id)
+            print(f"done: {total} habits")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
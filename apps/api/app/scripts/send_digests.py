@@ -0,0 +1,42 @@
+"""Queue and deliver accountability-partner digests.
+
+Meant to run once a day from cron; each frequency only queues when a new
+period has completed, and a crashed run resumes from its checkpoint::
+
+    python -m app.scripts.send_digests
+    python -m app.scripts.send_digests --frequency weekly --date 2026-03-09 --skip-delivery
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.core.config import settings
+from app.core.database import async_session, engine
+from app.services.digests import FREQUENCIES, deliver_digests, queue_digests
+from app.services.mail import SmtpSender
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue and deliver partner digests")
+    parser.add_argument("--frequency", choices=FREQUENCIES, action="append", help="default: all")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="run as if today were this date")
+    parser.add_argument("--batch-size", type=int, default=settings.digest_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.digest_send_concurrency)
+    parser.add_argument("--skip-delivery", action="store_true", help="only fill the outbox")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            for frequency in args.frequency or FREQUENCIES:
+                print(await queue_digests(async_session, frequency, args.date, args.batch_size))
+            if not args.skip_delivery:
+                sender = SmtpSender.from_settings()
+                print(await deliver_digests(async_session, sender, args.concurrency, args.batch_size, settings.digest_max_attempts))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Change a user's subscription tier, status or password from the command line.
+
+Goes through ``app.services.auth.update_account``, so the user's outstanding
+access tokens are revoked and clients refresh into the new claims::
+
+    python -m app.scripts.update_account user@example.com --tier premium
+    python -m app.scripts.update_account user@example.com --deactivate
+    python -m app.scripts.update_account user@example.com --password   # prompts
+"""
+import argparse
+import asyncio
+import getpass
+import sys
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.user import User
+from app.services.auth import update_account
+
+
+async def apply(email: str, tier: str | None, active: bool | None, password: str | None) -> bool:
+    async with async_session() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+        if user is None:
+            return False
+        await update_account(db, user, subscription_tier=tier, is_active=active, password=password)
+        print(f"user {user.id}: tier={user.subscription_tier} active={user.is_active} token_version={user.token_version}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Change a user's tier, status or password")
+    parser.add_argument("email")
+    parser.add_argument("--tier")
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument("--activate", dest="active", action="store_true", default=None)
+    status.add_argument("--deactivate", dest="active", action="store_false")
+    parser.add_argument("--password", action="store_true", help="prompt for a new password")
+    args = parser.parse_args()
+    password = getpass.getpass("New password: ") if args.password else None
+
+    async def run():
+        try:
+            return await apply(args.email, args.tier, args.active, password)
+        finally:
+            await engine.dispose()
+
+    if not asyncio.run(run()):
+        sys.exit(f"no user with email {args.email}")
+
+
+if __name__ == "__main__":
+    main()
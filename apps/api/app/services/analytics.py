@@ -0,0 +1,275 @@
+"""Completion analytics from weekly, monthly and yearly rollups.
+
+Every tracker write adds its check delta to the week, month and year rows of
+the habit (``habit_rollups``) and of its user (``user_rollups``): two
+multi-row upserts per write, whatever the batch size. ``rebuild`` recomputes
+a user's rows from ``daily_checks`` for bulk writes and the batch job.
+
+Reads never touch the check history. A trend reads one row per point. An
+arbitrary ``[lo, hi]`` range is covered by whole years, months and Monday
+weeks plus at most a few edge days (``cover``), so a breakdown reads a
+handful of rows per habit whatever the length of the range. Possible days
+are worked out from each habit's creation date; a habit checked on more days
+than that allows (backdated checks) counts its checked days as possible.
+"""
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.analytics import HabitRollup, UserRollup
+from app.models.tracker import DailyCheck, NonNegotiable
+
+PERIODS = ("week", "month", "year")
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")  # date.weekday() order
+COUNTERS = ("checks", *WEEKDAYS)
+BATCH = 500
+
+Unit = tuple[str, date]
+
+
+def period_start(period: str, day: date) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def period_end(period: str, start: date) -> date:
+    if period == "week":
+        return start + timedelta(days=6)
+    if period == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start.replace(month=12, day=31)
+
+
+def period_count(period: str, lo: date, hi: date) -> int:
+    """Number of ``period``s overlapping ``[lo, hi]``."""
+    first, last = period_start(period, lo), period_start(period, hi)
+    if period == "week":
+        return (last - first).days // 7 + 1
+    if period == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return last.year - first.year + 1
+
+
+def cover(lo: date, hi: date) -> tuple[list[Unit], list[date]]:
+    """Split ``[lo, hi]`` into whole rollup periods, largest first, and leftover days.
+
+    A week is only used where it does not cross into a month that fits the
+    range whole, so a range needs at most ~4 weeks and ~12 days at each end.
+    """
+    units: list[Unit] = []
+    days: list[date] = []
+    day = lo
+    while day <= hi:
+        for period in ("year", "month", "week"):
+            if period_start(period, day) != day or period_end(period, day) > hi:
+                continue
+            end = period_end(period, day)
+            if period == "week" and end.month != day.month and period_end("month", end.replace(day=1)) <= hi:
+                continue
+            units.append((period, day))
+            day = end + timedelta(days=1)
+            break
+        else:
+            days.append(day)
+            day += timedelta(days=1)
+    return units, days
+
+
+def weekday_counts(lo: date, hi: date) -> list[int]:
+    """Number of Mondays, Tuesdays, ... in ``[lo, hi]``."""
+    total = (hi - lo).days + 1
+    if total <= 0:
+        return [0] * 7
+    counts = [total // 7] * 7
+    for i in range(total % 7):
+        counts[(lo.weekday() + i) % 7] += 1
+    return counts
+
+
+def _deltas(changes: Iterable[tuple[int, date, int]]) -> dict[tuple[int, str, date], Counter]:
+    out: dict[tuple[int, str, date], Counter] = defaultdict(Counter)
+    for nn_id, day, delta in changes:
+        for period in PERIODS:
+            counts = out[(nn_id, period, period_start(period, day))]
+            counts["checks"] += delta
+            counts[WEEKDAYS[day.weekday()]] += delta
+    return out
+
+
+async def _add(db: AsyncSession, model, key: str, rows: list[dict]) -> None:
+    """Add each row's counters to its period row, creating the row if needed."""
+    for start in range(0, len(rows), BATCH):
+        stmt = upsert(db, model).values(rows[start:start + BATCH])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[getattr(model, key), model.period, model.period_start],
+            set_={c: getattr(model, c) + getattr(stmt.excluded, c) for c in COUNTERS},
+        ))
+
+
+def _rows(key: str, deltas: dict[tuple[int, str, date], Counter]) -> list[dict]:
+    return [
+        {key: owner, "period": period, "period_start": start, **{c: counts[c] for c in COUNTERS}}
+        for (owner, period, start), counts in deltas.items()
+        if any(counts.values())
+    ]
+
+
+async def record_checks(db: AsyncSession, user_id: int, changes: Iterable[tuple[int, date, int]]) -> None:
+    """Apply ``(habit id, day, +1 or -1)`` check changes of ``user_id``'s habits."""
+    habit = _deltas(changes)
+    user: dict[tuple[int, str, date], Counter] = defaultdict(Counter)
+    for (_, period, start), counts in habit.items():
+        user[(user_id, period, start)].update(counts)
+    if rows := _rows("non_negotiable_id", habit):
+        await _add(db, HabitRollup, "non_negotiable_id", rows)
+        await _add(db, UserRollup, "user_id", _rows("user_id", user))
+
+
+async def record_habit_deleted(db: AsyncSession, nn: NonNegotiable) -> None:
+    """Drop a habit's rollups and take them out of its user's. Must run before the habit is deleted."""
+    removed = await db.execute(
+        delete(HabitRollup)
+        .where(HabitRollup.non_negotiable_id == nn.id)
+        .returning(HabitRollup.period, HabitRollup.period_start, *(getattr(HabitRollup, c) for c in COUNTERS))
+    )
+    rows = [
+        {"user_id": nn.user_id, "period": period, "period_start": start, **{c: -n for c, n in zip(COUNTERS, counts)}}
+        for period, start, *counts in removed
+    ]
+    await _add(db, UserRollup, "user_id", rows)
+
+
+async def rebuild(db: AsyncSession, user_ids: list[int]) -> int:
+    """Recompute every rollup row of ``user_ids`` from ``daily_checks``; returns habit rows written."""
+    habits = select(NonNegotiable.id).where(NonNegotiable.user_id.in_(user_ids))
+    checks = await db.execute(
+        select(NonNegotiable.user_id, DailyCheck.non_negotiable_id, DailyCheck.check_date)
+        .join(NonNegotiable, NonNegotiable.id == DailyCheck.non_negotiable_id)
+        .where(NonNegotiable.user_id.in_(user_ids), DailyCheck.is_completed.is_(True))
+    )
+    owners: dict[int, int] = {}
+    changes = []
+    for user_id, nn_id, day in checks:
+        owners[nn_id] = user_id
+        changes.append((nn_id, day, 1))
+    habit = _deltas(changes)
+    user: dict[tuple[int, str, date], Counter] = defaultdict(Counter)
+    for (nn_id, period, start), counts in habit.items():
+        user[(owners[nn_id], period, start)].update(counts)
+
+    await db.execute(delete(HabitRollup).where(HabitRollup.non_negotiable_id.in_(habits)))
+    await db.execute(delete(UserRollup).where(UserRollup.user_id.in_(user_ids)))
+    habit_rows, user_rows = _rows("non_negotiable_id", habit), _rows("user_id", user)
+    for model, rows in ((HabitRollup, habit_rows), (UserRollup, user_rows)):
+        for start in range(0, len(rows), BATCH):
+            await db.execute(model.__table__.insert(), rows[start:start + BATCH])
+    return len(habit_rows)
+
+
+# Reads
+
+
+def _rate(completed: int, possible: int) -> dict:
+    possible = max(possible, completed)
+    return {"completed": completed, "possible": possible, "rate": round(completed / possible, 4) if possible else 0.0}
+
+
+def _tally(bucket: Counter, stats: dict) -> None:
+    bucket["completed"] += stats["completed"]
+    bucket["possible"] += stats["possible"]
+
+
+def _active(created: date, lo: date, hi: date, today: date) -> tuple[date, date]:
+    return max(lo, created), min(hi, today)
+
+
+async def _habits(db: AsyncSession, user_id: int, nn_id: int | None = None) -> list:
+    query = (
+        select(NonNegotiable.id, NonNegotiable.title, NonNegotiable.category, NonNegotiable.created_at)
+        .where(NonNegotiable.user_id == user_id)
+        .order_by(NonNegotiable.rank, NonNegotiable.id)
+    )
+    if nn_id is not None:
+        query = query.where(NonNegotiable.id == nn_id)
+    return (await db.execute(query)).all()
+
+
+async def trend(db: AsyncSession, user_id: int, period: str, lo: date, hi: date, today: date, nn_id: int | None = None) -> list[dict] | None:
+    """One point per ``period`` overlapping ``[lo, hi]``, for the user or one habit (None if not theirs)."""
+    habits = await _habits(db, user_id, nn_id)
+    if nn_id is not None and not habits:
+        return None
+    starts = [period_start(period, lo)]
+    while (nxt := period_end(period, starts[-1]) + timedelta(days=1)) <= hi:
+        starts.append(nxt)
+    model, owner = (HabitRollup, HabitRollup.non_negotiable_id == nn_id) if nn_id is not None else (UserRollup, UserRollup.user_id == user_id)
+    rows = await db.execute(
+        select(model.period_start, model.checks).where(owner, model.period == period, model.period_start.between(starts[0], starts[-1]))
+    )
+    completed = dict(rows.all())
+    points = []
+    for start in starts:
+        end = period_end(period, start)
+        possible = 0
+        for habit in habits:
+            first, last = _active(habit.created_at.date(), start, end, today)
+            possible += max((last - first).days + 1, 0)
+        points.append({"start": start, "end": end, **_rate(completed.get(start, 0), possible)})
+    return points
+
+
+async def breakdown(db: AsyncSession, user_id: int, lo: date, hi: date, today: date) -> dict:
+    """Completion over ``[lo, hi]`` in total, per habit, per category and per weekday."""
+    habits = await _habits(db, user_id)
+    ids = [h.id for h in habits]
+    units, days = cover(lo, hi)
+    counts: dict[int, Counter] = defaultdict(Counter)
+    if ids and units:
+        by_period: dict[str, list[date]] = defaultdict(list)
+        for period, start in units:
+            by_period[period].append(start)
+        rows = await db.execute(
+            select(HabitRollup.non_negotiable_id, *(getattr(HabitRollup, c) for c in COUNTERS)).where(
+                HabitRollup.non_negotiable_id.in_(ids),
+                or_(*(and_(HabitRollup.period == p, HabitRollup.period_start.in_(s)) for p, s in by_period.items())),
+            )
+        )
+        for nn_id, *values in rows:
+            counts[nn_id].update(dict(zip(COUNTERS, values)))
+    if ids and days:
+        rows = await db.execute(
+            select(DailyCheck.non_negotiable_id, DailyCheck.check_date, func.count())
+            .where(DailyCheck.non_negotiable_id.in_(ids), DailyCheck.check_date.in_(days), DailyCheck.is_completed.is_(True))
+            .group_by(DailyCheck.non_negotiable_id, DailyCheck.check_date)
+        )
+        for nn_id, day, n in rows:
+            counts[nn_id].update({"checks": n, WEEKDAYS[day.weekday()]: n})
+
+    per_habit, categories = [], defaultdict(Counter)
+    weekdays = [Counter() for _ in WEEKDAYS]
+    total = Counter()
+    for habit in habits:
+        first, last = _active(habit.created_at.date(), lo, hi, today)
+        possible = weekday_counts(first, last)
+        got = counts[habit.id]
+        stats = _rate(got["checks"], sum(possible))
+        per_habit.append({"id": habit.id, "title": habit.title, "category": habit.category, **stats})
+        _tally(categories[habit.category], stats)
+        _tally(total, stats)
+        for i, name in enumerate(WEEKDAYS):
+            _tally(weekdays[i], _rate(got[name], possible[i]))
+    return {
+        "start": lo,
+        "end": hi,
+        **_rate(total["completed"], total["possible"]),
+        "habits": per_habit,
+        "categories": [{"category": c, **_rate(v["completed"], v["possible"])} for c, v in sorted(categories.items())],
+        "weekdays": [{"weekday": name, **_rate(v["completed"], v["possible"])} for name, v in zip(WEEKDAYS, weekdays)],
+    }
@@ -1,21 +1,29 @@
-from datetime import datetime, timedelta, timezone
+import logging
 
-from sqlalchemy import delete, select
+from redis.exceptions import RedisError
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.redis import get_redis
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     hash_password,
     hash_token,
+    token_version_key,
     verify_password,
 )
-from app.models.user import RefreshToken, User, UserSettings
+from app.models.user import User, UserSettings
+from app.services.tokens import get_token_store
+
+logger = logging.getLogger(__name__)
+
+# Mirrored versions expire so a missed publish heals: a missing key is re-read from users.
+TOKEN_VERSION_TTL_SECONDS = 24 * 3600
 
 
 async def register_user(db: AsyncSession, email: str, password: str, tz: str = "UTC") -> User:
-    user = User(email=email, password_hash=hash_password(password), timezone=tz)
+    user = User(email=email, password_hash=await hash_password(password), timezone=tz)
     db.add(user)
     await db.flush()
     db.add(UserSettings(user_id=user.id))
@@ -27,42 +35,73 @@ async def register_user(db: AsyncSession, email: str, password: str, tz: str = "
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
-    if user and verify_password(password, user.password_hash):
+    if user and user.is_active and await verify_password(password, user.password_hash):
         return user
     return None
 
 
+async def publish_token_version(user_id: int, version: int) -> None:
+    try:
+        await get_redis().set(token_version_key(user_id), version, ex=TOKEN_VERSION_TTL_SECONDS)
+    except RedisError:
+        logger.warning("failed to publish token version for user %s", user_id, exc_info=True)
+
+
+async def bump_token_version(db: AsyncSession, user: User) -> None:
+    """Invalidate outstanding access tokens without changing anything else (sign out everywhere)."""
+    user.token_version += 1
+    await db.commit()
+    await publish_token_version(user.id, user.token_version)
+
+
+async def update_account(
+    db: AsyncSession,
+    user: User,
+    *,
+    subscription_tier: str | None = None,
+    is_active: bool | None = None,
+    password: str | None = None,
+) -> None:
+    """Change a user's tier, status or password; their outstanding access tokens stop working.
+
+    The version bump itself happens on flush (see ``app.models.user``); this
+    commits and publishes it so revocation takes effect immediately.
+    """
+    if subscription_tier is not None:
+        user.subscription_tier = subscription_tier
+    if is_active is not None:
+        user.is_active = is_active
+    if password is not None:
+        user.password_hash = await hash_password(password)
+    await db.commit()
+    await publish_token_version(user.id, user.token_version)
+
+
+def _token_response(user: User, raw_refresh: str) -> dict:
+    return {"access_token": create_access_token(user), "token_type": "bearer", "refresh_token": raw_refresh}
+
+
 async def create_tokens(db: AsyncSession, user: User) -> dict:
-    access_token = create_access_token(user.id)
+    await publish_token_version(user.id, user.token_version)
     raw_refresh = create_refresh_token()
-    expires = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
-    rt = RefreshToken(user_id=user.id, token_hash=hash_token(raw_refresh), expires_at=expires)
-    db.add(rt)
-    await db.commit()
-    return {"access_token": access_token, "token_type": "bearer", "refresh_token": raw_refresh}
+    await get_token_store(db).issue(user.id, hash_token(raw_refresh))
+    return _token_response(user, raw_refresh)
 
 
 async def refresh_tokens(db: AsyncSession, raw_refresh: str) -> dict | None:
-    hashed = hash_token(raw_refresh)
-    result = await db.execute(
-        select(RefreshToken).where(
-            RefreshToken.token_hash == hashed,
-            RefreshToken.expires_at > datetime.now(timezone.utc),
-        )
-    )
-    rt = result.scalar_one_or_none()
-    if not rt:
+    """Rotate ``raw_refresh``: it stops working and a new pair is returned."""
+    store = get_token_store(db)
+    new_refresh = create_refresh_token()
+    user_id = await store.rotate(hash_token(raw_refresh), hash_token(new_refresh))
+    if user_id is None:
         return None
-    user_result = await db.execute(select(User).where(User.id == rt.user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
+    user = await db.get(User, user_id)
+    if not user or not user.is_active:
+        await store.revoke(hash_token(new_refresh))
         return None
-    await db.delete(rt)
-    await db.commit()
-    return await create_tokens(db, user)
+    await publish_token_version(user.id, user.token_version)
+    return _token_response(user, new_refresh)
 
 
 async def revoke_refresh_token(db: AsyncSession, raw_refresh: str) -> None:
-    hashed = hash_token(raw_refresh)
-    await db.execute(delete(RefreshToken).where(RefreshToken.token_hash == hashed))
-    await db.commit()
+    await get_token_store(db).revoke(hash_token(raw_refresh))
@@ -0,0 +1,53 @@
+"""Compact encodings for per-habit day series.
+
+Day ``i`` of a series is ``start + i days``. Bitsets are LSB-first within each
+byte and base64 encoded; run-length encodings alternate unchecked/checked run
+lengths, always starting with an (possibly empty) unchecked run.
+"""
+import base64
+from collections.abc import Iterable
+
+
+def pack(offsets: Iterable[int], length: int) -> bytes:
+    buf = bytearray((length + 7) // 8)
+    for i in offsets:
+        if 0 <= i < length:
+            buf[i >> 3] |= 1 << (i & 7)
+    return bytes(buf)
+
+
+def unpack(data: bytes, length: int) -> list[int]:
+    return [i for i in range(length) if data[i >> 3] >> (i & 7) & 1]
+
+
+def encode_bitset(offsets: Iterable[int], length: int) -> str:
+    return base64.b64encode(pack(offsets, length)).decode("ascii")
+
+
+def decode_bitset(encoded: str, length: int) -> list[int]:
+    return unpack(base64.b64decode(encoded), length)
+
+
+def encode_rle(offsets: Iterable[int], length: int) -> list[int]:
+    runs: list[int] = []
+    state, run = False, 0
+    checked = set(offsets)
+    for i in range(length):
+        bit = i in checked
+        if bit == state:
+            run += 1
+        else:
+            runs.append(run)
+            state, run = bit, 1
+    runs.append(run)
+    return runs
+
+
+def decode_rle(runs: list[int]) -> list[int]:
+    offsets, pos, state = [], 0, False
+    for run in runs:
+        if state:
+            offsets.extend(range(pos, pos + run))
+        pos += run
+        state = not state
+    return offsets
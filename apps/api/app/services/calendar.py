@@ -0,0 +1,137 @@
+"""Incremental maintenance of ``calendar_cache``.
+
+Every tracker write adjusts the affected rows with a single UPDATE/UPSERT so
+month views stay a plain range scan over ``(user_id, date)``.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.calendar import CalendarCache
+from app.models.tracker import DailyCheck, NonNegotiable
+
+
+def _pct(completed, total):
+    return case((total > 0, completed * 100.0 / total), else_=0.0)
+
+
+def _end_of_day(day: date) -> datetime:
+    return datetime.combine(day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+
+def _created_on(nn: NonNegotiable) -> date:
+    return nn.created_at.date()
+
+
+def _adjust(total_delta, completed_delta) -> dict:
+    total = CalendarCache.total_habits + total_delta
+    completed = CalendarCache.completed_habits + completed_delta
+    return {
+        CalendarCache.total_habits: total,
+        CalendarCache.completed_habits: completed,
+        CalendarCache.completion_pct: _pct(completed, total),
+    }
+
+
+async def record_check(db: AsyncSession, nn: NonNegotiable, day: date) -> None:
+    backdated = 1 if _created_on(nn) > day else 0
+    existing_habits = (
+        select(func.count(NonNegotiable.id))
+        .where(NonNegotiable.user_id == nn.user_id, NonNegotiable.created_at < _end_of_day(day))
+        .scalar_subquery()
+    )
+    total = existing_habits + backdated
+    stmt = upsert(db, CalendarCache).values(
+        user_id=nn.user_id,
+        date=day,
+        total_habits=total,
+        completed_habits=1,
+        completion_pct=_pct(1, total),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalendarCache.user_id, CalendarCache.date],
+        set_={col.key: value for col, value in _adjust(backdated, 1).items()},
+    )
+    await db.execute(stmt)
+
+
+async def record_uncheck(db: AsyncSession, nn: NonNegotiable, day: date) -> None:
+    backdated = 1 if _created_on(nn) > day else 0
+    await db.execute(
+        update(CalendarCache)
+        .where(CalendarCache.user_id == nn.user_id, CalendarCache.date == day)
+        .values(_adjust(-backdated, -1))
+    )
+
+
+async def record_habit_created(db: AsyncSession, nn: NonNegotiable) -> None:
+    await db.execute(
+        update(CalendarCache)
+        .where(CalendarCache.user_id == nn.user_id, CalendarCache.date >= _created_on(nn))
+        .values(_adjust(1, 0))
+    )
+
+
+async def record_habit_deleted(db: AsyncSession, nn: NonNegotiable) -> None:
+    """Remove a habit from every cached day. Must run before its checks are deleted."""
+    checked_days = select(DailyCheck.check_date).where(DailyCheck.non_negotiable_id == nn.id)
+    was_checked = CalendarCache.date.in_(checked_days)
+    await db.execute(
+        update(CalendarCache)
+        .where(CalendarCache.user_id == nn.user_id, or_(CalendarCache.date >= _created_on(nn), was_checked))
+        .values(_adjust(-1, case((was_checked, -1), else_=0)))
+    )
+
+
+def _summarize(habits: list[tuple[int, date]], checks: list[tuple[int, date]]) -> dict[date, tuple[int, int]]:
+    """Compute ``{day: (total, completed)}`` for every day that has at least one check."""
+    created = dict(habits)
+    by_day: dict[date, set[int]] = defaultdict(set)
+    for nn_id, day in checks:
+        by_day[day].add(nn_id)
+    out = {}
+    for day, checked in by_day.items():
+        existing = sum(1 for c in created.values() if c <= day)
+        late = sum(1 for nn_id in checked if created[nn_id] > day)
+        out[day] = (existing + late, len(checked))
+    return out
+
+
+async def rebuild_days(db: AsyncSession, user_ids: list[int], days: set[date] | None = None) -> int:
+    """Recompute cache rows from ``daily_checks`` for the given users (optionally only ``days``)."""
+    habit_rows = (
+        await db.execute(
+            select(NonNegotiable.id, NonNegotiable.user_id, NonNegotiable.created_at).where(NonNegotiable.user_id.in_(user_ids))
+        )
+    ).all()
+    check_q = (
+        select(DailyCheck.non_negotiable_id, DailyCheck.check_date, NonNegotiable.user_id)
+        .join(NonNegotiable)
+        .where(NonNegotiable.user_id.in_(user_ids), DailyCheck.is_completed.is_(True))
+    )
+    clear_q = delete(CalendarCache).where(CalendarCache.user_id.in_(user_ids))
+    if days is not None:
+        check_q = check_q.where(DailyCheck.check_date.in_(days))
+        clear_q = clear_q.where(CalendarCache.date.in_(days))
+    check_rows = (await db.execute(check_q)).all()
+
+    habits: dict[int, list] = defaultdict(list)
+    for nn_id, user_id, created_at in habit_rows:
+        habits[user_id].append((nn_id, created_at.date()))
+    checks: dict[int, list] = defaultdict(list)
+    for nn_id, day, user_id in check_rows:
+        checks[user_id].append((nn_id, day))
+
+    rows = []
+    for user_id in user_ids:
+        for day, (total, completed) in _summarize(habits[user_id], checks[user_id]).items():
+            pct = completed * 100.0 / total if total else 0.0
+            rows.append({"user_id": user_id, "date": day, "total_habits": total, "completed_habits": completed, "completion_pct": pct})
+
+    await db.execute(clear_q)
+    if rows:
+        await db.execute(CalendarCache.__table__.insert(), rows)
+    return len(rows)
@@ -0,0 +1,172 @@
+"""Per-user resource versions for conditional GETs.
+
+Each (user, resource) pair has a counter in Redis that mutation handlers
+bump after commit, so every replica sees the same version. Read endpoints
+turn the versions they depend on into an ETag and answer ``304 Not
+Modified`` before touching the database when ``If-None-Match`` matches.
+
+Counters start from a random value rather than zero: if a key is evicted,
+expires or Redis is flushed, the recreated counter will not replay versions
+that clients may still hold as ETags.
+
+A bump that fails would leave the old version, and every ETag holding it,
+valid on stale data on every replica. ``record_change`` then deletes the
+counters so they are re-seeded. If that fails too it sets a per-user
+"untrusted" key, read together with the versions, so no replica answers 304
+for the user until the counters' TTL has passed. If Redis cannot even take
+that, this process stops answering 304 for the user itself and retries the
+reset on its next Redis call, which repairs the other replicas as well.
+
+``record_change`` also publishes the change to the user's live event
+streams (see ``app.services.events``).
+"""
+import logging
+import secrets
+import time
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from redis.exceptions import RedisError
+
+from app.core.deps import get_current_principal
+from app.core.redis import get_redis
+from app.core.security import Principal
+from app.services import events
+from app.services.dashboard import invalidate_dashboard
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("personas", "principles", "schedule", "non_negotiables", "settings")
+DASHBOARD_RESOURCES = ("personas", "schedule", "non_negotiables", "settings")
+
+
+# Counters expire so one whose bump was missed cannot stay valid indefinitely
+VERSION_TTL_SECONDS = 24 * 3600
+
+# user id -> (monotonic deadline, counters still to reset) for bumps whose reset and
+# shared marker both failed; the counters may be stale until then
+_untrusted: dict[int, tuple[float, set[str]]] = {}
+
+
+def version_key(user_id: int, resource: str) -> str:
+    return f"user:{user_id}:version:{resource}"
+
+
+def untrusted_key(user_id: int) -> str:
+    return f"user:{user_id}:versions-untrusted"
+
+
+def _seed() -> int:
+    return secrets.randbits(48)
+
+
+async def record_change(user_id: int, *resources: str, event: str = "change", data: dict | None = None) -> None:
+    """Bump the versions of ``resources`` for ``user_id`` and notify its live event streams; call after commit.
+
+    Streams receive ``event`` with ``data`` plus the changed ``resources``.
+    """
+    if any(r in DASHBOARD_RESOURCES for r in resources):
+        await invalidate_dashboard(user_id)
+    await _repair()
+    redis = get_redis()
+    keys = [version_key(user_id, r) for r in resources]
+    try:
+        for key in keys:
+            await redis.set(key, _seed(), nx=True, ex=VERSION_TTL_SECONDS)
+            await redis.incr(key)
+    except RedisError:
+        logger.warning("failed to bump %s versions for user %s", ",".join(resources), user_id, exc_info=True)
+        await _distrust(user_id, keys)
+    await events.publish(user_id, event, {**(data or {}), "resources": list(resources)})
+
+
+async def _distrust(user_id: int, keys: list[str]) -> None:
+    """Keep every replica from answering 304 off ``keys``, which may have missed a bump."""
+    redis = get_redis()
+    try:
+        await redis.delete(*keys)
+        return
+    except RedisError:
+        logger.warning("failed to reset versions for user %s", user_id, exc_info=True)
+    try:
+        await redis.set(untrusted_key(user_id), 1, ex=VERSION_TTL_SECONDS)
+        return
+    except RedisError:
+        logger.warning("failed to mark versions untrusted for user %s; not answering 304 for it", user_id, exc_info=True)
+    _, pending = _untrusted.get(user_id, (0.0, set()))
+    _untrusted[user_id] = (time.monotonic() + VERSION_TTL_SECONDS, pending | set(keys))
+
+
+async def _repair() -> None:
+    """Retry the counter resets that failed, so other replicas stop trusting them."""
+    for user_id, (deadline, keys) in list(_untrusted.items()):
+        if deadline > time.monotonic():
+            try:
+                await get_redis().delete(*keys)
+            except RedisError:
+                return
+        del _untrusted[user_id]
+
+
+async def _seed_missing(redis, keys: list[str], values: list) -> list[int]:
+    for i, value in enumerate(values):
+        if value is None:
+            await redis.set(keys[i], _seed(), nx=True, ex=VERSION_TTL_SECONDS)
+            values[i] = await redis.get(keys[i])
+    return [int(v) for v in values]
+
+
+async def current_versions(user_id: int, resources: tuple[str, ...]) -> list[int]:
+    """Current versions of ``resources``, seeding any that do not exist yet."""
+    redis = get_redis()
+    keys = [version_key(user_id, r) for r in resources]
+    return await _seed_missing(redis, keys, await redis.mget(keys))
+
+
+async def trusted_versions(user_id: int, resources: tuple[str, ...]) -> list[int] | None:
+    """``current_versions``, or ``None`` when they cannot vouch for the data (Redis down, or a bump failed)."""
+    await _repair()
+    if user_id in _untrusted:
+        return None
+    redis = get_redis()
+    keys = [version_key(user_id, r) for r in resources]
+    try:
+        # The untrusted marker rides along in the same round trip as the versions
+        marker, *values = await redis.mget([untrusted_key(user_id), *keys])
+        if marker is not None:
+            return None
+        return await _seed_missing(redis, keys, values)
+    except RedisError:
+        logger.warning("resource versions unavailable for user %s", user_id, exc_info=True)
+        return None
+
+
+def _matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def conditional(*resources: str, daily: bool = False):
+    """Route dependency adding an ETag built from ``resources`` (and today's date if ``daily``).
+
+    Raises a bodiless 304 when the request's ``If-None-Match`` already holds
+    it. If Redis is unreachable, or a bump for the user failed, the request is
+    served normally without an ETag.
+    """
+
+    async def dependency(request: Request, response: Response, user: Principal = Depends(get_current_principal)) -> None:
+        versions = await trusted_versions(user.id, resources)
+        if versions is None:
+            return
+        parts = [f"{v:x}" for v in versions]
+        if daily:
+            parts.insert(0, date.today().isoformat())
+        etag = f'"{"-".join(parts)}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
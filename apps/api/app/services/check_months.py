@@ -0,0 +1,159 @@
+"""Per-month completion bitmaps for daily checks.
+
+``daily_check_months`` holds one row per habit per month whose ``mask`` has
+bit ``d - 1`` set when day ``d`` is checked: a year of history is 12 narrow
+rows instead of up to 366 ``daily_checks`` rows plus their two index entries.
+Writes are single ``mask | bits`` / ``mask & ~bits`` statements, so
+concurrent checks in the same month never overwrite each other.
+
+``settings.check_storage`` drives the migration. ``dual`` keeps the bitmaps
+up to date next to ``daily_checks`` while ``backfill_check_months`` copies the
+history over; ``bitmap`` also serves range reads, the today view and streak
+computation from them. ``daily_checks`` stays the record for check ids and
+the remaining readers until those move too.
+"""
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import and_, delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import upsert
+from app.models.tracker import DailyCheck, DailyCheckMonth, NonNegotiable
+
+# Checks served from a bitmap have no row id; they get a negative key that
+# encodes (habit, day) instead, which ``DELETE /tracker/check/{id}`` accepts.
+# The day is its proleptic ordinal, which fits the low bits for every ``date``
+# (up to 9999-12-31), so any check date a client sends round-trips.
+KEY_DAY_BITS = 22
+
+
+def writes_enabled() -> bool:
+    return settings.check_storage != "rows"
+
+
+def reads_enabled() -> bool:
+    return settings.check_storage == "bitmap"
+
+
+def month_of(day: date) -> date:
+    return day.replace(day=1)
+
+
+def bit(day: date) -> int:
+    return 1 << (day.day - 1)
+
+
+def masks(keys: Iterable[tuple[int, date]]) -> dict[tuple[int, date], int]:
+    """Fold ``(habit id, day)`` pairs into ``{(habit id, month): mask}``."""
+    out: dict[tuple[int, date], int] = {}
+    for nn_id, day in keys:
+        key = (nn_id, month_of(day))
+        out[key] = out.get(key, 0) | bit(day)
+    return out
+
+
+def days_in(month: date, mask: int, lo: date | None = None, hi: date | None = None) -> list[date]:
+    """Checked days of ``month``, optionally limited to ``[lo, hi]``."""
+    days = [month + timedelta(days=i) for i in range(31) if mask >> i & 1]
+    return [d for d in days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+
+
+def check_key(nn_id: int, day: date) -> int:
+    return -(nn_id << KEY_DAY_BITS | day.toordinal())
+
+
+def parse_check_key(key: int) -> tuple[int, date]:
+    """Inverse of ``check_key``; raises ``ValueError`` for a key it cannot have produced."""
+    value = -key
+    return value >> KEY_DAY_BITS, date.fromordinal(value & (1 << KEY_DAY_BITS) - 1)
+
+
+def overlapping(lo: date, hi: date):
+    """Join condition from ``NonNegotiable`` to its months that overlap ``[lo, hi]``."""
+    return and_(DailyCheckMonth.non_negotiable_id == NonNegotiable.id, DailyCheckMonth.month.between(month_of(lo), hi))
+
+
+async def _set(db: AsyncSession, merged: dict[tuple[int, date], int], batch_size: int, replace: bool = False) -> None:
+    rows = [{"non_negotiable_id": nn_id, "month": month, "mask": mask} for (nn_id, month), mask in merged.items()]
+    for start in range(0, len(rows), batch_size):
+        stmt = upsert(db, DailyCheckMonth).values(rows[start:start + batch_size])
+        mask = stmt.excluded.mask if replace else DailyCheckMonth.mask.bitwise_or(stmt.excluded.mask)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyCheckMonth.non_negotiable_id, DailyCheckMonth.month], set_={"mask": mask}
+        ))
+
+
+async def record_checks(db: AsyncSession, keys: Iterable[tuple[int, date]], batch_size: int = 1000) -> None:
+    """Set the bits for ``(habit id, day)`` pairs: one upsert per ``batch_size`` months."""
+    if writes_enabled():
+        await _set(db, masks(keys), batch_size)
+
+
+async def record_unchecks(db: AsyncSession, keys: Iterable[tuple[int, date]]) -> None:
+    """Clear the bits for ``(habit id, day)`` pairs: one UPDATE per month touched.
+
+    Emptied months keep their row; it costs less than deleting and re-inserting
+    it when the day is checked again.
+    """
+    if not writes_enabled():
+        return
+    for (nn_id, month), bits in masks(keys).items():
+        await db.execute(
+            update(DailyCheckMonth)
+            .where(DailyCheckMonth.non_negotiable_id == nn_id, DailyCheckMonth.month == month)
+            .values(mask=DailyCheckMonth.mask.bitwise_and(~bits))
+        )
+
+
+async def checked_days(db: AsyncSession, nn_id: int, lo: date | None = None, hi: date | None = None) -> list[date]:
+    """Checked days of one habit, oldest first, for all history or within ``[lo, hi]``."""
+    query = select(DailyCheckMonth.month, DailyCheckMonth.mask).where(DailyCheckMonth.non_negotiable_id == nn_id)
+    if lo is not None:
+        query = query.where(DailyCheckMonth.month >= month_of(lo))
+    if hi is not None:
+        query = query.where(DailyCheckMonth.month <= hi)
+    rows = await db.execute(query.order_by(DailyCheckMonth.month))
+    return [day for month, mask in rows for day in days_in(month, mask, lo, hi)]
+
+
+async def checks_on(db: AsyncSession, user_id: int, day: date) -> list[dict]:
+    """``user_id``'s checks on ``day`` in ``DailyCheckResponse`` shape, keyed by ``check_key``."""
+    rows = await db.execute(
+        select(DailyCheckMonth.non_negotiable_id, DailyCheckMonth.mask)
+        .join(NonNegotiable, NonNegotiable.id == DailyCheckMonth.non_negotiable_id)
+        .where(NonNegotiable.user_id == user_id, DailyCheckMonth.month == month_of(day))
+    )
+    return [
+        {"id": check_key(nn_id, day), "non_negotiable_id": nn_id, "check_date": day, "is_completed": True}
+        for nn_id, mask in rows
+        if mask & bit(day)
+    ]
+
+
+async def backfill(db: AsyncSession, nn_ids: list[int], dry_run: bool = False, batch_size: int = 1000) -> int:
+    """Make the bitmaps of ``nn_ids`` match ``daily_checks``; returns how many months differed."""
+    rows = await db.execute(
+        select(DailyCheck.non_negotiable_id, DailyCheck.check_date).where(
+            DailyCheck.non_negotiable_id.in_(nn_ids), DailyCheck.is_completed.is_(True)
+        )
+    )
+    expected = masks(rows)
+    current = {
+        (nn_id, month): mask
+        for nn_id, month, mask in await db.execute(
+            select(DailyCheckMonth.non_negotiable_id, DailyCheckMonth.month, DailyCheckMonth.mask).where(
+                DailyCheckMonth.non_negotiable_id.in_(nn_ids)
+            )
+        )
+    }
+    stale = {key: mask for key, mask in expected.items() if current.get(key) != mask}
+    extra = [key for key, mask in current.items() if mask and key not in expected]
+    if not dry_run:
+        await _set(db, stale, batch_size, replace=True)
+        if extra:
+            await db.execute(
+                delete(DailyCheckMonth).where(tuple_(DailyCheckMonth.non_negotiable_id, DailyCheckMonth.month).in_(extra))
+            )
+    return len(stale) + len(extra)
@@ -0,0 +1,100 @@
+"""Batched daily-check writes for offline replay."""
+from datetime import date
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.schemas.tracker import DailyCheckBatchItem, DailyCheckBatchResult
+from app.services import analytics, calendar, check_months, streaks
+
+PENDING = -1  # check id placeholder for rows the batch will insert
+
+
+async def apply_batch(db: AsyncSession, user_id: int, items: list[DailyCheckBatchItem], today: date) -> list[DailyCheckBatchResult]:
+    """Apply check/uncheck ops in order, writing only the net change in bulk.
+
+    Items are resolved against an in-memory view of the affected checks, so a
+    later item sees earlier ones (check then uncheck of the same day is a
+    no-op, reported as ``not_checked``). Conflicts are reported per item instead of failing the batch.
+    The caller owns the transaction.
+    """
+    keys = [(item.non_negotiable_id, item.check_date or today) for item in items]
+    nn_ids = {nn_id for nn_id, _ in keys}
+
+    owned = set(
+        (
+            await db.execute(select(NonNegotiable.id).where(NonNegotiable.id.in_(nn_ids), NonNegotiable.user_id == user_id))
+        ).scalars()
+    )
+    wanted = [key for key in keys if key[0] in owned]
+    existing: dict[tuple[int, date], int] = {}
+    if wanted:
+        rows = await db.execute(
+            select(DailyCheck.id, DailyCheck.non_negotiable_id, DailyCheck.check_date).where(
+                tuple_(DailyCheck.non_negotiable_id, DailyCheck.check_date).in_(wanted)
+            )
+        )
+        existing = {(nn_id, day): check_id for check_id, nn_id, day in rows}
+
+    state: dict[tuple[int, date], int | None] = dict(existing)
+    results: list[DailyCheckBatchResult] = []
+    for item, key in zip(items, keys):
+        result = DailyCheckBatchResult(non_negotiable_id=key[0], check_date=key[1], op=item.op, status="not_found")
+        if key[0] in owned:
+            current = state.get(key)
+            if item.op == "check":
+                result.status = "created" if current is None else "already_checked"
+                if current is None:
+                    state[key] = PENDING
+            else:
+                result.status = "not_checked" if current is None else "deleted"
+                state[key] = None
+            if current not in (None, PENDING):
+                result.check_id = current
+        results.append(result)
+
+    to_delete = [check_id for key, check_id in existing.items() if state[key] is None]
+    to_insert = [key for key, check_id in state.items() if check_id == PENDING and key not in existing]
+
+    if to_delete:
+        await db.execute(delete(DailyCheck).where(DailyCheck.id.in_(to_delete)))
+    inserted: dict[tuple[int, date], int] = {}
+    if to_insert:
+        stmt = (
+            upsert(db, DailyCheck)
+            .values([{"non_negotiable_id": nn_id, "check_date": day, "is_completed": True} for nn_id, day in to_insert])
+            .on_conflict_do_nothing(index_elements=[DailyCheck.non_negotiable_id, DailyCheck.check_date])
+            .returning(DailyCheck.id, DailyCheck.non_negotiable_id, DailyCheck.check_date)
+        )
+        inserted = {(nn_id, day): check_id for check_id, nn_id, day in await db.execute(stmt)}
+    await check_months.record_checks(db, inserted)
+    await check_months.record_unchecks(db, [key for key in existing if state[key] is None])
+
+    unchecked = [key for key in existing if state[key] is None]
+    # Report each item by the batch's net effect on its day: "created"/"deleted"
+    # only where a row was actually written, so a check undone later in the same
+    # batch (or lost to a concurrent writer) does not claim a change.
+    net = {**{key: "created" for key in inserted}, **{key: "deleted" for key in unchecked}}
+    for result, key in zip(results, keys):
+        if result.status not in ("created", "deleted"):
+            continue
+        if result.status != net.get(key):
+            result.status = "not_checked" if state[key] is None else "already_checked"
+        result.check_id = None if result.status == "not_checked" else inserted.get(key) or existing.get(key)
+
+    changed = list(inserted) + unchecked
+    if changed:
+        await calendar.rebuild_days(db, [user_id], {day for _, day in changed})
+        await analytics.record_checks(
+            db, user_id, [(nn_id, day, 1) for nn_id, day in inserted] + [(nn_id, day, -1) for nn_id, day in unchecked]
+        )
+        touched: dict[int, list[date]] = {}
+        for nn_id, day in changed:
+            touched.setdefault(nn_id, []).append(day)
+        habit_streaks = (await db.execute(select(Streak).where(Streak.non_negotiable_id.in_(touched)))).scalars()
+        for streak in habit_streaks:
+            days = touched[streak.non_negotiable_id]
+            await streaks.rebuild(db, streak, min(days), max(days))
+    return results
@@ -0,0 +1,174 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+
+from pydantic_core import to_json
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.redis import get_redis
+from app.models.persona import Persona, ScheduleBlock
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.models.user import UserSettings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUPER_OBJECTIVE = "Allah SWT's Satisfaction"
+SNAPSHOT_TTL_SECONDS = 3600
+LOCAL_TTL_SECONDS = 30
+LOCAL_MAX_ENTRIES = 1024
+
+
+class SnapshotCache:
+    """Serialized dashboard snapshots in Redis, with a short-lived local fallback.
+
+    The local map is only consulted while Redis is unreachable; entries there
+    expire quickly because invalidations from other replicas cannot reach them.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"dashboard:{user_id}"
+
+    async def get(self, user_id: int) -> bytes | None:
+        key = self.key(user_id)
+        try:
+            return await get_redis().get(key)
+        except RedisError:
+            self.errors += 1
+        entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._local.pop(key, None)
+        return None
+
+    async def set(self, user_id: int, payload: bytes) -> None:
+        key = self.key(user_id)
+        try:
+            await get_redis().set(key, payload, ex=SNAPSHOT_TTL_SECONDS)
+            return
+        except RedisError:
+            self.errors += 1
+        self._local[key] = (time.monotonic() + LOCAL_TTL_SECONDS, payload)
+        self._local.move_to_end(key)
+        while len(self._local) > LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def delete(self, user_id: int) -> None:
+        key = self.key(user_id)
+        self._local.pop(key, None)
+        try:
+            await get_redis().delete(key)
+        except RedisError:
+            self.errors += 1
+            logger.warning("failed to invalidate dashboard snapshot for user %s", user_id, exc_info=True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+snapshot_cache = SnapshotCache()
+
+
+async def build_dashboard(engine: AsyncEngine, user_id: int, today: date) -> dict:
+    """Run the dashboard queries one after another on a single pooled connection.
+
+    A miss costs one connection for four short SELECTs rather than four
+    connections at once, so a burst of misses stays within the pool budget
+    (see ``DB_POOL_SIZE``) instead of multiplying it.
+    """
+    personas_q = (
+        select(Persona.id, Persona.name, Persona.arabic_name, Persona.domain, Persona.icon, Persona.color)
+        .where(Persona.user_id == user_id)
+        .order_by(Persona.rank, Persona.id)
+    )
+    blocks_q = (
+        select(
+            ScheduleBlock.id,
+            ScheduleBlock.start_time,
+            ScheduleBlock.end_time,
+            ScheduleBlock.activity,
+            ScheduleBlock.persona_id,
+            ScheduleBlock.is_prayer_block,
+        )
+        .where(ScheduleBlock.user_id == user_id)
+        .order_by(ScheduleBlock.start_time)
+    )
+    streaks_q = (
+        select(NonNegotiable.title, Streak.current_streak, Streak.longest_streak)
+        .outerjoin(Streak, Streak.non_negotiable_id == NonNegotiable.id)
+        .where(NonNegotiable.user_id == user_id)
+        .order_by(NonNegotiable.rank, NonNegotiable.id)
+    )
+    header_q = select(
+        select(UserSettings.super_objective).where(UserSettings.user_id == user_id).scalar_subquery(),
+        select(func.count(DailyCheck.id))
+        .join(NonNegotiable)
+        .where(NonNegotiable.user_id == user_id, DailyCheck.check_date == today)
+        .scalar_subquery(),
+    )
+
+    async with engine.connect() as conn:
+        personas, blocks, streaks, header = [(await conn.execute(q)).all() for q in (personas_q, blocks_q, streaks_q, header_q)]
+    super_objective, checked_today = header[0]
+
+    return {
+        "super_objective": super_objective if super_objective is not None else DEFAULT_SUPER_OBJECTIVE,
+        "personas": [{"id": p.id, "name": p.name, "arabic_name": p.arabic_name, "domain": p.domain, "icon": p.icon, "color": p.color} for p in personas],
+        "schedule_blocks": [{"id": b.id, "start_time": b.start_time, "end_time": b.end_time, "activity": b.activity, "persona_id": b.persona_id, "is_prayer_block": b.is_prayer_block} for b in blocks],
+        "non_negotiables_total": len(streaks),
+        "non_negotiables_checked_today": checked_today,
+        "streaks": [{"title": s.title, "current": s.current_streak or 0, "longest": s.longest_streak or 0} for s in streaks],
+    }
+
+
+def _prefix(today: date, versions: list[int]) -> bytes:
+    tag = "-".join(f"{v:x}" for v in versions)
+    return b'{"date":"%s","versions":"%s","data":' % (today.isoformat().encode("ascii"), tag.encode("ascii"))
+
+
+async def get_dashboard_snapshot(engine: AsyncEngine, user_id: int, today: date, versions: list[int] | None) -> bytes:
+    """The dashboard as a JSON response body.
+
+    ``versions`` are the user's dashboard resource versions, read before
+    building. A snapshot is stored with the versions it was built under and
+    served only while they are current, so one built from data a concurrent
+    write has since replaced (its ``set`` landing after the writer's
+    invalidation) is never served. Without versions (Redis unreachable) the
+    snapshot is built and not cached.
+
+    The cache holds ``{"date": ..., "versions": ..., "data": <body>}`` with the
+    body already encoded, so a hit is served by slicing it out, with no parse
+    or re-encode. The body is what ``JSONResponse`` produced for the dict:
+    compact separators, UTF-8 rather than ``\\u`` escapes.
+    """
+    if versions is None:
+        snapshot_cache.misses += 1
+        return to_json(await build_dashboard(engine, user_id, today))
+    prefix = _prefix(today, versions)
+    cached = await snapshot_cache.get(user_id)
+    if cached is not None and cached.startswith(prefix):
+        snapshot_cache.hits += 1
+        return cached[len(prefix):-1]
+    snapshot_cache.misses += 1
+    body = to_json(await build_dashboard(engine, user_id, today))
+    await snapshot_cache.set(user_id, prefix + body + b"}")
+    return body
+
+
+async def invalidate_dashboard(user_id: int) -> None:
+    await snapshot_cache.delete(user_id)
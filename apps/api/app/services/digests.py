@@ -0,0 +1,266 @@
+"""Accountability-partner digests.
+
+Two stages, both batched:
+
+``queue_digests`` walks the accepted partnerships for one frequency in id
+order, ``batch_size`` at a time. For each batch it computes every inviter's
+completion and streaks for the period with a fixed number of set-based
+queries, renders the digests into ``digest_outbox`` and advances the run's
+checkpoint in the same transaction. A crashed run picks up after the last
+committed batch, and a period is never queued twice for a partnership.
+
+``deliver_digests`` claims a batch of pending outbox rows (``sending``,
+stamped ``claimed_at``) in one short transaction, sends them with at most
+``concurrency`` SMTP sends in flight and no transaction or row lock held,
+then records the results in a second short transaction. A row left in
+``sending`` longer than ``CLAIM_TIMEOUT`` by a crashed or stuck run is
+claimed again, so delivery is at-least-once: a crash between sending and
+recording resends that batch.
+"""
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import upsert
+from app.models.partnership import DigestOutbox, DigestRun, Partnership
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.models.user import User
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+# Well past a batch's worst case of SMTP timeouts; a claim older than this is considered abandoned
+CLAIM_TIMEOUT = timedelta(minutes=15)
+
+
+def period_for(frequency: str, today: date) -> tuple[date, date]:
+    """The last complete period before ``today``: yesterday, last Mon-Sun, or last month."""
+    if frequency == "daily":
+        day = today - timedelta(days=1)
+        return day, day
+    if frequency == "weekly":
+        end = today - timedelta(days=today.weekday() + 1)
+        return end - timedelta(days=6), end
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+
+@dataclass
+class HabitSummary:
+    title: str
+    completed: int
+    possible: int
+    current_streak: int
+    longest_streak: int
+
+
+@dataclass
+class Summary:
+    habits: list[HabitSummary] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return sum(h.completed for h in self.habits)
+
+    @property
+    def possible(self) -> int:
+        return sum(h.possible for h in self.habits)
+
+    @property
+    def pct(self) -> int:
+        return round(self.completed * 100 / self.possible) if self.possible else 0
+
+
+async def summarize(db: AsyncSession, user_ids: list[int], start: date, end: date) -> dict[int, Summary]:
+    """Completion and streaks over ``start``..``end`` for every user in ``user_ids``, in two queries."""
+    completed = dict(
+        (
+            await db.execute(
+                select(DailyCheck.non_negotiable_id, func.count())
+                .join(NonNegotiable, NonNegotiable.id == DailyCheck.non_negotiable_id)
+                .where(
+                    NonNegotiable.user_id.in_(user_ids),
+                    DailyCheck.check_date.between(start, end),
+                    DailyCheck.is_completed.is_(True),
+                )
+                .group_by(DailyCheck.non_negotiable_id)
+            )
+        ).all()
+    )
+    habits = await db.execute(
+        select(
+            NonNegotiable.id, NonNegotiable.user_id, NonNegotiable.title, NonNegotiable.created_at,
+            func.coalesce(Streak.current_streak, 0), func.coalesce(Streak.longest_streak, 0),
+        )
+        .outerjoin(Streak, Streak.non_negotiable_id == NonNegotiable.id)
+        .where(NonNegotiable.user_id.in_(user_ids))
+        .order_by(NonNegotiable.user_id, NonNegotiable.rank)
+    )
+    summaries: dict[int, Summary] = defaultdict(Summary)
+    for habit_id, user_id, title, created_at, current, longest in habits:
+        done = completed.get(habit_id, 0)
+        possible = max((end - max(start, created_at.date())).days + 1, 0)
+        summaries[user_id].habits.append(HabitSummary(title, done, max(possible, done), current, longest))
+    return summaries
+
+
+def render(frequency: str, share_level: str, name: str, start: date, end: date, summary: Summary) -> tuple[str, str]:
+    span = start.isoformat() if start == end else f"{start.isoformat()} to {end.isoformat()}"
+    subject = f"{name}'s {frequency} progress: {summary.pct}%"
+    lines = [
+        "Assalamu alaikum,",
+        "",
+        f"Here is {name}'s {frequency} summary for {span}.",
+        "",
+        f"Overall completion: {summary.pct}% ({summary.completed} of {summary.possible} habit-days)",
+    ]
+    if share_level == "summary":
+        active = [h for h in summary.habits if h.current_streak]
+        best = max((h.longest_streak for h in summary.habits), default=0)
+        lines.append(f"Active streaks: {len(active)}, longest ever {best} days")
+    elif share_level == "full":
+        lines.append("")
+        for h in summary.habits:
+            lines.append(f"- {h.title}: {h.completed}/{h.possible} days, streak {h.current_streak} (best {h.longest_streak})")
+    lines += ["", "You receive this because you are their accountability partner on Niyyah."]
+    return subject, "\n".join(lines)
+
+
+async def _checkpoint(db: AsyncSession, frequency: str, period_end: date) -> DigestRun:
+    await db.execute(
+        upsert(db, DigestRun)
+        .values(frequency=frequency, period_end=period_end, last_partnership_id=0, queued=0)
+        .on_conflict_do_nothing(index_elements=[DigestRun.frequency, DigestRun.period_end])
+    )
+    return await db.scalar(select(DigestRun).where(DigestRun.frequency == frequency, DigestRun.period_end == period_end))
+
+
+async def queue_digests(session_factory: async_sessionmaker, frequency: str, today: date, batch_size: int) -> dict:
+    start, end = period_for(frequency, today)
+    async with session_factory() as db:
+        run = await _checkpoint(db, frequency, end)
+        await db.commit()
+        if run.finished_at is not None:
+            return {"frequency": frequency, "period_end": end.isoformat(), "queued": run.queued, "resumed": False}
+        resumed = run.last_partnership_id > 0
+
+    while True:
+        async with session_factory() as db:
+            run = await db.get(DigestRun, run.id)
+            batch = (
+                await db.execute(
+                    select(Partnership.id, Partnership.inviter_id, Partnership.partner_email, Partnership.share_level, User.email)
+                    .join(User, User.id == Partnership.inviter_id)
+                    .where(
+                        Partnership.status == "accepted",
+                        Partnership.share_frequency == frequency,
+                        Partnership.id > run.last_partnership_id,
+                        or_(Partnership.last_digest_end.is_(None), Partnership.last_digest_end < end),
+                    )
+                    .order_by(Partnership.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not batch:
+                run.finished_at = datetime.now(timezone.utc)
+                await db.commit()
+                return {"frequency": frequency, "period_end": end.isoformat(), "queued": run.queued, "resumed": resumed}
+
+            summaries = await summarize(db, list({p.inviter_id for p in batch}), start, end)
+            rows = []
+            for p in batch:
+                name = p.email.split("@")[0]
+                subject, body = render(frequency, p.share_level, name, start, end, summaries.get(p.inviter_id, Summary()))
+                rows.append({"partnership_id": p.id, "period_start": start, "period_end": end,
+                             "recipient": p.partner_email, "subject": subject, "body": body, "status": "pending", "attempts": 0})
+            await db.execute(
+                upsert(db, DigestOutbox).on_conflict_do_nothing(index_elements=[DigestOutbox.partnership_id, DigestOutbox.period_end]),
+                rows,
+            )
+            ids = [p.id for p in batch]
+            await db.execute(update(Partnership).where(Partnership.id.in_(ids)).values(last_digest_end=end))
+            run.last_partnership_id = ids[-1]
+            run.queued += len(rows)
+            await db.commit()
+
+
+async def _claim(db: AsyncSession, cursor: int, batch_size: int, now: datetime, reclaim_before: datetime) -> list:
+    claimable = (
+        select(DigestOutbox.id)
+        .where(
+            DigestOutbox.id > cursor,
+            or_(
+                DigestOutbox.status == "pending",
+                (DigestOutbox.status == "sending") & (DigestOutbox.claimed_at < reclaim_before),
+            ),
+        )
+        .order_by(DigestOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = await db.execute(
+        update(DigestOutbox)
+        .where(DigestOutbox.id.in_(claimable))
+        .values(status="sending", claimed_at=now)
+        .returning(DigestOutbox.id, DigestOutbox.recipient, DigestOutbox.subject, DigestOutbox.body, DigestOutbox.attempts)
+    )
+    return sorted(rows.all(), key=lambda row: row.id)
+
+
+async def deliver_digests(
+    session_factory: async_sessionmaker,
+    sender,
+    concurrency: int,
+    batch_size: int,
+    max_attempts: int,
+    claim_timeout: timedelta = CLAIM_TIMEOUT,
+) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    sent = failed = 0
+    cursor = 0
+
+    async def send(row) -> Exception | None:
+        async with gate:
+            try:
+                await sender.send(row.recipient, row.subject, row.body)
+            except Exception as exc:  # noqa: BLE001 - any delivery error is recorded on the row
+                return exc
+        return None
+
+    while True:
+        claimed_at = datetime.now(timezone.utc)
+        async with session_factory() as db:
+            rows = await _claim(db, cursor, batch_size, claimed_at, claimed_at - claim_timeout)
+            await db.commit()
+        if not rows:
+            return {"sent": sent, "failed": failed}
+
+        errors = await asyncio.gather(*(send(row) for row in rows))
+
+        ok = [row.id for row, error in zip(rows, errors) if error is None]
+        # Only rows still under this claim: one reclaimed by another run is theirs to record
+        ours = (DigestOutbox.status == "sending") & (DigestOutbox.claimed_at == claimed_at)
+        async with session_factory() as db:
+            if ok:
+                await db.execute(
+                    update(DigestOutbox)
+                    .where(DigestOutbox.id.in_(ok), ours)
+                    .values(status="sent", attempts=DigestOutbox.attempts + 1, sent_at=datetime.now(timezone.utc), last_error=None)
+                )
+            for row, error in zip(rows, errors):
+                if error is not None:
+                    await db.execute(
+                        update(DigestOutbox)
+                        .where(DigestOutbox.id == row.id, ours)
+                        .values(
+                            status="failed" if row.attempts + 1 >= max_attempts else "pending",
+                            attempts=row.attempts + 1,
+                            last_error=repr(error)[:1000],
+                        )
+                    )
+            await db.commit()
+        sent += len(ok)
+        failed += len(rows) - len(ok)
+        cursor = rows[-1].id
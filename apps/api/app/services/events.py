@@ -0,0 +1,201 @@
+"""Live per-user change notifications for ``GET /events``.
+
+Mutations call ``publish`` (through ``record_change``) after commit, which
+sends one message to the user's Redis channel, ``events:user:{id}``. Every
+process runs one ``EventBroker``: one pub/sub connection, subscribed to the
+channels of the users that have a stream open on that process, that fans
+each message out to those streams. Any replica's writes reach streams held
+by every other replica, and an open stream costs a queue, not a connection.
+
+Each stream buffers up to ``settings.events_queue_size`` encoded events. A
+client that falls that far behind does not hold up the broker or other
+streams: its backlog is replaced by a single ``resync`` event telling it to
+refetch, which is what it would do after reconnecting anyway. Idle streams
+get a comment line every ``events_heartbeat_seconds`` so proxies keep them
+open, and streams end after ``events_max_stream_seconds`` so clients
+reconnect and spread across replicas.
+"""
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from datetime import date
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 1.0
+RETRY_MS = 3000
+HEARTBEAT = b": ping\n\n"
+
+
+def channel(user_id: int) -> str:
+    return f"events:user:{user_id}"
+
+
+def encode(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n".encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+RESYNC = encode("resync", {})
+
+
+async def publish(user_id: int, event: str, data: dict) -> None:
+    try:
+        await get_redis().publish(channel(user_id), json.dumps({"event": event, "data": data}, default=_json_default))
+    except RedisError:
+        logger.warning("failed to publish %s event for user %s", event, user_id, exc_info=True)
+
+
+class Stream:
+    """One client's buffered events."""
+
+    def __init__(self, user_id: int, size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=size)
+
+    def put(self, payload: bytes) -> bool:
+        """Queue ``payload``; on overflow drop the backlog for a ``resync``. Returns False if it overflowed."""
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+
+class EventBroker:
+    def __init__(self):
+        self._streams: dict[int, set[Stream]] = {}
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.delivered = 0
+        self.overflows = 0
+        self.errors = 0
+
+    async def subscribe(self, user_id: int) -> Stream:
+        stream = Stream(user_id, settings.events_queue_size)
+        async with self._lock:
+            first = user_id not in self._streams
+            self._streams.setdefault(user_id, set()).add(stream)
+            try:
+                if self._pubsub is None:
+                    self._pubsub = get_redis().pubsub()
+                if first:
+                    await self._pubsub.subscribe(channel(user_id))
+            except BaseException:
+                self._discard(stream)
+                raise
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+        return stream
+
+    async def unsubscribe(self, stream: Stream) -> None:
+        async with self._lock:
+            if self._discard(stream) and self._pubsub is not None:
+                try:
+                    await self._pubsub.unsubscribe(channel(stream.user_id))
+                except RedisError:
+                    self.errors += 1
+                    logger.warning("failed to unsubscribe from %s", channel(stream.user_id), exc_info=True)
+
+    def _discard(self, stream: Stream) -> bool:
+        """Forget ``stream``; True if it was its user's last one."""
+        streams = self._streams.get(stream.user_id, set())
+        streams.discard(stream)
+        if streams:
+            return False
+        self._streams.pop(stream.user_id, None)
+        return True
+
+    def dispatch(self, message: dict) -> None:
+        user_id = int(message["channel"].rsplit(b":", 1)[1])
+        streams = self._streams.get(user_id)
+        if not streams:
+            return
+        try:
+            body = json.loads(message["data"])
+            payload = encode(body["event"], body["data"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("dropping malformed event on %s", message["channel"])
+            return
+        for stream in streams:
+            if stream.put(payload):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            except RedisError:
+                # redis-py reconnects and resubscribes on the next read
+                self.errors += 1
+                logger.warning("event subscriber lost its connection; retrying", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+            if message and message.get("type") == "message":
+                self.dispatch(message)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, RedisError):
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except RedisError:
+                pass
+            self._pubsub = None
+        self._streams.clear()
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._streams),
+            "streams": sum(len(s) for s in self._streams.values()),
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "errors": self.errors,
+        }
+
+
+event_broker = EventBroker()
+
+
+async def stream_events(user_id: int, broker: EventBroker = event_broker) -> AsyncIterator[bytes]:
+    """Body of one ``text/event-stream`` response."""
+    loop = asyncio.get_running_loop()
+    try:
+        stream = await broker.subscribe(user_id)
+    except RedisError:
+        logger.warning("event stream for user %s unavailable", user_id, exc_info=True)
+        yield f"retry: {RETRY_MS}\n\n".encode("ascii")
+        return
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode("ascii") + encode("ready", {})
+        deadline = loop.time() + settings.events_max_stream_seconds
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                yield await asyncio.wait_for(stream.queue.get(), min(settings.events_heartbeat_seconds, remaining))
+            except TimeoutError:
+                yield HEARTBEAT
+    finally:
+        await broker.unsubscribe(stream)
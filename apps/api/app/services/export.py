@@ -0,0 +1,162 @@
+"""Full-account export, streamed.
+
+Every table is read through a server-side cursor (``Connection.stream``)
+``yield_per`` rows at a time and encoded as it arrives, so memory use is set
+by the chunk size rather than by how much history the user has. All tables
+are read in one transaction, REPEATABLE READ on Postgres, so the export is a
+consistent snapshot.
+
+Exported: the user's row (without credentials), settings, personas with
+their milestones, schedule blocks, principles, habits with their checks and
+streaks, the partnerships the user sent or accepted, and the digests sent
+about the user. Deliberately left out:
+
+* ``refresh_tokens``: credentials.
+* ``daily_check_months``, ``streak_runs``, ``habit_rollups``,
+  ``user_rollups``, ``calendar_cache``: derived from the checks, and rebuilt
+  from them.
+* ``sync_tombstones``: sync bookkeeping for deleted rows, not data.
+* ``digest_runs``: checkpoints of the digest job, shared by all users.
+
+``ndjson`` writes one ``{"table": ..., "row": {...}}`` object per line.
+``csv`` writes a zip holding one CSV file per table; ``zipfile`` writes to a
+non-seekable sink here, so the archive is streamed as well.
+"""
+import csv
+import io
+import json
+import zipfile
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.partnership import DigestOutbox, Partnership
+from app.models.persona import Milestone, Persona, ScheduleBlock
+from app.models.principle import Principle
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.models.user import User, UserSettings
+
+# Credentials and session bookkeeping are not the user's data.
+PRIVATE_USER_COLUMNS = {"password_hash", "token_version"}
+
+Chunk = tuple[str, list[str], list[tuple]]
+
+
+def _columns(model, exclude: set[str] = frozenset()) -> list:
+    return [c for c in model.__table__.columns if c.name not in exclude]
+
+
+def export_queries(user_id: int) -> list[tuple[str, Select]]:
+    def owned(model) -> Select:
+        return select(*_columns(model)).where(model.user_id == user_id).order_by(model.id)
+
+    def via(model, parent, parent_key) -> Select:
+        return (
+            select(*_columns(model))
+            .join(parent, parent.id == parent_key)
+            .where(parent.user_id == user_id)
+            .order_by(model.id)
+        )
+
+    return [
+        ("users", select(*_columns(User, PRIVATE_USER_COLUMNS)).where(User.id == user_id)),
+        ("user_settings", owned(UserSettings)),
+        ("personas", owned(Persona)),
+        ("milestones", via(Milestone, Persona, Milestone.persona_id)),
+        ("schedule_blocks", owned(ScheduleBlock)),
+        ("principles", owned(Principle)),
+        ("non_negotiables", owned(NonNegotiable)),
+        ("daily_checks", via(DailyCheck, NonNegotiable, DailyCheck.non_negotiable_id)),
+        ("streaks", via(Streak, NonNegotiable, Streak.non_negotiable_id)),
+        (
+            "partnerships",
+            select(*_columns(Partnership))
+            .where(or_(Partnership.inviter_id == user_id, Partnership.partner_id == user_id))
+            .order_by(Partnership.id),
+        ),
+        (
+            "digest_outbox",
+            select(*_columns(DigestOutbox))
+            .join(Partnership, Partnership.id == DigestOutbox.partnership_id)
+            .where(Partnership.inviter_id == user_id)
+            .order_by(DigestOutbox.id),
+        ),
+    ]
+
+
+async def stream_rows(bind: AsyncEngine, user_id: int, chunk_size: int) -> AsyncIterator[Chunk]:
+    """Yield ``(table, columns, rows)``: once with no rows as each table starts, then per chunk."""
+    async with bind.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execution_options(isolation_level="REPEATABLE READ")
+        for table, stmt in export_queries(user_id):
+            result = await conn.stream(stmt.execution_options(yield_per=chunk_size))
+            columns = list(result.keys())
+            yield table, columns, []
+            async for rows in result.partitions():
+                yield table, columns, rows
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def ndjson(chunks: AsyncIterator[Chunk]) -> AsyncIterator[bytes]:
+    async for table, columns, rows in chunks:
+        if rows:
+            lines = (json.dumps({"table": table, "row": dict(zip(columns, row))}, default=_json_default) for row in rows)
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable buffer that is emptied after every chunk."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+async def csv_zip(chunks: AsyncIterator[Chunk]) -> AsyncIterator[bytes]:
+    sink = _Sink()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+    current, text = None, None
+    async for table, columns, rows in chunks:
+        if table != current:
+            if text is not None:
+                text.close()
+            entry = archive.open(f"{table}.csv", "w", force_zip64=True)
+            text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            current = table
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        text.flush()
+        if data := sink.drain():
+            yield data
+    if text is not None:
+        text.close()
+    archive.close()
+    yield sink.drain()
@@ -0,0 +1,287 @@
+"""Bulk account import.
+
+``ImportReader`` validates a document row by row as it arrives: NDJSON in
+the ``{"table": ..., "row": {...}}`` shape ``GET /export`` writes, or one
+JSON object mapping table names to lists of rows. References between rows
+use ids from the document, so parents must come before their children,
+which an export already guarantees. Nothing is written unless the whole
+document is valid.
+
+``apply_import`` inserts each entity type with multi-row INSERTs of
+``batch_size`` rows and commits it on its own, parents first so children
+can be mapped onto the new ids. Streaks, their run indexes, the calendar
+cache and the analytics rollups are built once at the end instead of per
+check. Bulk inserts bypass the ORM flush hooks, so the change sequence is
+stamped here.
+"""
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.persona import Milestone, Persona, ScheduleBlock
+from app.models.principle import Principle
+from app.models.sync import next_change_seq
+from app.models.tracker import DailyCheck, NonNegotiable, Streak, StreakRun
+from app.models.user import UserSettings
+from app.schemas.imports import (
+    DailyCheckImport,
+    ImportIssue,
+    MilestoneImport,
+    NonNegotiableImport,
+    PersonaImport,
+    PrincipleImport,
+    ScheduleBlockImport,
+)
+from app.services import analytics, calendar, check_months, ordering, streaks
+
+TABLES: dict[str, type[BaseModel]] = {
+    "personas": PersonaImport,
+    "milestones": MilestoneImport,
+    "principles": PrincipleImport,
+    "schedule_blocks": ScheduleBlockImport,
+    "non_negotiables": NonNegotiableImport,
+    "daily_checks": DailyCheckImport,
+}
+# Tables an export contains that are not imported: the account itself and derived data.
+SKIPPED_TABLES = {"users", "user_settings", "streaks"}
+MAX_ERRORS = 20
+
+
+class InvalidImport(Exception):
+    def __init__(self, errors: list[ImportIssue]):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+@dataclass
+class ImportDocument:
+    personas: list[PersonaImport] = field(default_factory=list)
+    milestones: list[MilestoneImport] = field(default_factory=list)
+    principles: list[PrincipleImport] = field(default_factory=list)
+    schedule_blocks: list[ScheduleBlockImport] = field(default_factory=list)
+    non_negotiables: list[NonNegotiableImport] = field(default_factory=list)
+    # (document habit id, day) -> is_completed; repeated rows collapse to the last one
+    daily_checks: dict[tuple[int, date], bool] = field(default_factory=dict)
+
+
+class ImportReader:
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        self.rows = 0
+        self.document = ImportDocument()
+        self.errors: list[ImportIssue] = []
+        self._persona_ids: set[int] = set()
+        self._habit_ids: set[int] = set()
+
+    def _error(self, at: str, msg: str) -> None:
+        self.errors.append(ImportIssue(at=at, msg=msg))
+        if len(self.errors) >= MAX_ERRORS:
+            raise InvalidImport(self.errors)
+
+    def add(self, table: str, row, at: str) -> None:
+        if table in SKIPPED_TABLES:
+            return
+        model = TABLES.get(table)
+        if model is None:
+            return self._error(at, f"unknown table {table!r}")
+        self.rows += 1
+        if self.rows > self.max_rows:
+            self.errors.append(ImportIssue(at=at, msg=f"more than {self.max_rows} rows"))
+            raise InvalidImport(self.errors)
+        try:
+            item = model.model_validate(row)
+        except ValidationError as exc:
+            problems = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors())
+            return self._error(at, problems)
+
+        doc = self.document
+        if isinstance(item, PersonaImport):
+            if not self._new_id(item.id, self._persona_ids, "persona", at):
+                return
+            doc.personas.append(item)
+        elif isinstance(item, (MilestoneImport, ScheduleBlockImport)):
+            if item.persona_id not in self._persona_ids:
+                return self._error(at, f"persona_id {item.persona_id} is not a persona earlier in the document")
+            (doc.milestones if isinstance(item, MilestoneImport) else doc.schedule_blocks).append(item)
+        elif isinstance(item, NonNegotiableImport):
+            if not self._new_id(item.id, self._habit_ids, "non_negotiable", at):
+                return
+            doc.non_negotiables.append(item)
+        elif isinstance(item, DailyCheckImport):
+            if item.non_negotiable_id not in self._habit_ids:
+                return self._error(at, f"non_negotiable_id {item.non_negotiable_id} is not a non_negotiable earlier in the document")
+            doc.daily_checks[(item.non_negotiable_id, item.check_date)] = item.is_completed
+        else:
+            doc.principles.append(item)
+
+    def _new_id(self, ref: int | None, seen: set[int], kind: str, at: str) -> bool:
+        if ref is None:
+            return True
+        if ref in seen:
+            self._error(at, f"duplicate {kind} id {ref}")
+            return False
+        seen.add(ref)
+        return True
+
+    def add_line(self, line: bytes, number: int) -> None:
+        at = f"line {number}"
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            return self._error(at, f"invalid JSON: {exc}")
+        if not isinstance(record, dict) or not isinstance(record.get("table"), str) or "row" not in record:
+            return self._error(at, 'expected {"table": ..., "row": {...}}')
+        self.add(record["table"], record["row"], at)
+
+    async def read_ndjson(self, chunks: AsyncIterator[bytes]) -> None:
+        number, pending = 0, b""
+        async for chunk in chunks:
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                number += 1
+                if line.strip():
+                    self.add_line(line, number)
+        if pending.strip():
+            self.add_line(pending, number + 1)
+
+    def read_json(self, body: bytes) -> None:
+        try:
+            document = json.loads(body)
+        except ValueError as exc:
+            return self._error("body", f"invalid JSON: {exc}")
+        if not isinstance(document, dict):
+            return self._error("body", "expected an object mapping table names to lists of rows")
+        for table in [*TABLES, *(t for t in document if t not in TABLES)]:
+            rows = document.get(table, [])
+            if not isinstance(rows, list):
+                self._error(table, "expected a list of rows")
+                continue
+            for i, row in enumerate(rows):
+                self.add(table, row, f"{table}[{i}]")
+
+    def finish(self) -> ImportDocument:
+        if self.errors:
+            raise InvalidImport(self.errors)
+        return self.document
+
+
+async def _change_seq(db: AsyncSession, user_id: int) -> int:
+    return await db.run_sync(lambda session: next_change_seq(session.connection(), user_id))
+
+
+async def _insert(db: AsyncSession, model, rows: list[dict], batch_size: int, returning: bool = False) -> list[int]:
+    """Multi-row INSERTs of ``batch_size`` rows; with ``returning``, the new ids in row order."""
+    # Core rather than ORM bulk insert, which splits batches by which values are None.
+    table = model.__table__
+    ids: list[int] = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if returning:
+            stmt = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+            ids.extend((await db.execute(stmt, batch)).scalars())
+        else:
+            await db.execute(table.insert(), batch)
+    return ids
+
+
+async def _insert_ranked(db: AsyncSession, model, user_id: int, items: list[BaseModel], exclude: set[str], batch_size: int, **values) -> list[int]:
+    ranks = await ordering.append_ranks(db, model, user_id, len(items))
+    seq = await _change_seq(db, user_id)
+    rows = [
+        {**item.model_dump(exclude=exclude), **values, "user_id": user_id, "rank": rank, "change_seq": seq}
+        for item, rank in zip(items, ranks)
+    ]
+    return await _insert(db, model, rows, batch_size, returning=True)
+
+
+async def apply_import(db: AsyncSession, user_id: int, doc: ImportDocument, batch_size: int) -> dict[str, int]:
+    """Write ``doc`` for ``user_id``, one transaction per entity type; returns rows inserted per table."""
+    personas: dict[int, int] = {}
+    if doc.personas:
+        ids = await _insert_ranked(db, Persona, user_id, doc.personas, {"id"}, batch_size)
+        personas = {p.id: new_id for p, new_id in zip(doc.personas, ids) if p.id is not None}
+        await db.commit()
+
+    if doc.milestones:
+        seq = await _change_seq(db, user_id)
+        rows = [{**m.model_dump(), "persona_id": personas[m.persona_id], "change_seq": seq} for m in doc.milestones]
+        await _insert(db, Milestone, rows, batch_size)
+        await db.commit()
+
+    if doc.principles:
+        await _insert_ranked(db, Principle, user_id, doc.principles, set(), batch_size)
+        await db.commit()
+
+    if doc.schedule_blocks:
+        ranks = await ordering.append_ranks(db, ScheduleBlock, user_id, len(doc.schedule_blocks))
+        seq = await _change_seq(db, user_id)
+        rows = [
+            {**b.model_dump(), "persona_id": personas[b.persona_id], "user_id": user_id, "rank": rank, "change_seq": seq}
+            for b, rank in zip(doc.schedule_blocks, ranks)
+        ]
+        await _insert(db, ScheduleBlock, rows, batch_size)
+        await db.commit()
+
+    habits: dict[int, int] = {}
+    habit_ids: list[int] = []
+    if doc.non_negotiables:
+        first_check: dict[int, date] = {}
+        for ref, day in doc.daily_checks:
+            first_check[ref] = min(day, first_check.get(ref, day))
+        ranks = await ordering.append_ranks(db, NonNegotiable, user_id, len(doc.non_negotiables))
+        seq = await _change_seq(db, user_id)
+        now = datetime.now(timezone.utc)
+        rows = []
+        for habit, rank in zip(doc.non_negotiables, ranks):
+            created_at = habit.created_at
+            if created_at is None and habit.id in first_check:
+                created_at = datetime.combine(first_check[habit.id], time.min, tzinfo=timezone.utc)
+            rows.append({**habit.model_dump(exclude={"id", "created_at"}), "created_at": created_at or now,
+                         "user_id": user_id, "rank": rank, "change_seq": seq})
+        habit_ids = await _insert(db, NonNegotiable, rows, batch_size, returning=True)
+        habits = {h.id: new_id for h, new_id in zip(doc.non_negotiables, habit_ids) if h.id is not None}
+        await db.commit()
+
+    if doc.daily_checks:
+        rows = [
+            {"non_negotiable_id": habits[ref], "check_date": day, "is_completed": completed}
+            for (ref, day), completed in doc.daily_checks.items()
+        ]
+        await _insert(db, DailyCheck, rows, batch_size)
+        await check_months.record_checks(
+            db, ((habits[ref], day) for (ref, day), completed in doc.daily_checks.items() if completed), batch_size
+        )
+        await db.commit()
+
+    if habit_ids:
+        # The habits are new and every check they have is in the document, so
+        # their run indexes are built here and written in bulk.
+        grace = await db.scalar(select(UserSettings.streak_grace_days).where(UserSettings.user_id == user_id)) or 0
+        days: dict[int, list[date]] = {}
+        for (ref, day), completed in doc.daily_checks.items():
+            if completed:
+                days.setdefault(ref, []).append(day)
+        summaries, runs = [], []
+        for habit, habit_id in zip(doc.non_negotiables, habit_ids):
+            habit_runs = streaks.build_runs(days.get(habit.id, []), grace)
+            summaries.append({"non_negotiable_id": habit_id, "grace_days": grace, **streaks.summarize(habit_runs)})
+            runs.extend({"non_negotiable_id": habit_id, "start_date": r.start, "end_date": r.end, "length": r.length} for r in habit_runs)
+        await _insert(db, Streak, summaries, batch_size)
+        await _insert(db, StreakRun, runs, batch_size)
+        await calendar.rebuild_days(db, [user_id])
+        await analytics.rebuild(db, [user_id])
+        await db.commit()
+
+    return {
+        "personas": len(doc.personas),
+        "milestones": len(doc.milestones),
+        "principles": len(doc.principles),
+        "schedule_blocks": len(doc.schedule_blocks),
+        "non_negotiables": len(doc.non_negotiables),
+        "daily_checks": len(doc.daily_checks),
+    }
@@ -0,0 +1,154 @@
+"""Outgoing mail over SMTP, plus a small in-process SMTP sink.
+
+``SmtpSender`` uses the standard library client in a worker thread, one
+connection per message. ``SmtpSink`` accepts mail on a local port and keeps
+it in memory; tests deliver to it, and it is handy as a dev mail catcher::
+
+    python -m app.services.mail --port 1025
+"""
+import argparse
+import asyncio
+import smtplib
+from dataclasses import dataclass, field
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+
+from app.core.config import Settings, settings
+
+
+class SmtpSender:
+    def __init__(self, host: str, port: int, sender: str, username: str | None = None,
+                 password: str | None = None, starttls: bool = False, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, config: Settings = settings) -> "SmtpSender":
+        return cls(config.smtp_host, config.smtp_port, config.mail_from, config.smtp_username,
+                   config.smtp_password, config.smtp_starttls)
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        await asyncio.to_thread(self._send, message)
+
+
+@dataclass
+class ReceivedMail:
+    sender: str
+    recipients: list[str]
+    message: EmailMessage
+
+
+@dataclass
+class SmtpSink:
+    """Minimal SMTP server that stores every message it accepts in ``received``.
+
+    Recipients listed in ``reject`` get a permanent 550 at RCPT time.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 0
+    reject: set[str] = field(default_factory=set)
+    received: list[ReceivedMail] = field(default_factory=list)
+
+    async def start(self) -> "SmtpSink":
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> "SmtpSink":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        sender, recipients = "", []
+        await reply("220 niyyah smtp sink")
+        try:
+            while line := await reader.readline():
+                verb, _, arg = line.decode().rstrip("\r\n").partition(" ")
+                verb = verb.upper()
+                if verb in ("EHLO", "HELO"):
+                    await reply("250 niyyah")
+                elif verb == "MAIL":
+                    sender, recipients = _address(arg), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipient = _address(arg)
+                    if recipient in self.reject:
+                        await reply("550 mailbox unavailable")
+                    else:
+                        recipients.append(recipient)
+                        await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 end data with <CR><LF>.<CR><LF>")
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    lines = data[:-5].split(b"\r\n")
+                    raw = b"\r\n".join(line[1:] if line.startswith(b"..") else line for line in lines)
+                    message = message_from_bytes(raw, policy=policy.default)
+                    self.received.append(ReceivedMail(sender, recipients, message))
+                    await reply("250 OK")
+                elif verb in ("RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 bye")
+                    break
+                else:
+                    await reply("502 command not implemented")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _address(arg: str) -> str:
+    return arg.partition(":")[2].strip().split(" ")[0].strip("<>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink that prints what it receives")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+
+    async def run():
+        sink = await SmtpSink(args.host, args.port).start()
+        print(f"smtp sink listening on {args.host}:{sink.port}")
+        seen = 0
+        while True:
+            await asyncio.sleep(0.5)
+            for mail in sink.received[seen:]:
+                print(f"--- {mail.sender} -> {', '.join(mail.recipients)}\n{mail.message}")
+            seen = len(sink.received)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
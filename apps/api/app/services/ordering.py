@@ -0,0 +1,153 @@
+"""Fractional order keys for user-ordered lists.
+
+Rows carry a ``rank`` string compared byte-wise (the column uses the "C"
+collation). A key can always be generated strictly between two others, so
+moving an item rewrites only that item's row, and appending reads a single
+``max(rank)`` from the ``(user_id, rank)`` index instead of counting the list.
+
+Keys are base-62 digit strings that never end in ``0``, which guarantees
+there is room before every key.
+
+Inserting into the same gap over and over lengthens keys by a digit every
+few inserts, and ``RankKey`` holds 64 characters. Appends count upward at
+the last key's length (``key_after``), so they stay short for as long as
+that length has room, and any write that would produce a key longer than
+``REBALANCE_LENGTH`` first respaces the user's list (``rebalance``) over the
+lower half of the key space, leaving the upper half for appends.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sync import next_change_seq
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+REBALANCE_LENGTH = 32
+
+
+def _midpoint(lo: str, hi: str | None) -> str:
+    """Digits strictly between fractions ``0.lo`` and ``0.hi`` (``None`` is 1.0)."""
+    if hi is not None:
+        n = 0
+        while n < len(hi) and (lo[n] if n < len(lo) else "0") == hi[n]:
+            n += 1
+        if n:
+            return hi[:n] + _midpoint(lo[n:], hi[n:])
+    lo_digit = DIGITS.index(lo[0]) if lo else 0
+    hi_digit = DIGITS.index(hi[0]) if hi is not None else BASE
+    if hi_digit - lo_digit > 1:
+        return DIGITS[(lo_digit + hi_digit + 1) // 2]
+    if hi is not None and len(hi) > 1:
+        return hi[:1]
+    return DIGITS[lo_digit] + _midpoint(lo[1:], None)
+
+
+def key_between(before: str | None, after: str | None) -> str:
+    """A key sorting after ``before`` and before ``after``; either may be None for an open end."""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"{before!r} must sort before {after!r}")
+    return _midpoint(before or "", after)
+
+
+def key_after(key: str | None) -> str:
+    """A short key sorting after ``key``: one more in its last digit that has room, else halfway to the end."""
+    for i in reversed(range(len(key or ""))):
+        digit = DIGITS.index(key[i])
+        if digit < BASE - 1:
+            return key[:i] + DIGITS[digit + 1]
+    return key_between(key, None)
+
+
+def spread_keys(count: int) -> list[str]:
+    """``count`` ascending keys spaced evenly across the key space, all the same short width."""
+    width = 1
+    while BASE**width <= count:
+        width += 1
+    keys = []
+    for i in range(1, count + 1):
+        value = i * BASE**width // (count + 1)
+        digits = ""
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits = DIGITS[digit] + digits
+        keys.append(digits.rstrip("0"))
+    return keys
+
+
+async def _last_rank(db: AsyncSession, model, user_id: int) -> str | None:
+    return await db.scalar(select(func.max(model.rank)).where(model.user_id == user_id))
+
+
+async def append_rank(db: AsyncSession, model, user_id: int) -> str:
+    """Key placing a new row of ``model`` after the user's last one."""
+    key = key_after(await _last_rank(db, model, user_id))
+    if len(key) > REBALANCE_LENGTH:
+        await rebalance(db, model, user_id)
+        key = key_after(await _last_rank(db, model, user_id))
+    return key
+
+
+async def append_ranks(db: AsyncSession, model, user_id: int, count: int) -> list[str]:
+    """``count`` ascending keys placing new rows of ``model`` after the user's last one."""
+    keys = spread_keys(count)
+    last = await _last_rank(db, model, user_id)
+    if last is not None and len(last) + len(keys[-1]) > REBALANCE_LENGTH:
+        await rebalance(db, model, user_id)
+        last = await _last_rank(db, model, user_id)
+    # Extending ``last`` keeps every key above it and below anything that sorts after it.
+    return [(last or "") + key for key in keys]
+
+
+async def _move_key(db: AsyncSession, model, user_id: int, after_id: int | None) -> str | None:
+    before = None
+    if after_id is not None:
+        before = await db.scalar(select(model.rank).where(model.id == after_id, model.user_id == user_id))
+        if before is None:
+            return None
+    upper = select(func.min(model.rank)).where(model.user_id == user_id)
+    if before is not None:
+        upper = upper.where(model.rank > before)
+    return key_between(before, await db.scalar(upper))
+
+
+async def move_rank(db: AsyncSession, model, user_id: int, after_id: int | None) -> str | None:
+    """Key placing a row directly after ``after_id`` (first when None), or None if ``after_id`` is not the user's."""
+    key = await _move_key(db, model, user_id, after_id)
+    if key is not None and len(key) > REBALANCE_LENGTH:
+        await rebalance(db, model, user_id)
+        key = await _move_key(db, model, user_id, after_id)
+    return key
+
+
+async def _assign(db: AsyncSession, model, user_id: int, ids: list[int], keys: list[str]) -> None:
+    seq = await db.run_sync(lambda session: next_change_seq(session.connection(), user_id))
+    await db.execute(
+        update(model)
+        .where(model.user_id == user_id, model.id.in_(ids))
+        .values(
+            rank=case(dict(zip(ids, keys)), value=model.id),
+            change_seq=seq,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reorder(db: AsyncSession, model, user_id: int, ids: list[int]) -> None:
+    """Rank the user's rows in ``ids`` in the given order with one UPDATE.
+
+    Ids the user does not own are ignored; rows left out keep their keys.
+    Bypasses the ORM, so the change sequence is stamped here.
+    """
+    ids = list(dict.fromkeys(ids))
+    if ids:
+        await _assign(db, model, user_id, ids, spread_keys(len(ids)))
+
+
+async def rebalance(db: AsyncSession, model, user_id: int) -> None:
+    """Respace all the user's keys, in their current order, over the lower half of the key space."""
+    ids = list((await db.execute(select(model.id).where(model.user_id == user_id).order_by(model.rank, model.id))).scalars())
+    if ids:
+        await _assign(db, model, user_id, ids, spread_keys(2 * len(ids))[:len(ids)])
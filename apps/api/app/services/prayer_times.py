@@ -0,0 +1,167 @@
+"""Astronomical prayer times, computed in-process.
+
+Uses the usual approximation (as in PrayTimes.org): the sun's declination
+and the equation of time give solar noon (Dhuhr); Fajr and Isha are when
+the sun is a method-specific angle below the horizon, Sunrise and Maghrib
+when its upper limb crosses the horizon (0.833 degrees with refraction), and
+Asr when a shadow equals the object's length plus its noon shadow.
+
+A year is computed column-wise: each quantity is evaluated for every day of
+the year in one pass, then refined once from the first estimate. At high
+latitudes where the sun never gets low enough for Fajr or Isha, the
+angle-based rule takes ``angle / 60`` of the night instead.
+
+Years are cached per process by coordinates rounded to two decimals (about
+1 km, a few seconds of prayer time), method and year, so users in the same
+city share one computation.
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+PRAYERS = ("fajr", "dhuhr", "asr", "maghrib", "isha")
+TIMES = ("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha")
+# Local solar hour each time is first estimated at.
+FIRST_GUESS = {"fajr": 5, "sunrise": 6, "dhuhr": 12, "asr": 13, "maghrib": 18, "isha": 18}
+HORIZON = 0.833
+ASR_SHADOW = 1  # Shafi'i, Maliki, Hanbali; Hanafi would be 2
+
+
+@dataclass(frozen=True)
+class Method:
+    fajr_angle: float
+    isha_angle: float | None = None
+    isha_minutes: int | None = None  # after Maghrib, instead of an angle
+
+
+METHODS = {
+    "MWL": Method(18, 17),
+    "ISNA": Method(15, 15),
+    "Egypt": Method(19.5, 17.5),
+    "Makkah": Method(18.5, isha_minutes=90),
+    "Karachi": Method(18, 18),
+}
+
+
+@dataclass(frozen=True)
+class YearTimes:
+    """Times for every day of ``year`` as UTC hours after that day's midnight (may fall outside 0-24)."""
+
+    year: int
+    columns: dict[str, tuple[float, ...]]
+
+    def day(self, d: date) -> dict[str, float]:
+        i = d.timetuple().tm_yday - 1
+        return {name: column[i] for name, column in self.columns.items()}
+
+
+def _julian(d: date) -> float:
+    year, month = (d.year - 1, d.month + 12) if d.month <= 2 else (d.year, d.month)
+    a = year // 100
+    b = 2 - a + a // 4
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + d.day + b - 1524.5
+
+
+def _sun(jds: list[float]) -> tuple[list[float], list[float]]:
+    """Declination (radians) and equation of time (hours) at each Julian date."""
+    decls, eqts = [], []
+    for jd in jds:
+        d = jd - 2451545.0
+        g = math.radians(357.529 + 0.98560028 * d)
+        q = 280.459 + 0.98564736 * d
+        lon = math.radians(q + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g))
+        e = math.radians(23.439 - 0.00000036 * d)
+        ra = math.degrees(math.atan2(math.cos(e) * math.sin(lon), math.cos(lon))) / 15
+        decls.append(math.asin(math.sin(e) * math.sin(lon)))
+        eqts.append((q / 15 - ra + 12) % 24 - 12)
+    return decls, eqts
+
+
+def _hour_angle(altitude: float, decl: float, lat: float) -> float:
+    """Hours from solar noon until the sun is at ``altitude`` degrees; NaN if it never is."""
+    cos_h = (math.sin(math.radians(altitude)) - math.sin(decl) * math.sin(lat)) / (math.cos(decl) * math.cos(lat))
+    if cos_h < -1 or cos_h > 1:
+        return math.nan
+    return math.degrees(math.acos(cos_h)) / 15
+
+
+def _pass(jd0: list[float], lat: float, method: Method, guess: dict[str, list[float]]) -> dict[str, list[float]]:
+    out: dict[str, list[float]] = {}
+    for name in TIMES:
+        decls, eqts = _sun([jd + h / 24 for jd, h in zip(jd0, guess[name])])
+        noons = [12 - e for e in eqts]
+        if name == "dhuhr":
+            out[name] = noons
+            continue
+        if name == "asr":
+            altitudes = [math.degrees(math.atan(1 / (ASR_SHADOW + math.tan(abs(lat - d))))) for d in decls]
+        elif name == "fajr":
+            altitudes = [-method.fajr_angle] * len(decls)
+        elif name == "isha" and method.isha_angle is not None:
+            altitudes = [-method.isha_angle] * len(decls)
+        else:
+            altitudes = [-HORIZON] * len(decls)
+        sign = -1 if name in ("fajr", "sunrise") else 1
+        out[name] = [n + sign * _hour_angle(a, d, lat) for n, a, d in zip(noons, altitudes, decls)]
+    if method.isha_minutes is not None:
+        out["isha"] = [m + method.isha_minutes / 60 for m in out["maghrib"]]
+    return out
+
+
+def _adjust_high_latitudes(times: dict[str, list[float]], method: Method) -> None:
+    for i, (sunrise, sunset) in enumerate(zip(times["sunrise"], times["maghrib"])):
+        if math.isnan(sunrise) or math.isnan(sunset):
+            continue
+        night = 24 - (sunset - sunrise)
+        portion = night * method.fajr_angle / 60
+        if math.isnan(times["fajr"][i]) or sunrise - times["fajr"][i] > portion:
+            times["fajr"][i] = sunrise - portion
+        if method.isha_angle is not None:
+            portion = night * method.isha_angle / 60
+            if math.isnan(times["isha"][i]) or times["isha"][i] - sunset > portion:
+                times["isha"][i] = sunset + portion
+
+
+def compute_year(latitude: float, longitude: float, method: Method, year: int) -> YearTimes:
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+    # Julian date of local solar midnight for each day.
+    jd0 = [_julian(first) + i - longitude / (15 * 24) for i in range(days)]
+    lat = math.radians(latitude)
+    guess = {name: [float(h)] * days for name, h in FIRST_GUESS.items()}
+    times = _pass(jd0, lat, method, guess)
+    refined = {name: [g if math.isnan(t) else t for t, g in zip(times[name], guess[name])] for name in TIMES}
+    times = _pass(jd0, lat, method, refined)
+    _adjust_high_latitudes(times, method)
+    shift = longitude / 15
+    return YearTimes(year, {name: tuple(t - shift for t in times[name]) for name in TIMES})
+
+
+@lru_cache(maxsize=1024)
+def _cached_year(latitude: float, longitude: float, method: str, year: int) -> YearTimes:
+    return compute_year(latitude, longitude, METHODS[method], year)
+
+
+def year_times(latitude: float, longitude: float, method: str, year: int) -> YearTimes:
+    """``compute_year`` for ``METHODS[method]``, shared by everyone within ~1 km."""
+    return _cached_year(round(latitude, 2), round(longitude, 2), method, year)
+
+
+def local_times(latitude: float, longitude: float, method: str, day: date, tz: ZoneInfo) -> dict[str, datetime | None]:
+    """Times on ``day`` in ``tz``, rounded to the minute; ``None`` where the sun never reaches the angle."""
+    hours = year_times(latitude, longitude, method, day.year).day(day)
+    midnight = datetime.combine(day, time(), timezone.utc)
+    result: dict[str, datetime | None] = {}
+    for name, h in hours.items():
+        if math.isnan(h):
+            result[name] = None
+            continue
+        moment = midnight + timedelta(minutes=round(h * 60))
+        # UTC hours are relative to the UTC date; keep the local date on ``day``.
+        local = moment.astimezone(tz)
+        if local.date() != day:
+            local = (moment + timedelta(days=(day - local.date()).days)).astimezone(tz)
+        result[name] = local
+    return result
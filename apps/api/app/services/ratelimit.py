@@ -0,0 +1,129 @@
+"""Sliding-window rate limits for the password-hashing auth routes.
+
+Login and register each cost a bcrypt operation, so they are limited per
+client IP and (for login) per email before any hashing happens. Counters
+live in Redis so the limits hold across replicas.
+
+Each limit uses a sliding window counter: one counter per fixed window,
+with the previous window's count weighted by how much of it still
+overlaps the sliding window. That is two small keys per client instead of
+a log of timestamps. The check-and-increment is one Lua script call.
+
+The client IP is ``request.client.host``; behind a proxy run uvicorn with
+``--proxy-headers`` so that is the real client. If Redis is unreachable the
+request is let through.
+"""
+import logging
+import math
+import time
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import MemoryRedis, get_redis
+from app.core.security import hash_token
+
+logger = logging.getLogger(__name__)
+
+clock = time.time
+
+# KEYS[1] = current window, KEYS[2] = previous window
+# ARGV[1] = limit, ARGV[2] = window seconds, ARGV[3] = weight of the previous window
+# Returns {allowed, current count, previous count}.
+HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[3]) + current + 1 > tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], 2 * tonumber(ARGV[2]))
+return {1, current + 1, previous}
+"""
+
+
+def _seconds(wait: float) -> int:
+    return max(1, math.ceil(round(wait, 6)))
+
+
+def retry_after(limit: int, window: int, elapsed: float, current: int, previous: int) -> int:
+    """Seconds until one more hit fits under ``limit``."""
+    if current < limit:
+        # Wait for enough of the previous window to slide out.
+        overlap = (limit - 1 - current) / previous if previous else 1
+        return _seconds((1 - overlap) * window - elapsed)
+    # The current window alone is full: wait into the next one, where it becomes the previous window.
+    overlap = (limit - 1) / current if current else 0
+    return _seconds(window - elapsed + (1 - overlap) * window)
+
+
+class SlidingWindowLimiter:
+    def __init__(self, redis):
+        self.redis = redis
+        self._hit = redis.register_script(HIT_SCRIPT)
+
+    async def hit(self, key: str, limit: int, window: int) -> int:
+        """Count one hit against ``key``; returns 0 if allowed, else seconds to wait."""
+        now = clock()
+        index = int(now // window)
+        elapsed = now - index * window
+        keys = [f"{key}:{index}", f"{key}:{index - 1}"]
+        allowed, current, previous = await self._hit(keys=keys, args=[limit, window, 1 - elapsed / window])
+        if allowed:
+            return 0
+        return retry_after(limit, window, elapsed, int(current), int(previous))
+
+
+class MemorySlidingWindowLimiter(SlidingWindowLimiter):
+    """``SlidingWindowLimiter`` over ``MemoryRedis``, which cannot run scripts."""
+
+    def __init__(self, redis: MemoryRedis):
+        self.redis = redis
+        self._hit = self._hit_in_memory
+
+    async def _hit_in_memory(self, keys: list[str], args: list) -> list[int]:
+        limit, window, weight = args
+        current = int(await self.redis.get(keys[0]) or 0)
+        previous = int(await self.redis.get(keys[1]) or 0)
+        if previous * weight + current + 1 > limit:
+            return [0, current, previous]
+        await self.redis.set(keys[0], current + 1, ex=2 * window)
+        return [1, current + 1, previous]
+
+
+def get_limiter() -> SlidingWindowLimiter:
+    redis = get_redis()
+    if isinstance(redis, MemoryRedis):
+        return MemorySlidingWindowLimiter(redis)
+    return SlidingWindowLimiter(redis)
+
+
+def _limits(route: str, request: Request, email: str | None) -> list[tuple[str, int]]:
+    ip = request.client.host if request.client else "unknown"
+    if route == "register":
+        return [(f"ratelimit:register:ip:{ip}", settings.rate_limit_register_per_ip)]
+    limits = [(f"ratelimit:login:ip:{ip}", settings.rate_limit_login_per_ip)]
+    if email:
+        limits.append((f"ratelimit:login:email:{hash_token(email.strip().lower())}", settings.rate_limit_login_per_email))
+    return limits
+
+
+async def enforce_rate_limit(route: str, request: Request, email: str | None = None) -> None:
+    """Raise 429 with ``Retry-After`` if ``route`` is over any of its limits for this client."""
+    if not settings.rate_limit_enabled:
+        return
+    limiter = get_limiter()
+    window = settings.rate_limit_window_seconds
+    for key, limit in _limits(route, request, email):
+        try:
+            wait = await limiter.hit(key, limit, window)
+        except RedisError:
+            logger.warning("rate limiter unavailable, letting %s through", route, exc_info=True)
+            return
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, retry later",
+                headers={"Retry-After": str(wait)},
+            )
@@ -0,0 +1,312 @@
+"""Drawing for monthly progress reports, with no imaging dependencies.
+
+``render_pdf`` writes a PDF 1.4 file using the standard Helvetica fonts and
+``render_png`` rasterizes the same layout with a built-in 5x7 pixel font.
+Both are pure functions of a ``Report`` so they can run in a worker process.
+"""
+import struct
+import zlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.reports import Report
+
+Color = tuple[int, int, int]
+
+INK: Color = (15, 23, 42)
+MUTED: Color = (100, 116, 139)
+ACCENT: Color = (225, 29, 72)
+DONE: Color = (22, 163, 74)
+MISSED: Color = (226, 232, 240)
+UNTRACKED: Color = (248, 250, 252)
+WHITE: Color = (255, 255, 255)
+CELL_COLORS = {"x": DONE, ".": MISSED, " ": UNTRACKED}
+
+
+def parse_color(value: str, default: Color = MUTED) -> Color:
+    """``#rrggbb`` to an RGB tuple, ``default`` for anything else."""
+    if len(value) == 7 and value.startswith("#"):
+        try:
+            return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+        except ValueError:
+            pass
+    return default
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "."
+
+
+def _summary_line(report: "Report") -> str:
+    return f"Overall completion: {report.pct}% ({report.completed} of {report.possible} habit-days)"
+
+
+def _period_line(report: "Report") -> str:
+    if report.closed:
+        return f"1 - {report.days_in_month} {report.month_name}"
+    return f"1 - {report.as_of.day} {report.month_name} (month in progress)"
+
+
+# --- PDF -------------------------------------------------------------------
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595  # A4 landscape, in points
+MARGIN = 40
+LABEL_WIDTH = 170
+CELL = 16
+ROW = 18
+
+
+def _pdf_text(value: str) -> str:
+    raw = value.encode("latin-1", "replace").decode("latin-1")
+    return raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_rgb(color: Color) -> str:
+    return " ".join(f"{c / 255:.3f}" for c in color)
+
+
+class _Pages:
+    """Content streams for each page, drawn top-down in points."""
+
+    def __init__(self):
+        self.pages: list[list[str]] = []
+        self.y = 0.0
+        self.new_page()
+
+    def new_page(self) -> None:
+        self.pages.append([])
+        self.y = MARGIN
+
+    def ensure(self, height: float) -> None:
+        if self.y + height > PAGE_HEIGHT - MARGIN:
+            self.new_page()
+
+    def text(self, x: float, y: float, size: float, value: str, bold: bool = False, color: Color = INK) -> None:
+        font = "F2" if bold else "F1"
+        self.pages[-1].append(
+            f"{_pdf_rgb(color)} rg BT /{font} {size} Tf {x:.1f} {PAGE_HEIGHT - y:.1f} Td ({_pdf_text(value)}) Tj ET"
+        )
+
+    def rect(self, x: float, y: float, w: float, h: float, color: Color) -> None:
+        self.pages[-1].append(f"{_pdf_rgb(color)} rg {x:.1f} {PAGE_HEIGHT - y - h:.1f} {w:.1f} {h:.1f} re f")
+
+
+def _pdf_file(pages: list[list[str]]) -> bytes:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for ops in pages:
+        stream = zlib.compress("\n".join(ops).encode("latin-1"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_pdf(report: "Report") -> bytes:
+    doc = _Pages()
+    doc.text(MARGIN, doc.y + 18, 20, f"Progress report: {report.month_name}", bold=True)
+    doc.text(MARGIN, doc.y + 36, 10, _period_line(report), color=MUTED)
+    doc.text(MARGIN, doc.y + 56, 12, _summary_line(report))
+    doc.y += 80
+
+    grid_x = MARGIN + LABEL_WIDTH
+    stats_x = grid_x + report.days_in_month * CELL + 8
+
+    def grid_header() -> None:
+        doc.text(MARGIN, doc.y + 12, 13, "Habits", bold=True)
+        for day in range(1, report.days_in_month + 1):
+            doc.text(grid_x + (day - 1) * CELL + (4 if day < 10 else 1.5), doc.y + 26, 7, str(day), color=MUTED)
+        doc.text(stats_x, doc.y + 26, 7, "done / best run", color=MUTED)
+        doc.y += 32
+
+    grid_header()
+    if not report.habits:
+        doc.text(MARGIN, doc.y + 12, 10, "No habits were tracked this month.", color=MUTED)
+        doc.y += ROW
+    for habit in report.habits:
+        if doc.y + ROW > PAGE_HEIGHT - MARGIN:
+            doc.new_page()
+            grid_header()
+        doc.text(MARGIN, doc.y + 12, 9, _clip(habit.title, 34))
+        for i, state in enumerate(habit.days):
+            doc.rect(grid_x + i * CELL, doc.y + 2, CELL - 2, CELL - 2, CELL_COLORS[state])
+        doc.text(stats_x, doc.y + 12, 9, f"{habit.completed}/{habit.possible}  {habit.best_run}d")
+        doc.y += ROW
+
+    doc.y += 6
+    for i, (label, color) in enumerate((("done", DONE), ("missed", MISSED), ("not tracked", UNTRACKED))):
+        x = grid_x + i * 80
+        doc.rect(x, doc.y, 8, 8, color)
+        doc.text(x + 12, doc.y + 7.5, 8, label, color=MUTED)
+    doc.y += 28
+
+    if report.personas:
+        doc.ensure(40)
+        doc.text(MARGIN, doc.y + 12, 13, "Personas", bold=True)
+        doc.y += 24
+    for persona in report.personas:
+        doc.ensure(ROW * (1 + len(persona.milestones)))
+        doc.rect(MARGIN, doc.y + 3, 10, 10, parse_color(persona.color))
+        doc.text(MARGIN + 16, doc.y + 12, 11, _clip(f"{persona.name} - {persona.domain}", 90), bold=True)
+        doc.y += ROW
+        for milestone in persona.milestones:
+            mark = "[x]" if milestone.completed else "[  ]"
+            doc.text(MARGIN + 16, doc.y + 10, 9, f"{mark} {_clip(milestone.goal, 100)} (due {milestone.target_date})")
+            doc.y += 14
+        doc.y += 4
+    return _pdf_file(doc.pages)
+
+
+# --- PNG -------------------------------------------------------------------
+
+# 5x7 glyphs, one row per group, most significant bit on the left.
+_GLYPH_ROWS = {
+    "A": "01110 10001 10001 11111 10001 10001 10001",
+    "B": "11110 10001 10001 11110 10001 10001 11110",
+    "C": "01110 10001 10000 10000 10000 10001 01110",
+    "D": "11110 10001 10001 10001 10001 10001 11110",
+    "E": "11111 10000 10000 11110 10000 10000 11111",
+    "F": "11111 10000 10000 11110 10000 10000 10000",
+    "G": "01110 10001 10000 10111 10001 10001 01111",
+    "H": "10001 10001 10001 11111 10001 10001 10001",
+    "I": "01110 00100 00100 00100 00100 00100 01110",
+    "J": "00111 00010 00010 00010 00010 10010 01100",
+    "K": "10001 10010 10100 11000 10100 10010 10001",
+    "L": "10000 10000 10000 10000 10000 10000 11111",
+    "M": "10001 11011 10101 10101 10001 10001 10001",
+    "N": "10001 10001 11001 10101 10011 10001 10001",
+    "O": "01110 10001 10001 10001 10001 10001 01110",
+    "P": "11110 10001 10001 11110 10000 10000 10000",
+    "Q": "01110 10001 10001 10001 10101 10010 01101",
+    "R": "11110 10001 10001 11110 10100 10010 10001",
+    "S": "01111 10000 10000 01110 00001 00001 11110",
+    "T": "11111 00100 00100 00100 00100 00100 00100",
+    "U": "10001 10001 10001 10001 10001 10001 01110",
+    "V": "10001 10001 10001 10001 10001 01010 00100",
+    "W": "10001 10001 10001 10101 10101 10101 01010",
+    "X": "10001 10001 01010 00100 01010 10001 10001",
+    "Y": "10001 10001 01010 00100 00100 00100 00100",
+    "Z": "11111 00001 00010 00100 01000 10000 11111",
+    "0": "01110 10001 10011 10101 11001 10001 01110",
+    "1": "00100 01100 00100 00100 00100 00100 01110",
+    "2": "01110 10001 00001 00010 00100 01000 11111",
+    "3": "11111 00010 00100 00010 00001 10001 01110",
+    "4": "00010 00110 01010 10010 11111 00010 00010",
+    "5": "11111 10000 11110 00001 00001 10001 01110",
+    "6": "00110 01000 10000 11110 10001 10001 01110",
+    "7": "11111 00001 00010 00100 01000 01000 01000",
+    "8": "01110 10001 10001 01110 10001 10001 01110",
+    "9": "01110 10001 10001 01111 00001 00010 01100",
+    " ": "00000 00000 00000 00000 00000 00000 00000",
+    "-": "00000 00000 00000 11111 00000 00000 00000",
+    "+": "00000 00100 00100 11111 00100 00100 00000",
+    "%": "11000 11001 00010 00100 01000 10011 00011",
+    "/": "00000 00001 00010 00100 01000 10000 00000",
+    ":": "00000 01100 01100 00000 01100 01100 00000",
+    ".": "00000 00000 00000 00000 00000 01100 01100",
+    ",": "00000 00000 00000 00000 01100 00100 01000",
+    "'": "01100 00100 01000 00000 00000 00000 00000",
+    "(": "00010 00100 01000 01000 01000 00100 00010",
+    ")": "01000 00100 00010 00010 00010 00100 01000",
+    "&": "01100 10010 10100 01000 10101 10010 01101",
+    "?": "01110 10001 00001 00010 00100 00000 00100",
+}
+GLYPHS = {ch: tuple(int(row, 2) for row in rows.split()) for ch, rows in _GLYPH_ROWS.items()}
+
+
+class _Canvas:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(WHITE * (width * height))
+
+    def rect(self, x: int, y: int, w: int, h: int, color: Color) -> None:
+        x0, x1 = max(x, 0), min(x + w, self.width)
+        if x1 <= x0:
+            return
+        span = bytes(color) * (x1 - x0)
+        for row in range(max(y, 0), min(y + h, self.height)):
+            start = (row * self.width + x0) * 3
+            self.pixels[start:start + len(span)] = span
+
+    def text(self, x: int, y: int, value: str, scale: int = 2, color: Color = INK) -> int:
+        """Draw ``value`` upper-cased with its top-left at (x, y); returns the x after it."""
+        for ch in value.upper():
+            glyph = GLYPHS.get(ch, GLYPHS["?"])
+            for r, bits in enumerate(glyph):
+                for c in range(5):
+                    if bits & (0b10000 >> c):
+                        self.rect(x + c * scale, y + r * scale, scale, scale, color)
+            x += 6 * scale
+        return x
+
+    def png(self) -> bytes:
+        stride = self.width * 3
+        raw = b"".join(b"\x00" + self.pixels[row * stride:(row + 1) * stride] for row in range(self.height))
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+PX_MARGIN = 16
+PX_LABEL = 200
+PX_CELL = 16
+PX_ROW = 20
+PX_STATS = 84
+
+
+def render_png(report: "Report") -> bytes:
+    grid_x = PX_MARGIN + PX_LABEL
+    stats_x = grid_x + report.days_in_month * PX_CELL + 8
+    width = stats_x + PX_STATS + PX_MARGIN
+    habits_y = 100
+    personas_y = habits_y + max(len(report.habits), 1) * PX_ROW + 16
+    height = personas_y + len(report.personas) * PX_ROW + PX_MARGIN
+
+    canvas = _Canvas(width, height)
+    canvas.rect(0, 0, width, 4, ACCENT)
+    canvas.text(PX_MARGIN, 16, report.month_name, scale=3)
+    canvas.text(PX_MARGIN, 46, _summary_line(report)[len("Overall completion: "):])
+    canvas.text(PX_MARGIN, 66, _period_line(report), scale=1, color=MUTED)
+
+    for day in range(1, report.days_in_month + 1):
+        label = str(day)
+        canvas.text(grid_x + (day - 1) * PX_CELL + (8 - 3 * len(label)), habits_y - 12, label, scale=1, color=MUTED)
+    if not report.habits:
+        canvas.text(PX_MARGIN, habits_y + 3, "No habits tracked", color=MUTED)
+    for i, habit in enumerate(report.habits):
+        y = habits_y + i * PX_ROW
+        canvas.text(PX_MARGIN, y + 3, _clip(habit.title, PX_LABEL // 12))
+        for d, state in enumerate(habit.days):
+            canvas.rect(grid_x + d * PX_CELL, y + 2, PX_CELL - 2, PX_CELL - 2, CELL_COLORS[state])
+        canvas.text(stats_x, y + 3, f"{habit.completed}/{habit.possible}")
+
+    for i, persona in enumerate(report.personas):
+        y = personas_y + i * PX_ROW
+        canvas.rect(PX_MARGIN, y + 2, 14, 14, parse_color(persona.color))
+        done = sum(m.completed for m in persona.milestones)
+        goals = f"  {done}/{len(persona.milestones)} milestones" if persona.milestones else ""
+        canvas.text(PX_MARGIN + 22, y + 3, _clip(f"{persona.name}{goals}", (width - PX_MARGIN * 2 - 22) // 12))
+    return canvas.png()
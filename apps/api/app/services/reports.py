@@ -0,0 +1,297 @@
+"""Monthly progress reports (Pro).
+
+``load_report`` gathers one month of habit checks and the personas'
+milestones due that month in four queries. Drawing the PDF or PNG is
+CPU-bound pure Python, so ``render`` hands it to a process pool and keeps
+the event loop free; concurrent requests for the same artifact share one
+render.
+
+Rendered bytes are cached in Redis under a digest of the report's data,
+not of the request: a month whose checks, habits and milestones have not
+changed is served from cache, which for a closed month is every request
+until a check is backfilled into it. Computing the digest takes the four
+queries, so each artifact is also indexed by the user's ``personas`` and
+``non_negotiables`` versions (see ``app.services.changes``): while neither
+has been bumped, ``cached`` finds the bytes without touching the database.
+"""
+import asyncio
+import calendar as cal
+import hashlib
+import json
+import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.persona import Milestone, Persona
+from app.models.tracker import DailyCheck, NonNegotiable
+from app.services.report_render import render_pdf, render_png
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so cached artifacts are not served for it.
+RENDER_VERSION = 1
+FORMATS = {"pdf": "application/pdf", "png": "image/png"}
+CLOSED_TTL_SECONDS = 30 * 86400
+OPEN_TTL_SECONDS = 86400
+# What a report is built from; every write to it bumps one of these versions.
+REPORT_RESOURCES = ("personas", "non_negotiables")
+
+
+@dataclass(frozen=True)
+class HabitRow:
+    title: str
+    days: str  # one character per day of the month: "x" done, "." missed, " " not tracked
+
+    @property
+    def completed(self) -> int:
+        return self.days.count("x")
+
+    @property
+    def possible(self) -> int:
+        return self.completed + self.days.count(".")
+
+    @property
+    def best_run(self) -> int:
+        return max(len(run) for run in re.split(r"[^x]+", self.days))
+
+
+@dataclass(frozen=True)
+class MilestoneRow:
+    goal: str
+    target_date: date
+    completed: bool
+
+
+@dataclass(frozen=True)
+class PersonaRow:
+    name: str
+    domain: str
+    color: str
+    milestones: tuple[MilestoneRow, ...]
+
+
+@dataclass(frozen=True)
+class Report:
+    year: int
+    month: int
+    as_of: date  # last day the report covers: the month's end, or today while it is open
+    habits: tuple[HabitRow, ...]
+    personas: tuple[PersonaRow, ...]
+
+    @property
+    def days_in_month(self) -> int:
+        return cal.monthrange(self.year, self.month)[1]
+
+    @property
+    def closed(self) -> bool:
+        return self.as_of.day == self.days_in_month
+
+    @property
+    def month_name(self) -> str:
+        return f"{cal.month_name[self.month]} {self.year}"
+
+    @property
+    def completed(self) -> int:
+        return sum(h.completed for h in self.habits)
+
+    @property
+    def possible(self) -> int:
+        return sum(h.possible for h in self.habits)
+
+    @property
+    def pct(self) -> int:
+        return round(self.completed * 100 / self.possible) if self.possible else 0
+
+    def digest(self) -> str:
+        payload = json.dumps([RENDER_VERSION, asdict(self)], default=str, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def report_as_of(year: int, month: int, today: date) -> date:
+    """Last day a report for the month covers on ``today``."""
+    return min(date(year, month, cal.monthrange(year, month)[1]), today)
+
+
+async def load_report(db: AsyncSession, user_id: int, year: int, month: int, today: date) -> Report:
+    first = date(year, month, 1)
+    last = first.replace(day=cal.monthrange(year, month)[1])
+    as_of = report_as_of(year, month, today)
+    next_month = datetime.combine(last + timedelta(days=1), time(), tzinfo=timezone.utc)
+
+    habits = (
+        await db.execute(
+            select(NonNegotiable.id, NonNegotiable.title, NonNegotiable.created_at)
+            .where(NonNegotiable.user_id == user_id, NonNegotiable.created_at < next_month)
+            .order_by(NonNegotiable.rank, NonNegotiable.id)
+        )
+    ).all()
+    checked = set(
+        (
+            await db.execute(
+                select(DailyCheck.non_negotiable_id, DailyCheck.check_date)
+                .join(NonNegotiable, NonNegotiable.id == DailyCheck.non_negotiable_id)
+                .where(
+                    NonNegotiable.user_id == user_id,
+                    DailyCheck.check_date.between(first, as_of),
+                    DailyCheck.is_completed.is_(True),
+                )
+            )
+        ).all()
+    )
+    personas = (
+        await db.execute(
+            select(Persona.id, Persona.name, Persona.domain, Persona.color)
+            .where(Persona.user_id == user_id)
+            .order_by(Persona.rank, Persona.id)
+        )
+    ).all()
+    milestones: dict[int, list[MilestoneRow]] = {p.id: [] for p in personas}
+    rows = await db.execute(
+        select(Milestone.persona_id, Milestone.goal, Milestone.target_date, Milestone.is_completed)
+        .join(Persona, Persona.id == Milestone.persona_id)
+        .where(Persona.user_id == user_id, Milestone.target_date.between(first, last))
+        .order_by(Milestone.target_date, Milestone.id)
+    )
+    for persona_id, goal, target_date, completed in rows:
+        milestones[persona_id].append(MilestoneRow(goal, target_date, completed))
+
+    habit_rows = []
+    for habit_id, title, created_at in habits:
+        tracked_from = max(first, created_at.date())
+        days = []
+        for n in range(last.day):
+            day = first + timedelta(days=n)
+            if day < tracked_from or day > as_of:
+                days.append(" ")
+            else:
+                days.append("x" if (habit_id, day) in checked else ".")
+        habit_rows.append(HabitRow(title, "".join(days)))
+    return Report(
+        year=year,
+        month=month,
+        as_of=as_of,
+        habits=tuple(habit_rows),
+        personas=tuple(PersonaRow(p.name, p.domain, p.color, tuple(milestones[p.id])) for p in personas),
+    )
+
+
+class ReportCache:
+    """Rendered reports in Redis; a Redis outage only costs a re-render."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(user_id: int, year: int, month: int, fmt: str, digest: str) -> str:
+        return f"report:{user_id}:{year}-{month:02d}:{fmt}:{digest}"
+
+    @staticmethod
+    def index_key(user_id: int, year: int, month: int, fmt: str, as_of: date, versions: list[int]) -> str:
+        parts = "-".join(f"{v:x}" for v in versions)
+        return f"report-index:{user_id}:{year}-{month:02d}:{fmt}:{RENDER_VERSION}:{as_of.isoformat()}:{parts}"
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await get_redis().get(key)
+        except RedisError:
+            self.errors += 1
+            logger.warning("report cache unavailable", exc_info=True)
+            return None
+
+    async def set(self, key: str, content: bytes, ttl: int) -> None:
+        try:
+            await get_redis().set(key, content, ex=ttl)
+        except RedisError:
+            self.errors += 1
+            logger.warning("failed to cache report %s", key, exc_info=True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+report_cache = ReportCache()
+
+_RENDERERS = {"pdf": render_pdf, "png": render_png}
+_pool: ProcessPoolExecutor | None = None
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _executor() -> ProcessPoolExecutor | None:
+    global _pool
+    if _pool is None and settings.report_render_processes > 0:
+        _pool = ProcessPoolExecutor(max_workers=settings.report_render_processes)
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _render(report: Report, fmt: str) -> bytes:
+    pool = _executor()
+    if pool is None:
+        return await asyncio.to_thread(_RENDERERS[fmt], report)
+    return await asyncio.get_running_loop().run_in_executor(pool, _RENDERERS[fmt], report)
+
+
+async def cached(user_id: int, year: int, month: int, fmt: str, as_of: date, versions: list[int] | None) -> tuple[str, bytes] | None:
+    """The digest and bytes ``render`` stored for the month at ``versions``, if still cached."""
+    if versions is None:
+        return None
+    digest = await report_cache.get(ReportCache.index_key(user_id, year, month, fmt, as_of, versions))
+    if digest is None:
+        return None
+    digest = digest.decode() if isinstance(digest, bytes) else digest
+    content = await report_cache.get(ReportCache.key(user_id, year, month, fmt, digest))
+    if content is None:
+        return None
+    report_cache.hits += 1
+    return digest, content
+
+
+async def render(user_id: int, report: Report, fmt: str, versions: list[int] | None = None) -> tuple[bytes, bool]:
+    """The report's bytes in ``fmt`` and whether they came from cache.
+
+    With the ``REPORT_RESOURCES`` versions the report was loaded at, also
+    indexes the bytes under them for ``cached``.
+    """
+    digest = report.digest()
+    key = ReportCache.key(user_id, report.year, report.month, fmt, digest)
+    ttl = CLOSED_TTL_SECONDS if report.closed else OPEN_TTL_SECONDS
+    content = await report_cache.get(key)
+    hit = content is not None
+    if hit:
+        report_cache.hits += 1
+    else:
+        report_cache.misses += 1
+        pending = _inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), False
+        pending = _inflight[key] = asyncio.ensure_future(_render(report, fmt))
+        try:
+            content = await asyncio.shield(pending)
+        finally:
+            _inflight.pop(key, None)
+        await report_cache.set(key, content, ttl)
+    if versions is not None:
+        await report_cache.set(ReportCache.index_key(user_id, report.year, report.month, fmt, report.as_of, versions), digest.encode(), ttl)
+    return content, hit
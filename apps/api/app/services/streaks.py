@@ -0,0 +1,204 @@
+"""Incremental streak engine.
+
+Each habit keeps a run index in ``streak_runs``: the maximal runs of checked
+days where consecutive checks are at most ``grace_days + 1`` days apart. A
+check or uncheck at any date touches at most two neighbouring runs, found
+through the ``(non_negotiable_id, start_date)`` index, and ``Streak`` is
+refreshed from the latest run and the longest run (``length`` index) without
+rescanning the habit's history.
+
+Checked days come from ``daily_checks``, or from the monthly bitmaps when
+``check_months.reads_enabled()``.
+
+The planning functions are pure so they can be checked against a brute-force
+recomputation; the async functions apply them to the database.
+"""
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tracker import DailyCheck, NonNegotiable, Streak, StreakRun
+from app.services import check_months
+
+
+@dataclass(frozen=True)
+class Run:
+    start: date
+    end: date
+
+    @property
+    def length(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+def build_runs(days: Iterable[date], grace: int) -> list[Run]:
+    runs: list[Run] = []
+    limit = timedelta(days=grace + 1)
+    for day in sorted(set(days)):
+        if runs and day - runs[-1].end <= limit:
+            runs[-1] = Run(runs[-1].start, day)
+        else:
+            runs.append(Run(day, day))
+    return runs
+
+
+def summarize(runs: list[Run]) -> dict:
+    """``Streak`` summary columns for a habit whose run index is ``runs``, oldest first."""
+    latest = runs[-1] if runs else None
+    return {
+        "current_streak": latest.length if latest else 0,
+        "last_check_date": latest.end if latest else None,
+        "longest_streak": max((r.length for r in runs), default=0),
+    }
+
+
+def plan_insert(day: date, neighbors: list[Run]) -> Run | None:
+    """Run replacing ``neighbors`` once ``day`` is checked, or None if nothing changes.
+
+    ``neighbors`` are the runs within ``grace + 1`` days of ``day``.
+    """
+    if any(r.start <= day <= r.end for r in neighbors):
+        return None
+    return Run(min([day] + [r.start for r in neighbors]), max([day] + [r.end for r in neighbors]))
+
+
+def plan_delete(day: date, run: Run, prev: date | None, nxt: date | None, grace: int) -> list[Run]:
+    """Runs replacing ``run`` once ``day`` is unchecked.
+
+    ``prev``/``nxt`` are the closest checked days before/after ``day`` inside ``run``.
+    """
+    if prev and nxt:
+        if (nxt - prev).days <= grace + 1:
+            return [run]
+        return [Run(run.start, prev), Run(nxt, run.end)]
+    if prev:
+        return [Run(run.start, prev)]
+    if nxt:
+        return [Run(nxt, run.end)]
+    return []
+
+
+def _window(day: date, grace: int) -> tuple[date, date]:
+    reach = timedelta(days=grace + 1)
+    return day - reach, day + reach
+
+
+async def _runs_touching(db: AsyncSession, nn_id: int, lo: date, hi: date) -> list[StreakRun]:
+    result = await db.execute(
+        select(StreakRun).where(
+            StreakRun.non_negotiable_id == nn_id, StreakRun.start_date <= hi, StreakRun.end_date >= lo
+        )
+    )
+    return list(result.scalars())
+
+
+async def _replace(db: AsyncSession, nn_id: int, old: list[StreakRun], new: list[Run]) -> None:
+    if old:
+        await db.execute(delete(StreakRun).where(StreakRun.id.in_([r.id for r in old])))
+    for run in new:
+        db.add(StreakRun(non_negotiable_id=nn_id, start_date=run.start, end_date=run.end, length=run.length))
+    await db.flush()
+
+
+async def refresh_summary(db: AsyncSession, streak: Streak) -> None:
+    nn_id = streak.non_negotiable_id
+    latest = (
+        await db.execute(
+            select(StreakRun.end_date, StreakRun.length)
+            .where(StreakRun.non_negotiable_id == nn_id)
+            .order_by(StreakRun.start_date.desc())
+            .limit(1)
+        )
+    ).one_or_none()
+    longest = (await db.execute(select(func.max(StreakRun.length)).where(StreakRun.non_negotiable_id == nn_id))).scalar()
+    streak.current_streak = latest.length if latest else 0
+    streak.last_check_date = latest.end_date if latest else None
+    streak.longest_streak = longest or 0
+
+
+async def record_check(db: AsyncSession, streak: Streak, day: date) -> None:
+    nn_id = streak.non_negotiable_id
+    neighbors = await _runs_touching(db, nn_id, *_window(day, streak.grace_days))
+    merged = plan_insert(day, [Run(r.start_date, r.end_date) for r in neighbors])
+    if merged is None:
+        return
+    await _replace(db, nn_id, neighbors, [merged])
+    await refresh_summary(db, streak)
+
+
+async def record_uncheck(db: AsyncSession, streak: Streak, day: date) -> None:
+    nn_id = streak.non_negotiable_id
+    result = await db.execute(
+        select(StreakRun).where(
+            StreakRun.non_negotiable_id == nn_id, StreakRun.start_date <= day, StreakRun.end_date >= day
+        )
+    )
+    run = result.scalar_one_or_none()
+    if run is None:
+        return
+    if check_months.reads_enabled():
+        days = await check_months.checked_days(db, nn_id, run.start_date, run.end_date)
+        prev = max((d for d in days if d < day), default=None)
+        nxt = min((d for d in days if d > day), default=None)
+    else:
+        prev = (
+            await db.execute(
+                select(func.max(DailyCheck.check_date)).where(
+                    DailyCheck.non_negotiable_id == nn_id,
+                    DailyCheck.check_date >= run.start_date,
+                    DailyCheck.check_date < day,
+                )
+            )
+        ).scalar()
+        nxt = (
+            await db.execute(
+                select(func.min(DailyCheck.check_date)).where(
+                    DailyCheck.non_negotiable_id == nn_id,
+                    DailyCheck.check_date > day,
+                    DailyCheck.check_date <= run.end_date,
+                )
+            )
+        ).scalar()
+    current = Run(run.start_date, run.end_date)
+    replacement = plan_delete(day, current, prev, nxt, streak.grace_days)
+    if replacement == [current]:
+        return
+    await _replace(db, nn_id, [run], replacement)
+    await refresh_summary(db, streak)
+
+
+async def rebuild(db: AsyncSession, streak: Streak, lo: date | None = None, hi: date | None = None) -> None:
+    """Recompute the run index from the checks, for all history or around ``[lo, hi]``.
+
+    Used after bulk writes and grace changes, where replaying single-day
+    updates would cost more than recomputing the affected window once.
+    """
+    nn_id = streak.non_negotiable_id
+    checks = select(DailyCheck.check_date).where(DailyCheck.non_negotiable_id == nn_id)
+    if lo is None or hi is None:
+        lo = hi = None
+        old = list((await db.execute(select(StreakRun).where(StreakRun.non_negotiable_id == nn_id))).scalars())
+    else:
+        old = await _runs_touching(db, nn_id, _window(lo, streak.grace_days)[0], _window(hi, streak.grace_days)[1])
+        lo = min([lo] + [r.start_date for r in old])
+        hi = max([hi] + [r.end_date for r in old])
+        checks = checks.where(DailyCheck.check_date.between(lo, hi))
+    if check_months.reads_enabled():
+        days = await check_months.checked_days(db, nn_id, lo, hi)
+    else:
+        days = (await db.execute(checks)).scalars().all()
+    await _replace(db, nn_id, old, build_runs(days, streak.grace_days))
+    await refresh_summary(db, streak)
+
+
+async def apply_grace(db: AsyncSession, user_id: int, grace: int) -> None:
+    """Switch every habit of ``user_id`` to ``grace`` grace days, rebuilding changed indexes."""
+    result = await db.execute(
+        select(Streak).join(NonNegotiable).where(NonNegotiable.user_id == user_id, Streak.grace_days != grace)
+    )
+    for streak in result.scalars():
+        streak.grace_days = grace
+        await rebuild(db, streak)
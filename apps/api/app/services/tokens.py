@@ -0,0 +1,146 @@
+"""Refresh token storage.
+
+Only the SHA-256 of a refresh token is stored, mapped to its user id. The
+default store keeps them in Redis as ``refresh:<hash>`` keys with a native
+TTL, so expired tokens disappear on their own, and rotation (consume the
+presented token, issue its replacement) is a single atomic script call.
+``REFRESH_TOKEN_STORE=database`` keeps them in the ``refresh_tokens`` table
+instead.
+
+While moving from the table to Redis, ``REFRESH_TOKEN_LEGACY_FALLBACK``
+lets tokens issued before the switch still be rotated or revoked from the
+table; ``python -m app.scripts.reap_refresh_tokens --migrate`` copies them
+into Redis and empties the table, after which the fallback can be turned off.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import MemoryRedis, get_redis
+from app.models.user import RefreshToken
+
+# KEYS[1] = presented token, KEYS[2] = replacement; ARGV[1] = ttl in seconds.
+ROTATE_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return false
+end
+redis.call('DEL', KEYS[1])
+redis.call('SET', KEYS[2], user_id, 'EX', ARGV[1])
+return user_id
+"""
+
+
+def refresh_key(token_hash: str) -> str:
+    return f"refresh:{token_hash}"
+
+
+def refresh_ttl() -> int:
+    return int(timedelta(days=settings.refresh_token_expire_days).total_seconds())
+
+
+class TokenStore(Protocol):
+    async def issue(self, user_id: int, token_hash: str) -> None:
+        """Store a new refresh token for ``user_id``."""
+
+    async def rotate(self, token_hash: str, new_hash: str) -> int | None:
+        """Consume ``token_hash`` and store ``new_hash`` for the same user.
+
+        Returns the user id, or ``None`` (storing nothing) if the token is
+        unknown or expired.
+        """
+
+    async def revoke(self, token_hash: str) -> None:
+        """Forget ``token_hash`` if it is stored."""
+
+
+class DatabaseTokenStore:
+    """Refresh tokens as rows in ``refresh_tokens``; expired rows stay until reaped."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def issue(self, user_id: int, token_hash: str) -> None:
+        expires = datetime.now(timezone.utc) + timedelta(seconds=refresh_ttl())
+        self.db.add(RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires))
+        await self.db.commit()
+
+    async def consume(self, token_hash: str) -> int | None:
+        user_id = await self.db.scalar(
+            delete(RefreshToken)
+            .where(RefreshToken.token_hash == token_hash, RefreshToken.expires_at > datetime.now(timezone.utc))
+            .returning(RefreshToken.user_id)
+        )
+        await self.db.commit()
+        return user_id
+
+    async def rotate(self, token_hash: str, new_hash: str) -> int | None:
+        user_id = await self.consume(token_hash)
+        if user_id is not None:
+            await self.issue(user_id, new_hash)
+        return user_id
+
+    async def revoke(self, token_hash: str) -> None:
+        await self.db.execute(delete(RefreshToken).where(RefreshToken.token_hash == token_hash))
+        await self.db.commit()
+
+
+class RedisTokenStore:
+    """Refresh tokens as Redis keys that expire with the token."""
+
+    def __init__(self, redis, legacy: DatabaseTokenStore | None = None):
+        self.redis = redis
+        self.legacy = legacy
+        self._rotate = redis.register_script(ROTATE_SCRIPT)
+
+    async def issue(self, user_id: int, token_hash: str) -> None:
+        await self.redis.set(refresh_key(token_hash), user_id, ex=refresh_ttl())
+
+    async def rotate(self, token_hash: str, new_hash: str) -> int | None:
+        user_id = await self._rotate(keys=[refresh_key(token_hash), refresh_key(new_hash)], args=[refresh_ttl()])
+        if user_id is not None:
+            return int(user_id)
+        if self.legacy is None:
+            return None
+        user_id = await self.legacy.consume(token_hash)
+        if user_id is not None:
+            await self.issue(user_id, new_hash)
+        return user_id
+
+    async def revoke(self, token_hash: str) -> None:
+        if not await self.redis.delete(refresh_key(token_hash)) and self.legacy is not None:
+            await self.legacy.revoke(token_hash)
+
+
+class MemoryTokenStore(RedisTokenStore):
+    """``RedisTokenStore`` over ``MemoryRedis``, which cannot run scripts.
+
+    ``MemoryRedis`` never yields to the event loop, so the get/delete/set
+    sequence below is as atomic as the Lua script it replaces.
+    """
+
+    def __init__(self, redis: MemoryRedis, legacy: DatabaseTokenStore | None = None):
+        self.redis = redis
+        self.legacy = legacy
+        self._rotate = self._rotate_in_memory
+
+    async def _rotate_in_memory(self, keys: list[str], args: list) -> bytes | None:
+        user_id = await self.redis.get(keys[0])
+        if user_id is None:
+            return None
+        await self.redis.delete(keys[0])
+        await self.redis.set(keys[1], user_id, ex=int(args[0]))
+        return user_id
+
+
+def get_token_store(db: AsyncSession) -> TokenStore:
+    if settings.refresh_token_store == "database":
+        return DatabaseTokenStore(db)
+    legacy = DatabaseTokenStore(db) if settings.refresh_token_legacy_fallback else None
+    redis = get_redis()
+    if isinstance(redis, MemoryRedis):
+        return MemoryTokenStore(redis, legacy)
+    return RedisTokenStore(redis, legacy)
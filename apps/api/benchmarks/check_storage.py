@@ -0,0 +1,124 @@
+"""Daily check storage benchmark: ``daily_checks`` rows vs monthly bitmaps.
+
+Seeds ``--habits`` habits with ``--days`` of history each, checked on a
+``--density`` fraction of days, into both ``daily_checks`` and
+``daily_check_months``, then reports each table's heap and index size and the
+latency of a one-year range read per habit from either storage. Uses a
+throwaway SQLite file (sizes from ``dbstat``) unless ``--database-url`` points
+at Postgres (``pg_relation_size`` / ``pg_indexes_size``). Run from ``apps/api``::
+
+    python -m benchmarks.check_storage --habits 1000 --days 730
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select, text
+
+from benchmarks.common import create_engine, percentiles, run_metadata
+from app.core.database import Base
+from app.models.tracker import DailyCheck, DailyCheckMonth, NonNegotiable
+from app.models.user import User
+from app.services import check_months
+from app.services.ordering import spread_keys
+
+INSERT_BATCH = 10_000
+TABLES = ("daily_checks", "daily_check_months")
+
+
+async def seed(conn, habits: int, days: int, density: float) -> list[int]:
+    user_id = (await conn.execute(insert(User).values(email="storage@niyyah.app", password_hash="-").returning(User.id))).scalar_one()
+    habit_ids = list((await conn.execute(
+        insert(NonNegotiable).returning(NonNegotiable.id, sort_by_parameter_order=True),
+        [{"user_id": user_id, "title": f"Habit {i}", "rank": rank} for i, rank in enumerate(spread_keys(habits))],
+    )).scalars())
+    rng = random.Random(0)
+    end = date.today()
+    keys = [(nn_id, end - timedelta(days=i)) for nn_id in habit_ids for i in range(days) if rng.random() < density]
+    rows = [{"non_negotiable_id": nn_id, "check_date": day, "is_completed": True} for nn_id, day in keys]
+    months = [{"non_negotiable_id": nn_id, "month": month, "mask": mask} for (nn_id, month), mask in check_months.masks(keys).items()]
+    for table, batch in ((DailyCheck, rows), (DailyCheckMonth, months)):
+        for start in range(0, len(batch), INSERT_BATCH):
+            await conn.execute(table.__table__.insert(), batch[start:start + INSERT_BATCH])
+    return habit_ids
+
+
+async def sizes(conn) -> dict:
+    out = {}
+    if conn.dialect.name == "postgresql":
+        await conn.execution_options(isolation_level="AUTOCOMMIT")  # VACUUM refuses to run in a transaction
+        await conn.execute(text(f"VACUUM ANALYZE {', '.join(TABLES)}"))
+        for table in TABLES:
+            row = (await conn.execute(text(
+                "SELECT (SELECT count(*) FROM {t}), pg_relation_size('{t}'), pg_indexes_size('{t}')".format(t=table)
+            ))).one()
+            out[table] = {"rows": row[0], "table_bytes": row[1], "index_bytes": row[2]}
+        return out
+    for table in TABLES:
+        rows = await conn.scalar(text(f"SELECT count(*) FROM {table}"))
+        pages = dict((await conn.execute(text(
+            "SELECT m.type, sum(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+            "WHERE m.tbl_name = :t GROUP BY m.type"
+        ), {"t": table})).all())
+        out[table] = {"rows": rows, "table_bytes": pages.get("table", 0), "index_bytes": pages.get("index", 0)}
+    return out
+
+
+async def range_reads(conn, habit_ids: list[int], samples: int) -> dict:
+    end = date.today()
+    start = end - timedelta(days=365)
+    rows_q = select(DailyCheck.check_date).where(DailyCheck.check_date.between(start, end))
+    bitmap_q = select(DailyCheckMonth.month, DailyCheckMonth.mask).where(
+        DailyCheckMonth.month.between(check_months.month_of(start), end)
+    )
+    rng = random.Random(1)
+    timings: dict[str, list[float]] = {"rows": [], "bitmap": []}
+    for _ in range(samples):
+        nn_id = rng.choice(habit_ids)
+        started = time.perf_counter()
+        (await conn.execute(rows_q.where(DailyCheck.non_negotiable_id == nn_id))).all()
+        timings["rows"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        months = (await conn.execute(bitmap_q.where(DailyCheckMonth.non_negotiable_id == nn_id))).all()
+        [check_months.days_in(month, mask, start, end) for month, mask in months]
+        timings["bitmap"].append(time.perf_counter() - started)
+    return {storage: percentiles(taken) for storage, taken in timings.items()}
+
+
+async def run(args, database_url: str) -> dict:
+    engine = create_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            habit_ids = await seed(conn, args.habits, args.days, args.density)
+        async with engine.connect() as conn:
+            measured = await sizes(conn)
+            reads = await range_reads(conn, habit_ids, args.samples)
+    finally:
+        await engine.dispose()
+    rows, bitmaps = (measured[t]["table_bytes"] + measured[t]["index_bytes"] for t in TABLES)
+    return {"sizes": measured, "bitmap_to_rows_ratio": round(bitmaps / rows, 4) if rows else None, "range_read_1y": reads}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--habits", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--density", type=float, default=0.7)
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/storage.db"
+        results = asyncio.run(run(args, database_url))
+    meta = run_metadata(habits=args.habits, days=args.days, density=args.density, database=database_url.split(":")[0])
+    print(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Shared helpers for the benchmarks: percentiles, result files, in-process app wiring."""
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+os.environ.setdefault("REDIS_URL", "memory://")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app.core.database import Base, engine_options, get_db  # noqa: E402
+from app.core.config import Settings  # noqa: E402
+from app.main import app  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples: list[float]) -> dict:
+    if len(samples) < 2:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata(**config) -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+    }
+
+
+def default_output(name: str) -> Path:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return RESULTS_DIR / f"{name}-{git_commit()}-{stamp}.json"
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    return create_async_engine(database_url, **engine_options(Settings(database_url=database_url)))
+
+
+@asynccontextmanager
+async def in_process_app(database_url: str | None = None, create_schema: bool = True) -> AsyncIterator[AsyncEngine]:
+    """Point ``app`` at ``database_url`` (a throwaway SQLite file by default) for the duration."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(database_url or f"sqlite+aiosqlite:///{tmp}/bench.db")
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def bench_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = bench_db
+        if create_schema:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield engine
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await engine.dispose()
@@ -0,0 +1,65 @@
+"""Compare two ``benchmarks.run`` result files endpoint by endpoint.
+
+Run from ``apps/api``::
+
+    python -m benchmarks.compare benchmarks/results/run-abc1234-....json benchmarks/results/run-def5678-....json
+
+Exits non-zero when ``--fail-over`` is given and any endpoint's p95 got
+slower by more than that many percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def _change(before: float | None, after: float | None) -> float | None:
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    rows = []
+    for name in list(base["endpoints"]) + [n for n in head["endpoints"] if n not in base["endpoints"]]:
+        old, new = base["endpoints"].get(name, {}), head["endpoints"].get(name, {})
+        row = {"endpoint": name}
+        for metric in METRICS:
+            row[metric] = (old.get(metric), new.get(metric), _change(old.get(metric), new.get(metric)))
+        rows.append(row)
+    return rows
+
+
+def _cell(before, after, change) -> str:
+    if before is None or after is None:
+        return f"{before if before is not None else '-'} -> {after if after is not None else '-'}"
+    return f"{before} -> {after} ({change:+.1f}%)" if change is not None else f"{before} -> {after}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--fail-over", type=float, help="fail if any p95 regresses by more than this percent")
+    args = parser.parse_args()
+    base, head = json.loads(args.base.read_text()), json.loads(args.head.read_text())
+
+    print(f"base {base['meta']['commit']} ({base['meta']['timestamp']})  ->  head {head['meta']['commit']} ({head['meta']['timestamp']})")
+    rows = compare(base, head)
+    width = max(len(r["endpoint"]) for r in rows)
+    print(f"{'endpoint':<{width}}  " + "  ".join(f"{m:<28}" for m in METRICS))
+    regressions = []
+    for row in rows:
+        print(f"{row['endpoint']:<{width}}  " + "  ".join(f"{_cell(*row[m]):<28}" for m in METRICS))
+        change = row["p95_ms"][2]
+        if args.fail_over is not None and change is not None and change > args.fail_over:
+            regressions.append(row["endpoint"])
+    if regressions:
+        print(f"p95 regressed by more than {args.fail_over}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Account export memory benchmark.
+
+Seeds one user per history size, then streams each user's export in a fresh
+subprocess and records that process's peak RSS growth and peak Python
+allocations while exporting. Flat numbers across sizes mean memory is bounded
+by ``--chunk-size``, not by history. Uses a throwaway SQLite file unless
+``--database-url`` is given. Run from ``apps/api``::
+
+    python -m benchmarks.export_memory --checks 1000 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from benchmarks.common import create_engine, run_metadata
+from app.core.database import Base
+from app.models.tracker import DailyCheck, NonNegotiable
+from app.models.user import User
+from app.services import export
+from app.services.ordering import spread_keys
+
+HABITS = 10
+INSERT_BATCH = 10_000
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed_user(database_url: str, n: int, checks: int) -> int:
+    engine = create_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            user_id = (await conn.execute(
+                insert(User).values(email=f"export{n}@niyyah.app", password_hash="-").returning(User.id)
+            )).scalar_one()
+            habit_ids = list((await conn.execute(
+                insert(NonNegotiable).returning(NonNegotiable.id, sort_by_parameter_order=True),
+                [{"user_id": user_id, "title": f"Habit {i}", "rank": rank} for i, rank in enumerate(spread_keys(HABITS))],
+            )).scalars())
+            start = date.today()
+            rows = ({"non_negotiable_id": habit_ids[i % HABITS], "check_date": start - timedelta(days=i // HABITS)}
+                    for i in range(checks))
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == INSERT_BATCH:
+                    await conn.execute(insert(DailyCheck), batch)
+                    batch = []
+            if batch:
+                await conn.execute(insert(DailyCheck), batch)
+        return user_id
+    finally:
+        await engine.dispose()
+
+
+async def measure(database_url: str, user_id: int, fmt: str, chunk_size: int) -> dict:
+    engine = create_engine(database_url)
+    encode = export.csv_zip if fmt == "csv" else export.ndjson
+    baseline = _rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    async for part in encode(export.stream_rows(engine, user_id, chunk_size)):
+        size += len(part)
+    elapsed = time.perf_counter() - started
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await engine.dispose()
+    return {
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        "rss_growth_mb": round(_rss_mb() - baseline, 1),
+        "python_peak_mb": round(py_peak / 2**20, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--checks", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], action="append", dest="formats")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--measure", type=int, metavar="USER_ID", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    formats = args.formats or ["ndjson", "csv"]
+
+    if args.measure is not None:
+        print(json.dumps(asyncio.run(measure(args.database_url, args.measure, formats[0], args.chunk_size))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/export.db"
+        results = []
+        for n, checks in enumerate(args.checks):
+            user_id = asyncio.run(seed_user(database_url, n, checks))
+            for fmt in formats:
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.export_memory", "--database-url", database_url,
+                     "--measure", str(user_id), "--format", fmt, "--chunk-size", str(args.chunk_size)],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                results.append({"checks": checks, "format": fmt, **json.loads(out)})
+    meta = run_metadata(chunk_size=args.chunk_size, database=database_url.split(":")[0])
+    print(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Bulk import benchmark.
+
+Builds an NDJSON import with a few personas and habits and ``--checks``
+historical check rows, posts it to ``/import`` in-process and reports how
+long the request took, split into validation and the database writes.
+Run from ``apps/api``::
+
+    python -m benchmarks.import_checks --checks 100000 --habits 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import app, in_process_app, run_metadata
+from app.services import imports
+
+
+def document(checks: int, habits: int) -> bytes:
+    records = [{"table": "personas", "row": {"id": 1, "name": "Hafiz", "domain": "Quran"}}]
+    records += [{"table": "milestones", "row": {"persona_id": 1, "goal": f"Juz {n}"}} for n in range(1, 31)]
+    records += [{"table": "non_negotiables", "row": {"id": n, "title": f"Habit {n}"}} for n in range(habits)]
+    start = date.today()
+    records += [
+        {"table": "daily_checks", "row": {"non_negotiable_id": i % habits, "check_date": (start - timedelta(days=i // habits)).isoformat()}}
+        for i in range(checks)
+    ]
+    return "\n".join(json.dumps(r) for r in records).encode()
+
+
+async def run(checks: int, habits: int) -> dict:
+    body = document(checks, habits)
+    started = time.perf_counter()
+    reader = imports.ImportReader(checks + 1000)
+
+    async def chunks():
+        for i in range(0, len(body), 65536):
+            yield body[i:i + 65536]
+
+    await reader.read_ndjson(chunks())
+    validate = time.perf_counter() - started
+
+    async with in_process_app():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            reg = await client.post("/api/v1/auth/register", json={"email": "import@niyyah.app", "password": "import-pass"})
+            headers = {"Authorization": f"Bearer {reg.json()['access_token']}", "Content-Type": "application/x-ndjson"}
+            started = time.perf_counter()
+            resp = await client.post("/api/v1/import", content=body, headers=headers)
+            total = time.perf_counter() - started
+            resp.raise_for_status()
+    return {
+        "meta": run_metadata(checks=checks, habits=habits),
+        "body_mb": round(len(body) / 2**20, 2),
+        "imported": resp.json(),
+        "validate_seconds": round(validate, 3),
+        "request_seconds": round(total, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--habits", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.checks, args.habits)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
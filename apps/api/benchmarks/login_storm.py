@@ -0,0 +1,85 @@
+"""Login-storm benchmark.
+
+Fires concurrent logins at the app in-process while a reader polls
+``/tracker/today`` and reports the reader's latency percentiles with and
+without the storm. Run from ``apps/api``::
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import app, in_process_app, percentiles
+
+
+async def poll(client: AsyncClient, stop: asyncio.Event) -> list[float]:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        resp = await client.get("/api/v1/tracker/today")
+        samples.append(time.perf_counter() - start)
+        resp.raise_for_status()
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def storm(client: AsyncClient, logins: int, concurrency: int) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    statuses: dict[int, int] = {}
+
+    async def one():
+        async with gate:
+            resp = await client.post("/api/v1/auth/login", json={"email": "storm@niyyah.app", "password": "storm-pass"})
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return statuses
+
+
+async def run(logins: int, concurrency: int, baseline_seconds: float) -> dict:
+    async with in_process_app():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            reg = await client.post("/api/v1/auth/register", json={"email": "storm@niyyah.app", "password": "storm-pass"})
+            reader = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+            reader.headers["Authorization"] = f"Bearer {reg.json()['access_token']}"
+
+            stop = asyncio.Event()
+            task = asyncio.create_task(poll(reader, stop))
+            await asyncio.sleep(baseline_seconds)
+            stop.set()
+            baseline = await task
+
+            stop = asyncio.Event()
+            task = asyncio.create_task(poll(reader, stop))
+            start = time.perf_counter()
+            statuses = await storm(client, logins, concurrency)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            during = await task
+            await reader.aclose()
+
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "login_statuses": statuses,
+        "storm_seconds": round(elapsed, 3),
+        "tracker_today_idle": percentiles(baseline),
+        "tracker_today_during_storm": percentiles(during),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.logins, args.concurrency, args.baseline_seconds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
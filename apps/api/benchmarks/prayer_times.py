@@ -0,0 +1,63 @@
+"""Prayer-time engine benchmark.
+
+Times computing a whole year of prayer times for a spread of cities and
+every calculation method, uncached, then the cached per-day lookup the
+endpoints use. Run from ``apps/api``::
+
+    python -m benchmarks.prayer_times --rounds 5
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+from benchmarks.common import percentiles
+from app.services import prayer_times
+from app.services.prayer_times import METHODS, compute_year, local_times, zone
+
+CITIES = {
+    "Makkah": (21.4225, 39.8262, "Asia/Riyadh"),
+    "Jakarta": (-6.2088, 106.8456, "Asia/Jakarta"),
+    "Istanbul": (41.0082, 28.9784, "Europe/Istanbul"),
+    "London": (51.5074, -0.1278, "Europe/London"),
+    "New York": (40.7128, -74.0060, "America/New_York"),
+    "Oslo": (59.9139, 10.7522, "Europe/Oslo"),
+}
+
+
+def run(rounds: int, year: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        for lat, lng, _ in CITIES.values():
+            for method in METHODS.values():
+                started = time.perf_counter()
+                compute_year(lat, lng, method, year)
+                samples.append(time.perf_counter() - started)
+
+    prayer_times._cached_year.cache_clear()
+    lookups = []
+    for day in (date(year, month, 15) for month in range(1, 13)):
+        for lat, lng, tz in CITIES.values():
+            started = time.perf_counter()
+            local_times(lat, lng, "MWL", day, zone(tz))
+            lookups.append(time.perf_counter() - started)
+
+    return {
+        "year": year,
+        "days": len(compute_year(0, 0, METHODS["MWL"], year).columns["fajr"]),
+        "compute_year": percentiles(samples),
+        "cached_day_lookup": percentiles(lookups),
+        "cache": prayer_times._cached_year.cache_info()._asdict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--year", type=int, default=date.today().year)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rounds, args.year), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Per-endpoint latency and throughput benchmark.
+
+Logs in a sample of seeded users, then drives each endpoint with a fixed
+number of requests at a fixed concurrency and records p50/p95/p99 latency
+and requests per second. Results are written as JSON for
+``benchmarks.compare``. Run from ``apps/api``, either in-process against a
+throwaway SQLite database seeded on the fly::
+
+    python -m benchmarks.run --seed-users 200
+
+or against a running server and a database seeded with ``benchmarks.seed``::
+
+    RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 2 &
+    python -m benchmarks.run --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import app, default_output, in_process_app, percentiles, run_metadata
+from benchmarks.seed import PASSWORD, email, seed
+
+
+@dataclass
+class Session:
+    client: AsyncClient
+    habit_ids: list[int]
+
+
+@dataclass
+class Endpoint:
+    name: str
+    request: Callable[[Session, random.Random], tuple[str, str, dict | None]]
+
+
+def _get(url: str) -> Callable:
+    return lambda session, rng: ("GET", url, None)
+
+
+def _toggle_check(session: Session, rng: random.Random) -> tuple[str, str, dict]:
+    day = date.today() - timedelta(days=rng.randrange(365))
+    op = rng.choice(("check", "uncheck"))
+    item = {"non_negotiable_id": rng.choice(session.habit_ids), "check_date": day.isoformat(), "op": op}
+    return "POST", "/api/v1/tracker/checks:batch", {"items": [item]}
+
+
+def endpoints() -> list[Endpoint]:
+    today = date.today()
+    year_ago = today - timedelta(days=364)
+    return [
+        Endpoint("GET /dashboard", _get("/api/v1/dashboard")),
+        Endpoint("GET /personas", _get("/api/v1/personas")),
+        Endpoint("GET /schedule", _get("/api/v1/schedule")),
+        Endpoint("GET /principles", _get("/api/v1/principles")),
+        Endpoint("GET /tracker/non-negotiables", _get("/api/v1/tracker/non-negotiables")),
+        Endpoint("GET /tracker/today", _get("/api/v1/tracker/today")),
+        Endpoint("GET /tracker/range (1 year)", _get(f"/api/v1/tracker/range?from={year_ago}&to={today}")),
+        Endpoint("GET /calendar/{year}/{month}", _get(f"/api/v1/calendar/{today.year}/{today.month}")),
+        Endpoint("GET /settings", _get("/api/v1/settings")),
+        Endpoint("GET /sync", _get("/api/v1/sync")),
+        Endpoint("POST /tracker/checks:batch", _toggle_check),
+    ]
+
+
+async def login(make_client: Callable[[], AsyncClient], n: int) -> Session:
+    client = make_client()
+    resp = await client.post("/api/v1/auth/login", json={"email": email(n), "password": PASSWORD})
+    resp.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {resp.json()['access_token']}"
+    habits = (await client.get("/api/v1/tracker/non-negotiables")).json()
+    return Session(client, [h["id"] for h in habits])
+
+
+async def drive(endpoint: Endpoint, sessions: list[Session], requests: int, concurrency: int, rng: random.Random) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+    statuses: dict[str, int] = {}
+
+    async def one(session: Session):
+        method, url, body = endpoint.request(session, rng)
+        async with gate:
+            started = time.perf_counter()
+            resp = await session.client.request(method, url, json=body)
+            samples.append(time.perf_counter() - started)
+        statuses[str(resp.status_code)] = statuses.get(str(resp.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(sessions[i % len(sessions)]) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        **percentiles(samples),
+        "rps": round(requests / elapsed, 1),
+        "errors": sum(count for status, count in statuses.items() if int(status) >= 400),
+        "statuses": statuses,
+    }
+
+
+async def benchmark(make_client: Callable[[], AsyncClient], users: int, available: int, requests: int, concurrency: int,
+                    warmup: int, only: list[str] | None, seed_value: int) -> dict:
+    rng = random.Random(seed_value)
+    numbers = rng.sample(range(available), min(users, available))
+    sessions = [await login(make_client, n) for n in numbers]
+    results = {}
+    try:
+        for endpoint in endpoints():
+            if only and not any(part in endpoint.name for part in only):
+                continue
+            if warmup:
+                await drive(endpoint, sessions, warmup, concurrency, rng)
+            results[endpoint.name] = await drive(endpoint, sessions, requests, concurrency, rng)
+            print(f"{endpoint.name:<34} p50 {results[endpoint.name].get('p50_ms')}ms  "
+                  f"p99 {results[endpoint.name].get('p99_ms')}ms  {results[endpoint.name]['rps']} req/s")
+    finally:
+        for session in sessions:
+            await session.client.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="benchmark a running server instead of the app in-process")
+    parser.add_argument("--database-url", help="in-process only: database to use (default: throwaway SQLite)")
+    parser.add_argument("--seed-users", type=int, default=200, help="in-process only: users to seed before running (0 to skip)")
+    parser.add_argument("--available-users", type=int, help="seeded users to sample from (default: --seed-users)")
+    parser.add_argument("--users", type=int, default=20, help="concurrent logged-in users to spread requests over")
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", action="append", help="run endpoints whose name contains this (repeatable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/run-<commit>-<time>.json)")
+    args = parser.parse_args()
+    available = args.available_users or args.seed_users
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+
+    async def run() -> dict:
+        if args.base_url:
+            make_client = lambda: AsyncClient(base_url=args.base_url, timeout=30)  # noqa: E731
+            return await benchmark(make_client, args.users, available, args.requests, args.concurrency, args.warmup, args.only, args.seed)
+        async with in_process_app(args.database_url) as engine:
+            if args.seed_users:
+                print(await seed(engine, args.seed_users, seed=args.seed))
+            make_client = lambda: AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")  # noqa: E731
+            return await benchmark(make_client, args.users, available, args.requests, args.concurrency, args.warmup, args.only, args.seed)
+
+    result = {"meta": run_metadata(target=args.base_url or "in-process", **config), "endpoints": asyncio.run(run())}
+    output = args.output or default_output("run")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Response serialization benchmark for the hot read routes.
+
+Seeds one user with ``--personas`` personas of ``--milestones`` milestones
+each and ``--habits`` habits, all checked today, then times each route's
+handler (query plus encoding, no HTTP) on the previous path and on the
+fast path, after checking both produce the same bytes:
+
+* ``personas``: ORM instances validated ``from_attributes`` and dumped, as
+  FastAPI does for ``response_model``, vs plain rows through ``Serializer``.
+* ``today``: the same for ``/tracker/today``.
+* ``dashboard_miss`` / ``dashboard_hit``: ``jsonable_encoder`` plus
+  ``JSONResponse`` (after a parse of the cached snapshot on a hit) vs the
+  encoded body built once and sliced out of the cache.
+
+Uses a throwaway SQLite file unless ``--database-url`` is given. Run from
+``apps/api``::
+
+    python -m benchmarks.serialization --personas 500 --milestones 10 --habits 500
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import create_engine, percentiles, run_metadata
+from app.api.v1 import personas as personas_api, tracker as tracker_api
+from app.core.database import Base
+from app.core.security import Principal
+from app.models.persona import Milestone, Persona, ScheduleBlock
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.models.user import User
+from app.schemas.persona import PersonaResponse
+from app.schemas.tracker import TrackerDayResponse
+from app.services import dashboard
+from app.services.changes import DASHBOARD_RESOURCES, current_versions
+from app.services.ordering import spread_keys
+
+INSERT_BATCH = 10_000
+PERSONA_LIST = TypeAdapter(list[PersonaResponse])
+TRACKER_DAY = TypeAdapter(TrackerDayResponse)
+
+
+async def seed(conn, personas: int, milestones: int, habits: int, today: date) -> int:
+    user_id = (await conn.execute(insert(User).values(email="serialize@niyyah.app", password_hash="-").returning(User.id))).scalar_one()
+    now = datetime.now(timezone.utc)
+    persona_ids = list((await conn.execute(
+        insert(Persona).returning(Persona.id, sort_by_parameter_order=True),
+        [
+            {"user_id": user_id, "name": f"Persona {i}", "arabic_name": "الصِّدِّيق", "domain": "Practice + Dawah",
+             "eventually": "Muslim Scholar " * 4, "points": ["Dhikr", "Sabr"], "rank": rank, "created_at": now, "updated_at": now}
+            for i, rank in enumerate(spread_keys(personas))
+        ],
+    )).scalars())
+    habit_ids = list((await conn.execute(
+        insert(NonNegotiable).returning(NonNegotiable.id, sort_by_parameter_order=True),
+        [{"user_id": user_id, "title": f"Habit {i}", "rank": rank} for i, rank in enumerate(spread_keys(habits))],
+    )).scalars())
+    tables = (
+        (Milestone, [{"persona_id": p, "goal": f"Goal {j}", "target_date": today, "created_at": now, "updated_at": now}
+                     for p in persona_ids for j in range(milestones)]),
+        (ScheduleBlock, [{"user_id": user_id, "persona_id": p, "start_time": "05:00", "end_time": "06:00", "activity": "Fajr", "rank": rank}
+                         for p, rank in zip(persona_ids, spread_keys(personas))]),
+        (Streak, [{"non_negotiable_id": nn, "current_streak": 3, "longest_streak": 9, "last_check_date": today} for nn in habit_ids]),
+        (DailyCheck, [{"non_negotiable_id": nn, "check_date": today, "is_completed": True} for nn in habit_ids]),
+    )
+    for table, rows in tables:
+        for start in range(0, len(rows), INSERT_BATCH):
+            await conn.execute(table.__table__.insert(), rows[start:start + INSERT_BATCH])
+    return user_id
+
+
+async def personas_before(db: AsyncSession, user_id: int) -> bytes:
+    result = await db.execute(
+        select(Persona).where(Persona.user_id == user_id).options(selectinload(Persona.milestones)).order_by(Persona.rank, Persona.id)
+    )
+    return PERSONA_LIST.dump_json(PERSONA_LIST.validate_python(result.scalars().all(), from_attributes=True))
+
+
+async def today_before(db: AsyncSession, user_id: int, today: date) -> bytes:
+    nns = (await db.execute(
+        select(NonNegotiable).where(NonNegotiable.user_id == user_id).options(selectinload(NonNegotiable.streak)).order_by(NonNegotiable.rank, NonNegotiable.id)
+    )).scalars().all()
+    checks = (await db.execute(
+        select(DailyCheck).join(NonNegotiable).where(NonNegotiable.user_id == user_id, DailyCheck.check_date == today)
+    )).scalars().all()
+    return TRACKER_DAY.dump_json(TRACKER_DAY.validate_python(TrackerDayResponse(date=today, checks=checks, non_negotiables=nns)))
+
+
+async def run(args, database_url: str) -> dict:
+    engine = create_engine(database_url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    today = date.today()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            user_id = await seed(conn, args.personas, args.milestones, args.habits, today)
+        user = Principal(id=user_id, subscription_tier="premium", timezone="UTC", is_active=True, token_version=0)
+        versions = await current_versions(user_id, DASHBOARD_RESOURCES)
+        cached = json.dumps({"date": today.isoformat(), "data": await dashboard.build_dashboard(engine, user_id, today)}).encode()
+
+        async def dashboard_hit_before(_db) -> bytes:
+            snapshot = json.loads(cached)
+            return JSONResponse(jsonable_encoder(snapshot["data"])).body
+
+        async def dashboard_miss_before(_db) -> bytes:
+            return JSONResponse(jsonable_encoder(await dashboard.build_dashboard(engine, user_id, today))).body
+
+        async def dashboard_miss_after(_db) -> bytes:
+            await dashboard.invalidate_dashboard(user_id)
+            return await dashboard.get_dashboard_snapshot(engine, user_id, today, versions)
+
+        async def dashboard_hit_after(_db) -> bytes:
+            return await dashboard.get_dashboard_snapshot(engine, user_id, today, versions)
+
+        cases = {
+            "personas": (
+                lambda db: personas_before(db, user_id),
+                lambda db: personas_api.list_personas(Response(), user=user, db=db),
+            ),
+            "today": (
+                lambda db: today_before(db, user_id, today),
+                lambda db: tracker_api.get_today(Response(), user=user, db=db),
+            ),
+            "dashboard_miss": (dashboard_miss_before, dashboard_miss_after),
+            "dashboard_hit": (dashboard_hit_before, dashboard_hit_after),
+        }
+        results = {}
+        for name, paths in cases.items():
+            timings: dict[str, list[float]] = {"before": [], "after": []}
+            bodies = {}
+            for _ in range(args.samples):
+                for label, handler in zip(timings, paths):
+                    async with sessions() as db:
+                        started = time.perf_counter()
+                        body = await handler(db)
+                        timings[label].append(time.perf_counter() - started)
+                    bodies[label] = body.body if isinstance(body, Response) else body
+            if bodies["before"] != bodies["after"]:
+                raise SystemExit(f"{name}: response bodies differ")
+            before, after = percentiles(timings["before"]), percentiles(timings["after"])
+            results[name] = {
+                "bytes": len(bodies["after"]),
+                "before": before,
+                "after": after,
+                "p50_speedup": round(before["p50_ms"] / after["p50_ms"], 2) if after.get("p50_ms") else None,
+            }
+        return results
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--personas", type=int, default=500)
+    parser.add_argument("--milestones", type=int, default=10)
+    parser.add_argument("--habits", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/serialization.db"
+        results = asyncio.run(run(args, database_url))
+    meta = run_metadata(
+        personas=args.personas, milestones=args.milestones, habits=args.habits, samples=args.samples, database=database_url.split(":")[0],
+    )
+    print(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 import asyncio
-from collections.abc import AsyncGenerator
+import os
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+
+os.environ.setdefault("REDIS_URL", "memory://")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("STRICT_LOADING", "true")
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.database import Base, get_db
+from app.core.redis import get_redis
 from app.main import app
 
 TEST_DB_URL = "sqlite+aiosqlite:///./test.db"
@@ -29,6 +37,47 @@ async def setup_db():
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    await get_redis().flushdb()
+
+
+@contextmanager
+def count_queries() -> Iterator[list[str]]:
+    """Collect the SQL statements run against the test database inside the block."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def within_query_budget(limit: int) -> Iterator[list[str]]:
+    with count_queries() as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join(f"  {s}" for s in statements)
+        pytest.fail(f"{len(statements)} SQL statements, budget is {limit}:\n{listing}", pytrace=False)
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget(n): ...`` fails the test if the block runs more than ``n`` statements."""
+    return within_query_budget
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # @pytest.mark.query_budget(n) applies the budget to the test body (fixtures excluded).
+    marker = pyfuncitem.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with within_query_budget(marker.args[0]):
+        return (yield)
 
 
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -0,0 +1,119 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from hypothesis import given, strategies as st
+from sqlalchemy import select, update
+
+from app.models.analytics import HabitRollup, UserRollup
+from app.models.tracker import NonNegotiable
+from app.services import analytics
+from tests.conftest import TestSession
+
+CREATED = date(2025, 11, 20)
+
+
+async def _rollups() -> tuple[set, set]:
+    async with TestSession() as db:
+        habit = {tuple(r) for r in await db.execute(select(*(c for c in HabitRollup.__table__.columns if c.name != "id")))}
+        user = {tuple(r) for r in await db.execute(select(*(c for c in UserRollup.__table__.columns if c.name != "id")))}
+    return {r for r in habit if any(r[3:])}, {r for r in user if any(r[3:])}
+
+
+@pytest_asyncio.fixture
+async def habits(auth_client: AsyncClient) -> dict:
+    ids = {}
+    for title, category in (("Fajr", "spiritual"), ("Run", "health"), ("Read", "growth")):
+        ids[title] = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": title, "category": category})).json()["id"]
+    async with TestSession() as db:
+        await db.execute(update(NonNegotiable).values(created_at=datetime.combine(CREATED, datetime.min.time(), tzinfo=timezone.utc)))
+        await db.commit()
+    # Fajr every day from 1 Dec to 14 Jan, Run on Mondays, Read once
+    items = [{"non_negotiable_id": ids["Fajr"], "check_date": (date(2025, 12, 1) + timedelta(days=i)).isoformat()} for i in range(45)]
+    items += [{"non_negotiable_id": ids["Run"], "check_date": (date(2025, 12, 1) + timedelta(weeks=i)).isoformat()} for i in range(7)]
+    await auth_client.post("/api/v1/tracker/checks:batch", json={"items": items})
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": ids["Read"], "check_date": "2025-12-25"})
+    return ids
+
+
+@given(st.dates(date(2020, 1, 1), date(2030, 12, 31)), st.integers(0, 1200))
+def test_cover_partitions_the_range(lo, length):
+    hi = lo + timedelta(days=length)
+    units, days = analytics.cover(lo, hi)
+    covered = list(days)
+    for period, start in units:
+        end = analytics.period_end(period, start)
+        assert analytics.period_start(period, start) == start and end <= hi
+        covered.extend(start + timedelta(days=i) for i in range((end - start).days + 1))
+    assert sorted(covered) == [lo + timedelta(days=i) for i in range(length + 1)]
+    assert len(units) + len(days) <= 2 * (4 + 12) + 11 + 11 + (length // 365 + 1)
+
+
+def test_weekday_counts_and_period_count():
+    assert analytics.weekday_counts(date(2026, 10, 12), date(2026, 10, 25)) == [2] * 7
+    assert analytics.weekday_counts(date(2026, 10, 17), date(2026, 10, 19)) == [1, 0, 0, 0, 0, 1, 1]
+    assert analytics.period_count("week", date(2026, 10, 18), date(2026, 10, 19)) == 2
+    assert analytics.period_count("month", date(2025, 11, 30), date(2026, 2, 1)) == 4
+    assert analytics.period_count("year", date(2025, 12, 31), date(2026, 1, 1)) == 2
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollups_match_rebuild(auth_client: AsyncClient, habits: dict):
+    await auth_client.post("/api/v1/tracker/checks:batch", json={"items": [
+        {"non_negotiable_id": habits["Fajr"], "check_date": "2025-12-31", "op": "uncheck"},
+        {"non_negotiable_id": habits["Read"], "check_date": "2026-01-01"},
+    ]})
+    check = (await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": habits["Read"], "check_date": "2026-03-02"})).json()
+    await auth_client.delete(f"/api/v1/tracker/check/{check['id']}")
+    await auth_client.delete(f"/api/v1/tracker/non-negotiables/{habits['Run']}")
+    incremental = await _rollups()
+
+    me = (await auth_client.get("/api/v1/auth/me")).json()["id"]
+    async with TestSession() as db:
+        await analytics.rebuild(db, [me])
+        await db.commit()
+    assert await _rollups() == incremental
+    habit_rows, user_rows = incremental
+    assert ("year", date(2025, 1, 1)) in {(r[1], r[2]) for r in user_rows}
+    assert not {r for r in habit_rows if r[0] == habits["Run"]}
+
+
+@pytest.mark.asyncio
+async def test_trend(auth_client: AsyncClient, habits: dict):
+    resp = await auth_client.get("/api/v1/analytics/trend", params={"period": "month", "from": "2025-11-01", "to": "2026-01-31"})
+    assert resp.status_code == 200
+    nov, dec, jan = resp.json()["points"]
+    assert (nov["completed"], nov["possible"]) == (0, 3 * 11)
+    assert (dec["start"], dec["end"]) == ("2025-12-01", "2025-12-31")
+    assert (dec["completed"], dec["possible"]) == (31 + 5 + 1, 3 * 31)
+    assert jan["completed"] == 14 + 2
+
+    fajr = await auth_client.get("/api/v1/analytics/trend", params={
+        "period": "week", "from": "2026-01-05", "to": "2026-01-18", "non_negotiable_id": habits["Fajr"],
+    })
+    assert [(p["start"], p["completed"], p["rate"]) for p in fajr.json()["points"]] == [("2026-01-05", 7, 1.0), ("2026-01-12", 3, 0.4286)]
+
+
+@pytest.mark.asyncio
+async def test_breakdown(auth_client: AsyncClient, habits: dict):
+    resp = await auth_client.get("/api/v1/analytics/breakdown", params={"from": "2025-11-25", "to": "2026-01-09"})
+    assert resp.status_code == 200
+    data = resp.json()
+    days = 46
+    assert (data["completed"], data["possible"]) == (40 + 6 + 1, 3 * days)
+    by_title = {h["title"]: h for h in data["habits"]}
+    assert (by_title["Fajr"]["completed"], by_title["Fajr"]["possible"]) == (40, days)
+    assert [c["category"] for c in data["categories"]] == ["growth", "health", "spiritual"]
+    weekdays = {w["weekday"]: w for w in data["weekdays"]}
+    # 6 Mondays in range, from 1 Dec: Fajr and Run on each of them
+    assert (weekdays["mon"]["completed"], weekdays["mon"]["possible"]) == (12, 3 * 6)
+    assert weekdays["thu"]["completed"] == 6 + 1  # Christmas Day was a Thursday
+
+
+@pytest.mark.asyncio
+async def test_errors(auth_client: AsyncClient, habits: dict):
+    assert (await auth_client.get("/api/v1/analytics/breakdown", params={"from": "2026-01-02", "to": "2026-01-01"})).status_code == 400
+    assert (await auth_client.get("/api/v1/analytics/trend", params={"period": "week", "from": "2020-01-01"})).status_code == 400
+    missing = await auth_client.get("/api/v1/analytics/trend", params={"period": "year", "from": "2025-01-01", "non_negotiable_id": 999})
+    assert missing.status_code == 404
@@ -58,3 +58,238 @@ async def test_logout(client: AsyncClient):
     refresh_token = reg.json()["refresh_token"]
     resp = await client.post("/api/v1/auth/logout", json={"refresh_token": refresh_token})
     assert resp.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_access_token_carries_claims(auth_client: AsyncClient):
+    from app.core.security import decode_access_token
+
+    token = auth_client.headers["Authorization"].removeprefix("Bearer ")
+    principal = decode_access_token(token)
+    assert principal.subscription_tier == "free"
+    assert principal.timezone == "UTC"
+    assert principal.is_active is True
+    assert principal.token_version == 0
+
+
+@pytest.mark.asyncio
+async def test_bumped_token_version_revokes_access_token(auth_client: AsyncClient):
+    from tests.conftest import TestSession
+    from app.models.user import User
+    from app.services.auth import bump_token_version
+
+    me = await auth_client.get("/api/v1/auth/me")
+    async with TestSession() as db:
+        user = await db.get(User, me.json()["id"])
+        await bump_token_version(db, user)
+
+    resp = await auth_client.get("/api/v1/personas")
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Token revoked"
+
+
+async def _me(client: AsyncClient) -> int:
+    return (await client.get("/api/v1/auth/me")).json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_account_changes_revoke_access_tokens(auth_client: AsyncClient):
+    from tests.conftest import TestSession
+    from app.models.user import User
+    from app.services.auth import update_account
+
+    user_id = await _me(auth_client)
+    async with TestSession() as db:
+        await update_account(db, await db.get(User, user_id), subscription_tier="premium")
+    resp = await auth_client.get("/api/v1/personas")
+    assert (resp.status_code, resp.json()["detail"]) == (401, "Token revoked")
+
+    # any ORM change to a token column bumps the version, even without update_account
+    async with TestSession() as db:
+        user = await db.get(User, user_id)
+        before = user.token_version
+        user.is_active = False
+        await db.commit()
+        assert user.token_version == before + 1
+
+
+@pytest.mark.asyncio
+async def test_missing_or_unreachable_version_falls_back_to_database(auth_client: AsyncClient, monkeypatch):
+    from redis.exceptions import RedisError
+
+    from tests.conftest import TestSession
+    from app.core import deps
+    from app.core.redis import get_redis
+    from app.core.security import token_version_key
+    from app.models.user import User
+
+    user_id = await _me(auth_client)
+    await get_redis().delete(token_version_key(user_id))
+    assert (await auth_client.get("/api/v1/personas")).status_code == 200
+    assert await get_redis().get(token_version_key(user_id)) is not None  # re-published
+
+    async with TestSession() as db:
+        user = await db.get(User, user_id)
+        user.password_hash = "changed elsewhere"
+        await db.commit()
+    await get_redis().delete(token_version_key(user_id))  # the bump never reached Redis
+    assert (await auth_client.get("/api/v1/personas")).status_code == 401
+
+    class Down:
+        async def get(self, key):
+            raise RedisError("down")
+
+    await get_redis().set(token_version_key(user_id), 0)
+    monkeypatch.setattr(deps, "get_redis", lambda: Down())
+    resp = await auth_client.get("/api/v1/personas")
+    assert (resp.status_code, resp.json()["detail"]) == (401, "Token revoked")
+
+
+@pytest.mark.asyncio
+async def test_verify_password_accepts_hash_with_other_cost():
+    import bcrypt
+
+    from app.core.security import verify_password
+
+    legacy = bcrypt.hashpw(b"pass123", bcrypt.gensalt(rounds=5)).decode("utf-8")
+    assert await verify_password("pass123", legacy)
+    assert not await verify_password("nope", legacy)
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_hasher_saturated(client: AsyncClient, monkeypatch):
+    from app.core import security
+
+    await client.post("/api/v1/auth/register", json={"email": "busy@niyyah.app", "password": "pass"})
+    monkeypatch.setattr(security.settings, "password_hash_max_pending", 0)
+    resp = await client.post("/api/v1/auth/login", json={"email": "busy@niyyah.app", "password": "pass"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_token(client: AsyncClient):
+    reg = await client.post("/api/v1/auth/register", json={"email": "rotate@niyyah.app", "password": "pass"})
+    first = reg.json()["refresh_token"]
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    second = resp.json()["refresh_token"]
+    assert second != first
+
+    reused = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert reused.status_code == 401
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": second})
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client: AsyncClient):
+    reg = await client.post("/api/v1/auth/register", json={"email": "revoke@niyyah.app", "password": "pass"})
+    refresh_token = reg.json()["refresh_token"]
+    await client.post("/api/v1/auth/logout", json={"refresh_token": refresh_token})
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_expires_with_redis_ttl(client: AsyncClient, monkeypatch):
+    from app.core.redis import get_redis
+    from app.core.security import hash_token
+    from app.services.tokens import refresh_key
+
+    reg = await client.post("/api/v1/auth/register", json={"email": "ttl@niyyah.app", "password": "pass"})
+    refresh_token = reg.json()["refresh_token"]
+    redis = get_redis()
+    key = refresh_key(hash_token(refresh_token))
+    assert redis._expires[key] > 0
+    monkeypatch.setitem(redis._expires, key, 0)
+
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_accepts_legacy_database_token(client: AsyncClient, monkeypatch):
+    from tests.conftest import TestSession
+    from app.core.security import hash_token
+    from app.services import tokens
+
+    reg = await client.post("/api/v1/auth/register", json={"email": "legacy@niyyah.app", "password": "pass"})
+    me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {reg.json()['access_token']}"})
+    async with TestSession() as db:
+        await tokens.DatabaseTokenStore(db).issue(me.json()["id"], hash_token("legacy-token"))
+
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": "legacy-token"})
+    assert resp.status_code == 200
+    assert (await client.post("/api/v1/auth/refresh", json={"refresh_token": "legacy-token"})).status_code == 401
+    assert (await client.post("/api/v1/auth/refresh", json=resp.json())).status_code == 200
+
+    monkeypatch.setattr(tokens.settings, "refresh_token_legacy_fallback", False)
+    async with TestSession() as db:
+        await tokens.DatabaseTokenStore(db).issue(me.json()["id"], hash_token("stranded-token"))
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": "stranded-token"})
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_database_token_store(client: AsyncClient, monkeypatch):
+    from app.services import tokens
+
+    monkeypatch.setattr(tokens.settings, "refresh_token_store", "database")
+    reg = await client.post("/api/v1/auth/register", json={"email": "db@niyyah.app", "password": "pass"})
+    first = reg.json()["refresh_token"]
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert resp.status_code == 200
+    assert (await client.post("/api/v1/auth/refresh", json={"refresh_token": first})).status_code == 401
+    await client.post("/api/v1/auth/logout", json={"refresh_token": resp.json()["refresh_token"]})
+    assert (await client.post("/api/v1/auth/refresh", json=resp.json())).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_returns_503_when_redis_down(client: AsyncClient, monkeypatch):
+    from redis.exceptions import ConnectionError
+
+    from app.services.tokens import MemoryTokenStore
+
+    reg = await client.post("/api/v1/auth/register", json={"email": "down@niyyah.app", "password": "pass"})
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(MemoryTokenStore, "rotate", unavailable)
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": reg.json()["refresh_token"]})
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_reap_refresh_tokens(auth_client: AsyncClient):
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import select
+
+    from tests.conftest import TestSession
+    from app.core.redis import get_redis
+    from app.models.user import RefreshToken
+    from app.scripts.reap_refresh_tokens import reap
+    from app.services.tokens import refresh_key
+
+    user_id = await _me(auth_client)
+    now = datetime.now(timezone.utc)
+    async with TestSession() as db:
+        db.add_all(
+            RefreshToken(user_id=user_id, token_hash=f"expired-{i}", expires_at=now - timedelta(days=i + 1)) for i in range(3)
+        )
+        db.add_all(RefreshToken(user_id=user_id, token_hash=f"live-{i}", expires_at=now + timedelta(hours=i + 1)) for i in range(3))
+        await db.commit()
+
+    assert await reap(TestSession, batch_size=2) == {"reaped": 3, "migrated": 0}
+    async with TestSession() as db:
+        assert sorted((await db.scalars(select(RefreshToken.token_hash))).all()) == ["live-0", "live-1", "live-2"]
+
+    assert await reap(TestSession, batch_size=2, migrate=True) == {"reaped": 0, "migrated": 3}
+    async with TestSession() as db:
+        assert (await db.scalars(select(RefreshToken.id))).all() == []
+    redis = get_redis()
+    assert await redis.get(refresh_key("live-2")) == str(user_id).encode()
+    # remaining lifetime carries over, from the naive datetimes SQLite returns too
+    assert 3500 < redis._expires[refresh_key("live-0")] - time.monotonic() <= 3601
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+async def _habit(client: AsyncClient, title: str) -> int:
+    resp = await client.post("/api/v1/tracker/non-negotiables", json={"title": title})
+    return resp.json()["id"]
+
+
+def _month_url(day: date) -> str:
+    return f"/api/v1/calendar/{day.year}/{day.month}"
+
+
+@pytest.mark.asyncio
+async def test_month_view_tracks_checks(auth_client: AsyncClient):
+    today = date.today()
+    fajr = await _habit(auth_client, "Fajr")
+    await _habit(auth_client, "Quran")
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": fajr})
+
+    resp = await auth_client.get(_month_url(today))
+    assert resp.status_code == 200
+    assert resp.json() == [{"date": today.isoformat(), "total": 2, "completed": 1, "pct": 50.0}]
+
+
+@pytest.mark.asyncio
+async def test_uncheck_and_habit_changes_update_cache(auth_client: AsyncClient):
+    today = date.today()
+    fajr = await _habit(auth_client, "Fajr")
+    quran = await _habit(auth_client, "Quran")
+    check = await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": fajr})
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": quran})
+
+    await auth_client.delete(f"/api/v1/tracker/check/{check.json()['id']}")
+    day = (await auth_client.get(_month_url(today))).json()[0]
+    assert (day["total"], day["completed"]) == (2, 1)
+
+    await _habit(auth_client, "Adhkar")
+    day = (await auth_client.get(_month_url(today))).json()[0]
+    assert (day["total"], day["completed"]) == (3, 1)
+
+    await auth_client.delete(f"/api/v1/tracker/non-negotiables/{quran}")
+    day = (await auth_client.get(_month_url(today))).json()[0]
+    assert (day["total"], day["completed"], day["pct"]) == (2, 0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_backdated_check_counts_habit_for_that_day(auth_client: AsyncClient):
+    past = date.today() - timedelta(days=3)
+    fajr = await _habit(auth_client, "Fajr")
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": fajr, "check_date": past.isoformat()})
+
+    days = (await auth_client.get(_month_url(past))).json()
+    assert {"date": past.isoformat(), "total": 1, "completed": 1, "pct": 100.0} in days
+
+
+@pytest.mark.asyncio
+async def test_day_detail(auth_client: AsyncClient):
+    today = date.today()
+    fajr = await _habit(auth_client, "Fajr")
+    await _habit(auth_client, "Quran")
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": fajr})
+
+    resp = await auth_client.get(f"{_month_url(today)}/{today.day}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["total"], data["completed"], data["pct"]) == (2, 1, 50.0)
+    assert [(i["title"], i["checked"]) for i in data["items"]] == [("Fajr", True), ("Quran", False)]
+
+
+@pytest.mark.asyncio
+async def test_invalid_month(auth_client: AsyncClient):
+    resp = await auth_client.get("/api/v1/calendar/2026/13")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental(auth_client: AsyncClient):
+    from sqlalchemy import select
+
+    from app.models.calendar import CalendarCache
+    from app.services.calendar import rebuild_days
+    from tests.conftest import TestSession
+
+    today = date.today()
+    fajr = await _habit(auth_client, "Fajr")
+    quran = await _habit(auth_client, "Quran")
+    for offset in (0, 1, 2):
+        await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": fajr, "check_date": (today - timedelta(days=offset)).isoformat()})
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": quran})
+
+    query = select(CalendarCache.user_id, CalendarCache.date, CalendarCache.total_habits, CalendarCache.completed_habits).order_by(CalendarCache.date)
+    async with TestSession() as db:
+        incremental = (await db.execute(query)).all()
+        await rebuild_days(db, [incremental[0].user_id])
+        await db.commit()
+        rebuilt = (await db.execute(query)).all()
+    assert rebuilt == incremental
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from hypothesis import given, strategies as st
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.models.tracker import DailyCheckMonth
+from app.services import check_months
+from tests.conftest import TestSession
+
+TODAY = date.today()
+START = TODAY - timedelta(days=70)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    def use(mode: str) -> None:
+        monkeypatch.setattr(settings, "check_storage", mode)
+    return use
+
+
+async def _history(client: AsyncClient) -> list[int]:
+    """Two habits with checks spread over three months, written through every write path."""
+    a = (await client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    b = (await client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()["id"]
+    items = [{"non_negotiable_id": a, "check_date": (START + timedelta(days=i)).isoformat()} for i in range(0, 71, 2)]
+    items += [{"non_negotiable_id": b, "check_date": (START + timedelta(days=i)).isoformat()} for i in range(30, 45)]
+    await client.post("/api/v1/tracker/checks:batch", json={"items": items})
+    await client.post("/api/v1/tracker/checks:batch", json={"items": [
+        {"non_negotiable_id": b, "check_date": (START + timedelta(days=37)).isoformat(), "op": "uncheck"},
+    ]})
+    await client.post("/api/v1/tracker/check", json={"non_negotiable_id": b})
+    check = (await client.post("/api/v1/tracker/check", json={"non_negotiable_id": a, "check_date": (START + timedelta(days=1)).isoformat()})).json()
+    await client.delete(f"/api/v1/tracker/check/{check['id']}")
+    return [a, b]
+
+
+async def _reads(client: AsyncClient) -> tuple:
+    params = {"from": START.isoformat(), "to": TODAY.isoformat(), "encoding": "rle"}
+    ranged = (await client.get("/api/v1/tracker/range", params=params)).json()
+    today = (await client.get("/api/v1/tracker/today")).json()
+    checked = sorted(c["non_negotiable_id"] for c in today["checks"])
+    habit_streaks = [h["streak"] for h in today["non_negotiables"]]
+    return ranged, checked, habit_streaks
+
+
+def test_masks_and_keys():
+    merged = check_months.masks([(1, date(2026, 1, 1)), (1, date(2026, 1, 31)), (2, date(2026, 2, 3)), (1, date(2026, 1, 1))])
+    assert merged == {(1, date(2026, 1, 1)): 1 | 1 << 30, (2, date(2026, 2, 1)): 1 << 2}
+    assert check_months.days_in(date(2026, 1, 1), 1 | 1 << 30) == [date(2026, 1, 1), date(2026, 1, 31)]
+    assert check_months.days_in(date(2026, 1, 1), 0b111, lo=date(2026, 1, 2)) == [date(2026, 1, 2), date(2026, 1, 3)]
+    key = check_months.check_key(123456, date(2026, 10, 18))
+    assert key < 0 and check_months.parse_check_key(key) == (123456, date(2026, 10, 18))
+
+
+@given(st.integers(min_value=1, max_value=2**31 - 1), st.dates())
+def test_check_keys_round_trip(nn_id, day):
+    key = check_months.check_key(nn_id, day)
+    assert -(2**53) < key < 0  # exact as a JSON number in any client
+    assert check_months.parse_check_key(key) == (nn_id, day)
+
+
+@pytest.mark.asyncio
+async def test_unparseable_check_key_is_not_found(auth_client: AsyncClient):
+    assert (await auth_client.delete(f"/api/v1/tracker/check/{-(1 << check_months.KEY_DAY_BITS)}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rows_mode_writes_no_bitmaps(auth_client: AsyncClient):
+    await _history(auth_client)
+    async with TestSession() as db:
+        assert await db.scalar(select(func.count()).select_from(DailyCheckMonth)) == 0
+
+
+@pytest.mark.asyncio
+async def test_bitmap_reads_match_rows(auth_client: AsyncClient, storage):
+    storage("dual")
+    await _history(auth_client)
+    rows = await _reads(auth_client)
+    storage("bitmap")
+    assert await _reads(auth_client) == rows
+
+
+@pytest.mark.asyncio
+async def test_bitmap_streaks_after_uncheck(auth_client: AsyncClient, storage):
+    storage("bitmap")
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Tahajjud"})).json()["id"]
+    days = [(TODAY - timedelta(days=i)).isoformat() for i in range(5)]
+    await auth_client.post("/api/v1/tracker/checks:batch", json={"items": [{"non_negotiable_id": nn_id, "check_date": d} for d in days]})
+
+    today = (await auth_client.get("/api/v1/tracker/today")).json()
+    (check,) = today["checks"]
+    assert check["id"] < 0 and check["check_date"] == TODAY.isoformat()
+    # Uncheck the day two days ago: the run splits
+    key = check_months.check_key(nn_id, TODAY - timedelta(days=2))
+    assert (await auth_client.delete(f"/api/v1/tracker/check/{key}")).status_code == 204
+    assert (await auth_client.delete(f"/api/v1/tracker/check/{key}")).status_code == 404
+    streak = (await auth_client.get("/api/v1/tracker/non-negotiables")).json()[0]["streak"]
+    assert (streak["current_streak"], streak["longest_streak"]) == (2, 2)
+
+    # Removing today by its bitmap key leaves yesterday's run current
+    assert (await auth_client.delete(f"/api/v1/tracker/check/{check['id']}")).status_code == 204
+    streak = (await auth_client.get("/api/v1/tracker/non-negotiables")).json()[0]["streak"]
+    assert streak["current_streak"] == 1 and streak["last_check_date"] == days[1]
+
+
+@pytest.mark.asyncio
+async def test_bit_updates_do_not_overwrite_each_other(auth_client: AsyncClient, storage):
+    storage("dual")
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Adhkar"})).json()["id"]
+    month = date(2026, 3, 1)
+    async with TestSession() as first, TestSession() as second:
+        await check_months.record_checks(first, [(nn_id, date(2026, 3, 2))])
+        await first.commit()
+        await check_months.record_checks(second, [(nn_id, date(2026, 3, 9)), (nn_id, date(2026, 3, 31))])
+        await second.commit()
+        await check_months.record_unchecks(first, [(nn_id, date(2026, 3, 9))])
+        await first.commit()
+    async with TestSession() as db:
+        assert await check_months.checked_days(db, nn_id) == [date(2026, 3, 2), date(2026, 3, 31)]
+        assert await db.scalar(select(DailyCheckMonth.mask).where(DailyCheckMonth.month == month)) == 1 << 1 | 1 << 30
+
+
+@pytest.mark.asyncio
+async def test_backfill_converges(auth_client: AsyncClient, storage):
+    habit_ids = await _history(auth_client)
+    rows = await _reads(auth_client)
+    async with TestSession() as db:
+        months = await check_months.backfill(db, habit_ids, dry_run=True)
+        assert months >= 3
+        assert await check_months.backfill(db, habit_ids) == months
+        await db.commit()
+        # Drifted months are found and corrected on the next pass
+        await db.execute(update(DailyCheckMonth).values(mask=(1 << 31) - 1))
+        await db.commit()
+        assert await check_months.backfill(db, habit_ids) == months
+        await db.commit()
+        assert await check_months.backfill(db, habit_ids, dry_run=True) == 0
+    storage("bitmap")
+    assert await _reads(auth_client) == rows
+
+
+@pytest.mark.asyncio
+async def test_deleting_habit_drops_its_months(auth_client: AsyncClient, storage):
+    storage("dual")
+    a, b = await _history(auth_client)
+    await auth_client.delete(f"/api/v1/tracker/non-negotiables/{a}")
+    async with TestSession() as db:
+        owners = set((await db.execute(select(DailyCheckMonth.non_negotiable_id))).scalars())
+    assert owners == {b}
@@ -0,0 +1,105 @@
+import json
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.services import dashboard
+from app.services.dashboard import snapshot_cache
+from tests.conftest import engine
+
+
+@pytest.mark.asyncio
+async def test_dashboard_shape(auth_client: AsyncClient):
+    p = await auth_client.post("/api/v1/personas", json={"name": "Siddiq", "domain": "Practice"})
+    await auth_client.post("/api/v1/schedule", json={"persona_id": p.json()["id"], "start_time": "05:00", "end_time": "06:00", "activity": "Fajr"})
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})
+
+    resp = await auth_client.get("/api/v1/dashboard")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["super_objective"] == "Allah SWT's Satisfaction"
+    assert [x["name"] for x in data["personas"]] == ["Siddiq"]
+    assert data["schedule_blocks"][0]["activity"] == "Fajr"
+    assert data["non_negotiables_total"] == 1
+    assert data["non_negotiables_checked_today"] == 0
+    assert data["streaks"] == [{"title": "Quran", "current": 0, "longest": 0}]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_body_is_compact_utf8_json(auth_client: AsyncClient):
+    await auth_client.post("/api/v1/personas", json={"name": "Siddiq", "arabic_name": "الصِّدِّيق", "domain": "Practice \"+\" Dawah"})
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Qur'an\tdaily"})
+    miss = await auth_client.get("/api/v1/dashboard")
+    hit = await auth_client.get("/api/v1/dashboard")
+    # what JSONResponse rendered for the snapshot dict
+    expected = json.dumps(miss.json(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    assert miss.content == hit.content == expected
+    assert miss.headers["content-type"] == "application/json"
+    assert hit.headers["etag"] == miss.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_served_from_cache_until_mutation(auth_client: AsyncClient):
+    create = await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Adhkar"})
+    await auth_client.get("/api/v1/dashboard")
+    hits, misses = snapshot_cache.hits, snapshot_cache.misses
+
+    await auth_client.get("/api/v1/dashboard")
+    assert (snapshot_cache.hits, snapshot_cache.misses) == (hits + 1, misses)
+
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": create.json()["id"]})
+    resp = await auth_client.get("/api/v1/dashboard")
+    assert snapshot_cache.misses == misses + 1
+    assert resp.json()["non_negotiables_checked_today"] == 1
+    assert resp.json()["streaks"][0]["current"] == 1
+
+
+@pytest.mark.asyncio
+async def test_settings_update_invalidates_dashboard(auth_client: AsyncClient):
+    await auth_client.get("/api/v1/dashboard")
+    await auth_client.patch("/api/v1/settings", json={"super_objective": "Jannah"})
+    resp = await auth_client.get("/api/v1/dashboard")
+    assert resp.json()["super_objective"] == "Jannah"
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_exposed(client: AsyncClient):
+    resp = await client.get("/health/cache")
+    assert resp.status_code == 200
+    assert set(resp.json()["dashboard"]) >= {"hits", "misses", "hit_ratio"}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_built_before_a_concurrent_write_is_not_served(auth_client: AsyncClient, monkeypatch):
+    build = dashboard.build_dashboard
+
+    async def racing_build(engine, user_id, today):
+        data = await build(engine, user_id, today)
+        monkeypatch.setattr(dashboard, "build_dashboard", build)
+        # a write commits and invalidates after the snapshot was read but before it is cached
+        await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})
+        return data
+
+    monkeypatch.setattr(dashboard, "build_dashboard", racing_build)
+    assert (await auth_client.get("/api/v1/dashboard")).json()["non_negotiables_total"] == 0
+    assert (await auth_client.get("/api/v1/dashboard")).json()["non_negotiables_total"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_miss_takes_one_pooled_connection(auth_client: AsyncClient):
+    user_id = (await auth_client.get("/api/v1/auth/me")).json()["id"]
+    checkouts = []
+
+    def checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine, "checkout", checkout)
+    try:
+        data = await dashboard.build_dashboard(engine, user_id, date.today())
+    finally:
+        event.remove(engine.sync_engine, "checkout", checkout)
+    assert data["non_negotiables_total"] == 0
+    assert len(checkouts) == 1
@@ -0,0 +1,64 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.core.database import TimedQueuePool, engine_options, pool_stats
+
+PG_URL = "postgresql+asyncpg://niyyah:niyyah@db:5432/niyyah"
+
+
+def test_engine_options_from_settings():
+    options = engine_options(Settings(database_url=PG_URL, db_pool_size=4, db_max_overflow=2, db_statement_cache_size=0))
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (4, 2)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0}
+
+
+def test_pgbouncer_mode_disables_statement_caches():
+    args = engine_options(Settings(database_url=PG_URL, db_pgbouncer=True))["connect_args"]
+    assert args["statement_cache_size"] == 0 and args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+
+
+def test_sqlite_keeps_default_pool():
+    options = engine_options(Settings(database_url="sqlite+aiosqlite:///./x.db"))
+    assert "poolclass" not in options and "pool_size" not in options
+
+
+@pytest.mark.asyncio
+async def test_timed_pool_stats(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=2, max_overflow=0)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert (stats["checked_out"], stats["acquired"]) == (1, 1)
+    assert pool_stats(engine)["checked_out"] == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_timed_pool_does_not_count_timeouts_as_acquires(tmp_path):
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2
+    )
+    try:
+        async with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                await engine.connect().start()
+        stats = pool_stats(engine)
+        assert (stats["acquired"], stats["timeouts"]) == (1, 1)
+        assert stats["wait_ms_max"] < 200
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_health_endpoint(client: AsyncClient):
+    resp = await client.get("/health/pool")
+    assert resp.status_code == 200
+    assert "class" in resp.json()["database"]
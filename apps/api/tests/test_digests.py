@@ -0,0 +1,177 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+
+from app.models.partnership import DigestOutbox, DigestRun, Partnership
+from app.models.tracker import NonNegotiable
+from app.services import digests
+from app.services.digests import deliver_digests, period_for, queue_digests
+from app.services.mail import SmtpSender, SmtpSink
+from tests.conftest import TestSession, count_queries
+
+TODAY = date(2026, 3, 10)  # a Tuesday; last week is Mon 2 - Sun 8 March
+
+
+def test_periods():
+    assert period_for("daily", TODAY) == (date(2026, 3, 9), date(2026, 3, 9))
+    assert period_for("weekly", TODAY) == (date(2026, 3, 2), date(2026, 3, 8))
+    assert period_for("weekly", date(2026, 3, 9)) == (date(2026, 3, 2), date(2026, 3, 8))
+    assert period_for("monthly", TODAY) == (date(2026, 2, 1), date(2026, 2, 28))
+    assert period_for("monthly", date(2026, 1, 1)) == (date(2025, 12, 1), date(2025, 12, 31))
+
+
+async def _user_with_habits(client: AsyncClient, email: str, checked_days: list[int]) -> int:
+    reg = await client.post("/api/v1/auth/register", json={"email": email, "password": "pass"})
+    headers = {"Authorization": f"Bearer {reg.json()['access_token']}"}
+    user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+    for title in ("Quran", "Exercise"):
+        habit = (await client.post("/api/v1/tracker/non-negotiables", json={"title": title}, headers=headers)).json()
+        for day in checked_days:
+            body = {"non_negotiable_id": habit["id"], "check_date": f"2026-03-{day:02d}"}
+            await client.post("/api/v1/tracker/check", json=body, headers=headers)
+    async with TestSession() as db:
+        await db.execute(
+            update(NonNegotiable)
+            .where(NonNegotiable.user_id == user_id)
+            .values(created_at=datetime(2026, 1, 1, tzinfo=timezone.utc))
+        )
+        await db.commit()
+    return user_id
+
+
+@pytest_asyncio.fixture
+async def partnerships(client: AsyncClient) -> list[int]:
+    levels = ("full", "summary", "score_only")
+    users = [await _user_with_habits(client, f"inviter{n}@niyyah.app", [2, 3, 4, 5, 6, 7, 8][: 7 - n * 2]) for n in range(3)]
+    async with TestSession() as db:
+        accepted = [
+            Partnership(inviter_id=user_id, partner_email=f"partner{n}@niyyah.app",
+                        share_frequency="weekly", share_level=level, status="accepted")
+            for n, (user_id, level) in enumerate(zip(users, levels))
+        ]
+        db.add_all(accepted)
+        db.add(Partnership(inviter_id=users[0], partner_email="pending@niyyah.app", share_frequency="weekly"))
+        db.add(Partnership(inviter_id=users[0], partner_email="daily@niyyah.app", share_frequency="daily", status="accepted"))
+        await db.commit()
+        return [p.id for p in accepted]
+
+
+async def _outbox() -> list[DigestOutbox]:
+    async with TestSession() as db:
+        return list((await db.execute(select(DigestOutbox).order_by(DigestOutbox.partnership_id))).scalars())
+
+
+@pytest.mark.asyncio
+async def test_queue_renders_each_share_level(partnerships):
+    result = await queue_digests(TestSession, "weekly", TODAY, batch_size=2)
+    assert result == {"frequency": "weekly", "period_end": "2026-03-08", "queued": 3, "resumed": False}
+
+    full, summary, score = await _outbox()
+    assert [o.recipient for o in (full, summary, score)] == ["partner0@niyyah.app", "partner1@niyyah.app", "partner2@niyyah.app"]
+    assert full.subject == "inviter0's weekly progress: 100%"
+    assert "2026-03-02 to 2026-03-08" in full.body
+    assert "- Quran: 7/7 days" in full.body
+    assert "71% (10 of 14 habit-days)" in summary.body
+    assert "Active streaks" in summary.body and "Quran" not in summary.body
+    assert "43% (6 of 14 habit-days)" in score.body
+    assert "streak" not in score.body.lower()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_idempotent_per_period(partnerships):
+    await queue_digests(TestSession, "weekly", TODAY, batch_size=10)
+    again = await queue_digests(TestSession, "weekly", date(2026, 3, 11), batch_size=10)
+    assert again["queued"] == 3
+    assert len(await _outbox()) == 3
+
+    next_week = await queue_digests(TestSession, "weekly", date(2026, 3, 16), batch_size=10)
+    assert next_week["queued"] == 3
+    assert len(await _outbox()) == 6
+
+
+@pytest.mark.asyncio
+async def test_crashed_run_resumes_from_checkpoint(partnerships, monkeypatch):
+    render = digests.render
+    calls = []
+
+    def crash_on_second_batch(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("worker killed")
+        return render(*args)
+
+    monkeypatch.setattr(digests, "render", crash_on_second_batch)
+    with pytest.raises(RuntimeError):
+        await queue_digests(TestSession, "weekly", TODAY, batch_size=2)
+    assert len(await _outbox()) == 2
+
+    monkeypatch.setattr(digests, "render", render)
+    result = await queue_digests(TestSession, "weekly", TODAY, batch_size=2)
+    assert result["resumed"] is True and result["queued"] == 3
+    assert [o.partnership_id for o in await _outbox()] == partnerships
+    async with TestSession() as db:
+        run = await db.scalar(select(DigestRun))
+        assert run.finished_at is not None and run.last_partnership_id == partnerships[-1]
+
+
+@pytest.mark.asyncio
+async def test_queue_queries_do_not_scale_with_partnerships(partnerships):
+    with count_queries() as statements:
+        await queue_digests(TestSession, "weekly", TODAY, batch_size=100)
+    # Checkpoint, then per batch: partnerships, checks, habits, outbox, partnerships, checkpoint.
+    assert len(statements) <= 12
+
+
+@pytest.mark.asyncio
+async def test_deliver_to_smtp_sink(partnerships):
+    await queue_digests(TestSession, "weekly", TODAY, batch_size=10)
+    async with SmtpSink(reject={"partner1@niyyah.app"}) as sink:
+        sender = SmtpSender(sink.host, sink.port, "Niyyah <no-reply@niyyah.app>")
+        result = await deliver_digests(TestSession, sender, concurrency=2, batch_size=2, max_attempts=2)
+        assert result == {"sent": 2, "failed": 1}
+        assert sorted(m.recipients[0] for m in sink.received) == ["partner0@niyyah.app", "partner2@niyyah.app"]
+        mail = next(m for m in sink.received if m.recipients == ["partner0@niyyah.app"])
+        assert mail.message["Subject"] == "inviter0's weekly progress: 100%"
+        assert "- Exercise: 7/7 days" in mail.message.get_content()
+
+        # The rejected digest is retried once more, then given up on.
+        assert await deliver_digests(TestSession, sender, 2, 2, max_attempts=2) == {"sent": 0, "failed": 1}
+        assert await deliver_digests(TestSession, sender, 2, 2, max_attempts=2) == {"sent": 0, "failed": 0}
+
+    statuses = {o.recipient: (o.status, o.attempts) for o in await _outbox()}
+    assert statuses == {
+        "partner0@niyyah.app": ("sent", 1),
+        "partner1@niyyah.app": ("failed", 2),
+        "partner2@niyyah.app": ("sent", 1),
+    }
+    async with TestSession() as db:
+        assert await db.scalar(select(func.count()).select_from(DigestOutbox).where(DigestOutbox.last_error.is_not(None))) == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_sends_outside_the_claiming_transaction(partnerships):
+    await queue_digests(TestSession, "weekly", TODAY, batch_size=10)
+    now = datetime.now(timezone.utc)
+    async with TestSession() as db:
+        ids = sorted((await db.execute(select(DigestOutbox.id))).scalars())
+        # one claim abandoned by a crashed run, one still being sent by a live run
+        await db.execute(update(DigestOutbox).where(DigestOutbox.id == ids[0]).values(status="sending", claimed_at=now - timedelta(hours=1)))
+        await db.execute(update(DigestOutbox).where(DigestOutbox.id == ids[1]).values(status="sending", claimed_at=now))
+        await db.commit()
+
+    class Recorder:
+        seen = []
+
+        async def send(self, recipient, subject, body):
+            # the claim is already committed, so another connection sees it mid-send
+            async with TestSession() as db:
+                status = await db.scalar(select(DigestOutbox.status).where(DigestOutbox.recipient == recipient))
+            self.seen.append((recipient, status))
+
+    assert await deliver_digests(TestSession, Recorder(), 2, 10, max_attempts=2) == {"sent": 2, "failed": 0}
+    assert sorted(Recorder.seen) == [("partner0@niyyah.app", "sending"), ("partner2@niyyah.app", "sending")]
+    statuses = {o.recipient: o.status for o in await _outbox()}
+    assert statuses == {"partner0@niyyah.app": "sent", "partner1@niyyah.app": "sending", "partner2@niyyah.app": "sent"}
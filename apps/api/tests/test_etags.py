@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.redis import get_redis
+
+
+@pytest.mark.asyncio
+async def test_list_returns_304_until_mutation(auth_client: AsyncClient):
+    await auth_client.post("/api/v1/principles", json={"name": "Sidq", "meaning": "Truthfulness"})
+    first = await auth_client.get("/api/v1/principles")
+    etag = first.headers["etag"]
+
+    cached = await auth_client.get("/api/v1/principles", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    await auth_client.post("/api/v1/principles", json={"name": "Sabr", "meaning": "Patience"})
+    fresh = await auth_client.get("/api/v1/principles", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(fresh.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_versions_are_per_resource(auth_client: AsyncClient):
+    etag = (await auth_client.get("/api/v1/schedule")).headers["etag"]
+    await auth_client.post("/api/v1/principles", json={"name": "Sidq", "meaning": "Truthfulness"})
+    resp = await auth_client.get("/api/v1/schedule", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_dashboard_etag_follows_checks(auth_client: AsyncClient):
+    nn = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()
+    etag = (await auth_client.get("/api/v1/dashboard")).headers["etag"]
+    assert (await auth_client.get("/api/v1/dashboard", headers={"If-None-Match": etag})).status_code == 304
+
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": nn["id"]})
+    resp = await auth_client.get("/api/v1/dashboard", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["non_negotiables_checked_today"] == 1
+
+
+@pytest.mark.asyncio
+async def test_flushed_counters_do_not_replay_old_etags(auth_client: AsyncClient):
+    etag = (await auth_client.get("/api/v1/tracker/non-negotiables")).headers["etag"]
+    await get_redis().flushdb()
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})
+    resp = await auth_client.get("/api/v1/tracker/non-negotiables", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("broken", [("incr",), ("incr", "delete"), ("incr", "delete", "set")])
+async def test_failed_bump_does_not_leave_old_etags_valid(auth_client: AsyncClient, monkeypatch, broken: tuple):
+    from redis.exceptions import RedisError
+
+    from app.services import changes
+
+    etag = (await auth_client.get("/api/v1/principles")).headers["etag"]
+    redis = get_redis()
+
+    async def fail(*args, **kwargs):
+        raise RedisError("connection reset")
+
+    with monkeypatch.context() as patch:
+        for command in broken:
+            patch.setattr(redis, command, fail)
+        await auth_client.post("/api/v1/principles", json={"name": "Sidq", "meaning": "Truthfulness"})
+    try:
+        # Counters reset, or the shared marker read with them, hold for every replica;
+        # if neither could be written, this process resets them on its next Redis call
+        assert bool(changes._untrusted) == ("set" in broken)
+        resp = await auth_client.get("/api/v1/principles", headers={"If-None-Match": etag})
+        assert resp.status_code == 200 and len(resp.json()) == 1
+        assert ("etag" not in resp.headers) == (broken == ("incr", "delete"))
+        assert changes._untrusted == {}
+    finally:
+        changes._untrusted.clear()
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services import events
+
+
+def _parse(chunk: bytes) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+async def _next(stream: events.Stream) -> tuple[str, dict]:
+    return _parse(await asyncio.wait_for(stream.queue.get(), 1))
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_streams_on_every_replica():
+    replica_a, replica_b = events.EventBroker(), events.EventBroker()
+    try:
+        on_a = await replica_a.subscribe(1)
+        on_b, other = await replica_b.subscribe(1), await replica_b.subscribe(2)
+        await events.publish(1, "change", {"resources": ["principles"]})
+        assert await _next(on_a) == await _next(on_b) == ("change", {"resources": ["principles"]})
+        assert other.queue.empty()
+        assert replica_b.stats() == {"users": 2, "streams": 2, "delivered": 1, "overflows": 0, "errors": 0}
+    finally:
+        await replica_a.close()
+        await replica_b.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_stream_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr(settings, "events_queue_size", 3)
+    broker = events.EventBroker()
+    stream = events.Stream(1, settings.events_queue_size)
+    broker._streams[1] = {stream}
+    for i in range(5):
+        broker.dispatch({"channel": b"events:user:1", "data": json.dumps({"event": "change", "data": {"n": i}})})
+    assert (broker.delivered, broker.overflows) == (4, 1)
+    assert [_parse(stream.queue.get_nowait()) for _ in range(stream.queue.qsize())] == [("resync", {}), ("change", {"n": 4})]
+
+
+@pytest.mark.asyncio
+async def test_last_stream_unsubscribes():
+    broker = events.EventBroker()
+    try:
+        first, second = await broker.subscribe(7), await broker.subscribe(7)
+        await broker.unsubscribe(first)
+        assert broker.stats()["streams"] == 1
+        await broker.unsubscribe(second)
+        assert broker.stats()["users"] == 0
+        await events.publish(7, "change", {})
+        await asyncio.sleep(0.05)
+        assert broker.delivered == 0
+    finally:
+        await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_carries_tracker_writes(auth_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "events_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(settings, "events_max_stream_seconds", 1.0)
+    me = (await auth_client.get("/api/v1/auth/me")).json()["id"]
+    nn = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()
+    broker = events.EventBroker()
+    body = events.stream_events(me, broker)
+    try:
+        assert b"event: ready" in await anext(body)
+        check = (await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": nn["id"], "check_date": "2026-01-05"})).json()
+        while (chunk := await anext(body)) == events.HEARTBEAT:
+            pass
+        event, data = _parse(chunk)
+        assert event == "check"
+        assert data["non_negotiable_id"] == nn["id"] and data["check_date"] == "2026-01-05"
+        assert data["resources"] == ["non_negotiables"]
+
+        await auth_client.delete(f"/api/v1/tracker/check/{check['id']}")
+        while (chunk := await anext(body)) == events.HEARTBEAT:
+            pass
+        assert _parse(chunk)[0] == "uncheck"
+        rest = [chunk async for chunk in body]
+        assert rest and set(rest) == {events.HEARTBEAT}
+        assert broker.stats()["streams"] == 0
+    finally:
+        await body.aclose()
+        await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_events_requires_auth(client: AsyncClient):
+    assert (await client.get("/api/v1/events")).status_code == 401
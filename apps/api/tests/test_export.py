@@ -0,0 +1,89 @@
+import io
+import json
+import zipfile
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from app.models.partnership import DigestOutbox, Partnership
+from app.services.export import ndjson, stream_rows
+from tests.conftest import TestSession, engine
+
+
+@pytest_asyncio.fixture
+async def account(auth_client: AsyncClient) -> dict:
+    persona = (await auth_client.post("/api/v1/personas", json={"name": "Hafiz", "domain": "Quran"})).json()
+    await auth_client.post(f"/api/v1/personas/{persona['id']}/milestones", json={"goal": "Juz Amma"})
+    await auth_client.post("/api/v1/principles", json={"name": "Sabr", "meaning": "Patience"})
+    block = {"persona_id": persona["id"], "start_time": "05:00", "end_time": "05:30", "activity": "Fajr"}
+    await auth_client.post("/api/v1/schedule", json=block)
+    habit = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()
+    items = [{"non_negotiable_id": habit["id"], "check_date": f"2026-02-{day:02d}"} for day in range(1, 8)]
+    await auth_client.post("/api/v1/tracker/checks:batch", json={"items": items})
+    me = (await auth_client.get("/api/v1/auth/me")).json()
+
+    # Someone else's data must never leak into the export
+    other = await auth_client.post("/api/v1/auth/register", json={"email": "other@niyyah.app", "password": "pw123456"})
+    headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+    await auth_client.post("/api/v1/personas", json={"name": "Other", "domain": "Other"}, headers=headers)
+    other_id = (await auth_client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+    async with TestSession() as db:
+        sent = Partnership(inviter_id=me["id"], partner_email="friend@niyyah.app", status="accepted")
+        received = Partnership(inviter_id=other_id, partner_id=me["id"], partner_email="test@niyyah.app", status="accepted")
+        db.add_all([sent, received, Partnership(inviter_id=other_id, partner_email="else@niyyah.app")])
+        await db.flush()
+        for partnership, recipient in ((sent, "friend@niyyah.app"), (received, "test@niyyah.app")):
+            db.add(DigestOutbox(partnership_id=partnership.id, period_start=date(2026, 2, 1), period_end=date(2026, 2, 7),
+                                recipient=recipient, subject="Weekly", body="..."))
+        await db.commit()
+    return {"user_id": me["id"], "habit": habit["id"]}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export(auth_client: AsyncClient, account):
+    resp = await auth_client.get("/api/v1/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert resp.headers["content-disposition"].startswith('attachment; filename="niyyah-export-')
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    tables: dict[str, list] = {}
+    for record in records:
+        tables.setdefault(record["table"], []).append(record["row"])
+
+    assert {t: len(rows) for t, rows in tables.items()} == {
+        "users": 1, "user_settings": 1, "personas": 1, "milestones": 1, "schedule_blocks": 1,
+        "principles": 1, "non_negotiables": 1, "daily_checks": 7, "streaks": 1, "partnerships": 2, "digest_outbox": 1,
+    }
+    user = tables["users"][0]
+    assert user["email"] == "test@niyyah.app" and "password_hash" not in user
+    assert [c["check_date"] for c in tables["daily_checks"]][:2] == ["2026-02-01", "2026-02-02"]
+    assert tables["personas"][0]["name"] == "Hafiz"
+    assert tables["digest_outbox"][0]["recipient"] == "friend@niyyah.app" and "claimed_at" in tables["digest_outbox"][0]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_is_a_zip_of_tables(auth_client: AsyncClient, account):
+    resp = await auth_client.get("/api/v1/export", params={"format": "csv"})
+    assert resp.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(resp.content))
+    assert archive.testzip() is None
+    assert archive.namelist() == [
+        "users.csv", "user_settings.csv", "personas.csv", "milestones.csv", "schedule_blocks.csv",
+        "principles.csv", "non_negotiables.csv", "daily_checks.csv", "streaks.csv", "partnerships.csv", "digest_outbox.csv",
+    ]
+    checks = archive.read("daily_checks.csv").decode().splitlines()
+    assert checks[0] == "id,non_negotiable_id,check_date,is_completed"
+    assert len(checks) == 8
+    personas = archive.read("personas.csv").decode().splitlines()
+    assert personas[1].split(",")[2] == "Hafiz"
+    assert "password_hash" not in archive.read("users.csv").decode()
+
+
+@pytest.mark.asyncio
+async def test_rows_are_fetched_in_chunks(account):
+    chunks = [(table, len(rows)) async for table, _, rows in stream_rows(engine, account["user_id"], chunk_size=3)]
+    assert [n for table, n in chunks if table == "daily_checks"] == [0, 3, 3, 1]
+    lines = b"".join([part async for part in ndjson(stream_rows(engine, account["user_id"], chunk_size=3))])
+    assert lines.count(b"\n") == 18
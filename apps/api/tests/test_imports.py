@@ -0,0 +1,133 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import count_queries
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _document(days: int = 10) -> dict:
+    return {
+        "personas": [{"id": 1, "name": "Hafiz", "domain": "Quran", "color": "#0ea5e9"}, {"id": 2, "name": "Mujahid", "domain": "Health"}],
+        "milestones": [{"persona_id": 1, "goal": "Juz Amma", "target_date": "2026-06-01"}],
+        "principles": [{"name": "Sabr", "meaning": "Patience"}],
+        "schedule_blocks": [{"persona_id": 2, "start_time": "06:00", "end_time": "07:00", "activity": "Run"}],
+        "non_negotiables": [{"id": 10, "title": "Quran"}, {"id": 11, "title": "Exercise", "category": "health"}],
+        "daily_checks": [{"non_negotiable_id": 10, "check_date": f"2025-01-{day:02d}"} for day in range(1, days + 1)]
+        + [{"non_negotiable_id": 11, "check_date": "2025-01-03"}, {"non_negotiable_id": 11, "check_date": "2025-01-03"}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_json_import(auth_client: AsyncClient):
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Existing"})
+    resp = await auth_client.post("/api/v1/import", json=_document())
+    assert resp.status_code == 201, resp.text
+    assert resp.json() == {"personas": 2, "milestones": 1, "principles": 1, "schedule_blocks": 1, "non_negotiables": 2, "daily_checks": 11}
+
+    personas = (await auth_client.get("/api/v1/personas")).json()
+    assert [p["name"] for p in personas] == ["Hafiz", "Mujahid"]
+    assert [m["goal"] for m in personas[0]["milestones"]] == ["Juz Amma"]
+    blocks = (await auth_client.get("/api/v1/schedule")).json()
+    assert blocks[0]["persona_id"] == personas[1]["id"]
+
+    habits = (await auth_client.get("/api/v1/tracker/non-negotiables")).json()
+    assert [h["title"] for h in habits] == ["Existing", "Quran", "Exercise"]
+    assert habits[1]["streak"] == {"current_streak": 10, "longest_streak": 10, "last_check_date": "2025-01-10"}
+
+    january = (await auth_client.get("/api/v1/calendar/2025/1")).json()
+    assert len(january) == 10
+    assert january[2]["completed"] == 2 and january[2]["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_export_round_trips_through_ndjson_import(client: AsyncClient, auth_client: AsyncClient):
+    await auth_client.post("/api/v1/import", json=_document())
+    export = await auth_client.get("/api/v1/export")
+
+    other = await client.post("/api/v1/auth/register", json={"email": "copy@niyyah.app", "password": "pw123456"})
+    headers = {"Authorization": f"Bearer {other.json()['access_token']}", **NDJSON}
+    resp = await client.post("/api/v1/import", content=export.content, headers=headers)
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["daily_checks"] == 11 and resp.json()["personas"] == 2
+
+    copied = await client.get("/api/v1/tracker/non-negotiables", headers=headers)
+    assert [h["streak"]["longest_streak"] for h in copied.json()] == [10, 1]
+
+
+@pytest.mark.asyncio
+async def test_invalid_documents_write_nothing(auth_client: AsyncClient):
+    lines = [
+        {"table": "personas", "row": {"id": 1, "name": "Hafiz", "domain": "Quran"}},
+        {"table": "milestones", "row": {"persona_id": 7, "goal": "Orphan"}},
+        {"table": "non_negotiables", "row": {"id": 3, "title": "Quran"}},
+        {"table": "daily_checks", "row": {"non_negotiable_id": 3, "check_date": "not a date"}},
+        {"table": "badges", "row": {}},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{oops\n"
+    resp = await auth_client.post("/api/v1/import", content=body, headers=NDJSON)
+    assert resp.status_code == 422
+    assert [e["at"] for e in resp.json()["detail"]] == ["line 2", "line 4", "line 5", "line 6"]
+    assert "persona_id 7" in resp.json()["detail"][0]["msg"]
+    assert (await auth_client.get("/api/v1/personas")).json() == []
+
+    resp = await auth_client.post("/api/v1/import", content=b"hello", headers={"Content-Type": "text/plain"})
+    assert resp.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_free_tier_limits_apply(auth_client: AsyncClient):
+    document = {"personas": [{"name": f"P{i}", "domain": "D"} for i in range(4)]}
+    resp = await auth_client.post("/api/v1/import", json=document)
+    assert resp.status_code == 403
+    assert (await auth_client.get("/api/v1/personas")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_statements_do_not_scale_with_rows(auth_client: AsyncClient):
+    with count_queries() as small:
+        await auth_client.post("/api/v1/import", json=_document(days=5))
+    await auth_client.post("/api/v1/auth/register", json={"email": "big@niyyah.app", "password": "pw123456"})
+    login = await auth_client.post("/api/v1/auth/login", json={"email": "big@niyyah.app", "password": "pw123456"})
+    auth_client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+    big = _document()
+    big["daily_checks"] = [{"non_negotiable_id": 10, "check_date": f"2024-{m:02d}-{d:02d}"} for m in range(1, 13) for d in range(1, 29)]
+    with count_queries() as large:
+        resp = await auth_client.post("/api/v1/import", json=big)
+    assert resp.json()["daily_checks"] == 336
+    assert len(large) == len(small)
+
+
+@pytest.mark.asyncio
+async def test_incomplete_checks_count_as_missed(auth_client: AsyncClient):
+    document = _document(days=5)
+    document["daily_checks"].append({"non_negotiable_id": 10, "check_date": "2025-01-06", "is_completed": False})
+    document["daily_checks"].append({"non_negotiable_id": 11, "check_date": "2025-01-04", "is_completed": False})
+    assert (await auth_client.post("/api/v1/import", json=document)).status_code == 201
+
+    habits = (await auth_client.get("/api/v1/tracker/non-negotiables")).json()
+    assert [h["streak"]["longest_streak"] for h in habits] == [5, 1]
+    assert habits[0]["streak"]["last_check_date"] == "2025-01-05"
+    january = {d["date"]: d for d in (await auth_client.get("/api/v1/calendar/2025/1")).json()}
+    assert "2025-01-06" not in january and "2025-01-04" in january
+    assert january["2025-01-04"]["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_import_still_invalidates_caches(auth_client: AsyncClient, monkeypatch):
+    from app.services import imports
+
+    etag = (await auth_client.get("/api/v1/personas")).headers["etag"]
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    # Personas are committed before the habits stage fails
+    monkeypatch.setattr(imports.calendar, "rebuild_days", broken)
+    with pytest.raises(RuntimeError):
+        await auth_client.post("/api/v1/import", json=_document())
+    resp = await auth_client.get("/api/v1/personas", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert [p["name"] for p in resp.json()] == ["Hafiz", "Mujahid"]
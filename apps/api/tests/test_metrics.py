@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import metrics
+
+
+def test_fingerprint_groups_repeats():
+    a = metrics.fingerprint("SELECT * FROM t WHERE id = ? AND name = 'x'  AND n IN (?, ?, ?)")
+    b = metrics.fingerprint("SELECT *\n FROM t WHERE id = 42 AND name = 'it''s' AND n IN ($1, $2)")
+    assert a == b == "SELECT * FROM t WHERE id = ? AND name = ? AND n IN (?, ...)"
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    metrics.REGISTRY.remove(hist)
+    hist.observe(0.05, "/a")
+    hist.observe(0.1, "/a")
+    hist.observe(3, "/a")
+    lines = hist.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_requests_recorded_by_route_template(auth_client: AsyncClient):
+    nn = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()
+    await auth_client.patch(f"/api/v1/tracker/non-negotiables/{nn['id']}", json={"title": "Fajr in jamaah"})
+    before = sum(metrics.REQUEST_STATEMENTS.series.get(("/api/v1/tracker/non-negotiables",), [[0], 0])[0])
+    await auth_client.get("/api/v1/tracker/non-negotiables")
+    after = sum(metrics.REQUEST_STATEMENTS.series[("/api/v1/tracker/non-negotiables",)][0])
+    assert after == before + 1
+    assert metrics.REQUEST_STATEMENTS.series[("/api/v1/tracker/non-negotiables",)][1] > 0
+
+    body = (await auth_client.get("/metrics")).text
+    assert 'http_requests_total{method="PATCH",route="/api/v1/tracker/non-negotiables/{nn_id}",status="200"}' in body
+    assert "db_time_per_request_seconds_bucket" in body
+    assert 'http_requests_in_progress{method="GET"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_slow_request_log(auth_client: AsyncClient, monkeypatch, caplog):
+    monkeypatch.setattr(metrics.settings, "slow_request_ms", 0)
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        await auth_client.get("/api/v1/principles")
+    assert "slow request GET /api/v1/principles -> 200" in caplog.text
+    assert "FROM principles" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_skew_later_timings(tmp_path):
+    import asyncio
+
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/timing.db")
+    stats = metrics.SqlStats()
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing"))
+            await asyncio.sleep(0.2)
+            token = metrics._sql_stats.set(stats)
+            try:
+                await conn.execute(text("SELECT 1"))
+            finally:
+                metrics._sql_stats.reset(token)
+            assert "query_started" not in conn.sync_connection.info
+    finally:
+        await engine.dispose()
+    assert stats.statements == 1 and stats.seconds < 0.1
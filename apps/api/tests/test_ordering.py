@@ -0,0 +1,135 @@
+import random
+
+import pytest
+from httpx import AsyncClient
+from hypothesis import given, strategies as st
+from sqlalchemy import func, insert, select, update
+
+from app.models.tracker import NonNegotiable
+from app.models.user import User
+from app.services import ordering
+from app.services.ordering import key_after, key_between, spread_keys
+from tests.conftest import TestSession
+
+keys = st.text(alphabet="0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", min_size=1, max_size=6).filter(
+    lambda k: not k.endswith("0")
+)
+
+
+@given(keys, keys)
+def test_key_between_sorts_strictly_inside(a, b):
+    if a == b:
+        return
+    lo, hi = min(a, b), max(a, b)
+    key = key_between(lo, hi)
+    assert lo < key < hi
+    assert not key.endswith("0")
+
+
+@given(keys)
+def test_key_between_open_ends(a):
+    assert key_between(None, a) < a < key_between(a, None)
+
+
+def test_repeated_inserts_stay_short():
+    lo, hi = key_between(None, None), None
+    for _ in range(50):
+        hi = key_between(lo, hi)
+    assert len(hi) <= 10
+
+    last = None
+    for _ in range(1000):
+        last = key_between(last, None)
+    assert len(last) <= 200
+
+
+@given(st.one_of(st.none(), keys))
+def test_key_after(a):
+    key = key_after(a)
+    assert a is None or key > a
+    assert not key.endswith("0") and len(key) <= len(a or "") + 1
+
+
+def test_spread_keys():
+    for n in (1, 2, 61, 62, 500):
+        ranks = spread_keys(n)
+        assert ranks == sorted(ranks) and len(set(ranks)) == n
+
+
+async def _titles(client: AsyncClient) -> list[str]:
+    return [nn["title"] for nn in (await client.get("/api/v1/tracker/non-negotiables")).json()]
+
+
+async def _habits(client: AsyncClient, *titles: str) -> list[int]:
+    ids = []
+    for title in titles:
+        ids.append((await client.post("/api/v1/tracker/non-negotiables", json={"title": title})).json()["id"])
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_move_writes_between_neighbours(auth_client: AsyncClient):
+    fajr, quran, adhkar = await _habits(auth_client, "Fajr", "Quran", "Adhkar")
+
+    resp = await auth_client.post(f"/api/v1/tracker/non-negotiables/{adhkar}/move", json={"after_id": fajr})
+    assert resp.status_code == 200
+    assert await _titles(auth_client) == ["Fajr", "Adhkar", "Quran"]
+
+    await auth_client.post(f"/api/v1/tracker/non-negotiables/{quran}/move", json={"after_id": None})
+    assert await _titles(auth_client) == ["Quran", "Fajr", "Adhkar"]
+
+
+@pytest.mark.asyncio
+async def test_move_validation(auth_client: AsyncClient):
+    (fajr,) = await _habits(auth_client, "Fajr")
+    resp = await auth_client.post(f"/api/v1/tracker/non-negotiables/{fajr}/move", json={"after_id": fajr})
+    assert resp.status_code == 400
+    resp = await auth_client.post(f"/api/v1/tracker/non-negotiables/{fajr}/move", json={"after_id": 9999})
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reorder_personas_single_update(auth_client: AsyncClient):
+    ids = []
+    for name in ("Scholar", "Athlete", "Father"):
+        resp = await auth_client.post("/api/v1/personas", json={"name": name, "domain": "Life"})
+        ids.append(resp.json()["id"])
+
+    resp = await auth_client.post("/api/v1/personas/reorder", json={"ids": [ids[2], ids[0], ids[1]]})
+    assert resp.status_code == 204
+    personas = (await auth_client.get("/api/v1/personas")).json()
+    assert [p["name"] for p in personas] == ["Father", "Scholar", "Athlete"]
+
+    created = await auth_client.post("/api/v1/principles", json={"name": "Sidq", "meaning": "Truthfulness"})
+    assert created.json()["rank"]
+
+
+@pytest.mark.asyncio
+async def test_reorder_bumps_sync_cursor(auth_client: AsyncClient):
+    a, b = await _habits(auth_client, "Fajr", "Quran")
+    cursor = (await auth_client.get("/api/v1/sync")).json()["cursor"]
+    await auth_client.post("/api/v1/tracker/non-negotiables/reorder", json={"ids": [b, a]})
+    delta = (await auth_client.get("/api/v1/sync", params={"since": cursor})).json()
+    assert [nn["title"] for nn in delta["non_negotiables"]] == ["Quran", "Fajr"]
+
+
+@pytest.mark.asyncio
+async def test_keys_fit_the_column_after_thousands_of_appends_and_moves():
+    rng = random.Random(0)
+    async with TestSession() as db:
+        user_id = (await db.execute(insert(User).values(email="ranks@niyyah.app", password_hash="-").returning(User.id))).scalar_one()
+        ids = []
+        for i in range(2000):
+            rank = await ordering.append_rank(db, NonNegotiable, user_id)
+            ids.append(await db.scalar(insert(NonNegotiable).values(user_id=user_id, title=f"Habit {i}", rank=rank).returning(NonNegotiable.id)))
+            # keep moving rows into the gap after the first habit
+            moved = rng.choice(ids[1:] or ids)
+            if moved != ids[0]:
+                rank = await ordering.move_rank(db, NonNegotiable, user_id, ids[0])
+                await db.execute(update(NonNegotiable).where(NonNegotiable.id == moved).values(rank=rank))
+        ranks = list((await db.execute(select(NonNegotiable.rank).where(NonNegotiable.user_id == user_id))).scalars())
+        assert len(set(ranks)) == len(ranks) == 2000
+        assert max(map(len, ranks)) <= 64
+        first = await db.scalar(select(NonNegotiable.id).order_by(NonNegotiable.rank).limit(1))
+        assert first == ids[0]
+        assert await db.scalar(select(func.max(func.length(NonNegotiable.rank)))) <= ordering.REBALANCE_LENGTH
@@ -1,5 +1,12 @@
 import pytest
 from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models.persona import Persona
+from app.schemas.persona import PersonaResponse
+from tests.conftest import TestSession
 
 
 @pytest.mark.asyncio
@@ -58,3 +65,20 @@ async def test_add_milestone(auth_client: AsyncClient):
 async def test_persona_not_found(auth_client: AsyncClient):
     resp = await auth_client.get("/api/v1/personas/9999")
     assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_personas_body_matches_orm_serialization(auth_client: AsyncClient):
+    for name, arabic in (("Siddiq", "الصِّدِّيق"), ("Alim", "")):
+        p = (await auth_client.post("/api/v1/personas", json={"name": name, "arabic_name": arabic, "domain": "Practice", "points": ["Dhikr", "صبر"]})).json()
+        await auth_client.post(f"/api/v1/personas/{p['id']}/milestones", json={"goal": "Juz Amma", "target_date": "2026-03-01"})
+    await auth_client.post(f"/api/v1/personas/{p['id']}/milestones", json={"goal": "Tafsir"})
+
+    resp = await auth_client.get("/api/v1/personas")
+    async with TestSession() as db:
+        personas = (await db.execute(select(Persona).options(selectinload(Persona.milestones)).order_by(Persona.rank))).scalars().all()
+        adapter = TypeAdapter(list[PersonaResponse])
+        expected = adapter.dump_json(adapter.validate_python(personas, from_attributes=True))
+    assert resp.headers["content-type"] == "application/json"
+    assert "etag" in resp.headers
+    assert resp.content == expected
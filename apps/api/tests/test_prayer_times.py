@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.timezones import zone
+from app.services import prayer_times
+from app.services.prayer_times import METHODS, compute_year, local_times, year_times
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _assert_close(times: dict[str, datetime | None], expected: dict[str, str], tolerance: int = 2):
+    for name, hhmm in expected.items():
+        got = times[name].strftime("%H:%M")
+        assert abs(_minutes(got) - _minutes(hhmm)) <= tolerance, (name, got, hhmm)
+
+
+@pytest.mark.parametrize("lat,lng,method,day,tz,expected", [
+    (21.4225, 39.8262, "Makkah", date(2024, 6, 21), "Asia/Riyadh",
+     {"fajr": "04:11", "sunrise": "05:39", "dhuhr": "12:22", "asr": "15:41", "maghrib": "19:06", "isha": "20:36"}),
+    (40.7128, -74.0060, "ISNA", date(2024, 3, 1), "America/New_York",
+     {"fajr": "05:15", "sunrise": "06:30", "dhuhr": "12:09", "asr": "15:17", "maghrib": "17:49", "isha": "19:04"}),
+    (-33.8688, 151.2093, "MWL", date(2024, 1, 1), "Australia/Sydney",
+     {"fajr": "04:03", "sunrise": "05:47", "dhuhr": "12:58", "asr": "16:43", "maghrib": "20:09", "isha": "21:46"}),
+])
+def test_times_match_reference(lat, lng, method, day, tz, expected):
+    _assert_close(local_times(lat, lng, method, day, zone(tz)), expected)
+
+
+def test_year_has_every_day():
+    year = compute_year(21.4225, 39.8262, METHODS["Makkah"], 2024)
+    assert all(len(column) == 366 for column in year.columns.values())
+    for hours in (year.day(date(2024, 1, 1)), year.day(date(2024, 12, 31))):
+        assert hours["fajr"] < hours["sunrise"] < hours["dhuhr"] < hours["asr"] < hours["maghrib"] < hours["isha"]
+
+
+def test_high_latitude_uses_angle_based_night_portion():
+    times = local_times(51.5074, -0.1278, "MWL", date(2024, 6, 21), zone("Europe/London"))
+    # The sun never reaches 18 degrees below the horizon in a London June night.
+    assert times["fajr"] < times["sunrise"] < times["dhuhr"] < times["maghrib"] < times["isha"]
+
+    polar_day = local_times(69.65, 18.96, "MWL", date(2024, 6, 21), zone("Europe/Oslo"))
+    assert polar_day["sunrise"] is None and polar_day["fajr"] is None
+    assert polar_day["dhuhr"] is not None
+
+
+def test_years_are_shared_by_nearby_coordinates():
+    prayer_times._cached_year.cache_clear()
+    first = year_times(21.4225, 39.8262, "Makkah", 2025)
+    assert year_times(21.4171, 39.8311, "Makkah", 2025) is first
+    assert year_times(21.4225, 39.8262, "MWL", 2025) is not first
+    assert prayer_times._cached_year.cache_info().misses == 2
+
+
+@pytest.mark.asyncio
+async def test_prayer_times_need_location(auth_client: AsyncClient):
+    resp = await auth_client.get("/api/v1/prayer-times")
+    assert resp.status_code == 400
+
+    await auth_client.patch("/api/v1/settings", json={"latitude": 21.42, "longitude": 39.83, "prayer_calculation_method": "Nope"})
+    resp = await auth_client.get("/api/v1/prayer-times")
+    assert resp.status_code == 400
+    assert "Makkah" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_get_prayer_times_range(auth_client: AsyncClient):
+    await auth_client.patch("/api/v1/settings", json={"latitude": 21.4225, "longitude": 39.8262, "prayer_calculation_method": "Makkah"})
+    resp = await auth_client.get("/api/v1/prayer-times?from=2024-12-30&to=2025-01-02")
+    assert resp.status_code == 200
+    days = resp.json()
+    assert [d["date"] for d in days] == ["2024-12-30", "2024-12-31", "2025-01-01", "2025-01-02"]
+    assert all(d["fajr"] < d["dhuhr"] < d["isha"] for d in days)
+
+    resp = await auth_client.get("/api/v1/prayer-times?from=2024-01-01&to=2025-12-31")
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_regenerate_prayer_blocks(auth_client: AsyncClient):
+    await auth_client.patch("/api/v1/settings", json={"latitude": 21.4225, "longitude": 39.8262, "prayer_calculation_method": "Makkah"})
+    resp = await auth_client.post("/api/v1/prayer-times/blocks", json={})
+    assert resp.status_code == 404
+
+    persona = (await auth_client.post("/api/v1/personas", json={"name": "Siddiq", "domain": "Practice"})).json()
+    own = {"persona_id": persona["id"], "start_time": "09:00", "end_time": "12:00", "activity": "Deep work"}
+    await auth_client.post("/api/v1/schedule", json=own)
+    # The user's timezone is UTC, so times are Makkah's shifted by -3h.
+    resp = await auth_client.post("/api/v1/prayer-times/blocks", json={"for_date": "2024-06-21", "duration_minutes": 30})
+    assert resp.status_code == 200
+    blocks = resp.json()
+    assert [b["activity"] for b in blocks] == ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"]
+    assert all(b["is_prayer_block"] and b["persona_id"] == persona["id"] for b in blocks)
+    assert blocks[0]["start_time"] == "01:11" and blocks[0]["end_time"] == "01:41"
+
+    cursor = (await auth_client.get("/api/v1/sync")).json()["cursor"]
+    resp = await auth_client.post("/api/v1/prayer-times/blocks", json={"for_date": "2024-12-21"})
+    assert resp.status_code == 200
+    schedule = (await auth_client.get("/api/v1/schedule")).json()
+    assert len(schedule) == 6
+    assert sum(b["is_prayer_block"] for b in schedule) == 5
+    assert {b["id"] for b in schedule if b["is_prayer_block"]} == {b["id"] for b in resp.json()}
+
+    sync = (await auth_client.get(f"/api/v1/sync?since={cursor}")).json()
+    assert sorted(t["id"] for t in sync["deleted"] if t["entity"] == "schedule_blocks") == sorted(b["id"] for b in blocks)
+
+
+@pytest.mark.asyncio
+async def test_prayer_blocks_respect_free_tier(auth_client: AsyncClient):
+    await auth_client.patch("/api/v1/settings", json={"latitude": 21.4225, "longitude": 39.8262, "prayer_calculation_method": "Makkah"})
+    persona = (await auth_client.post("/api/v1/personas", json={"name": "Siddiq", "domain": "Practice"})).json()
+    for hour in range(6):
+        block = {"persona_id": persona["id"], "start_time": f"1{hour}:00", "end_time": f"1{hour}:30", "activity": "Work"}
+        await auth_client.post("/api/v1/schedule", json=block)
+    resp = await auth_client.post("/api/v1/prayer-times/blocks", json={})
+    assert resp.status_code == 403
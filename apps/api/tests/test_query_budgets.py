@@ -0,0 +1,173 @@
+"""SQL statement budgets for every endpoint.
+
+Each case runs against a user owning two of everything, so a per-row query
+(N+1) shows up as a budget overrun. Budgets are the current counts: raise
+one only together with the change that needs it.
+"""
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.auth import update_account
+from tests.conftest import TestSession
+
+TODAY = date.today()
+
+BUDGETS = [
+    ("POST", "/api/v1/auth/register", {"email": "new@niyyah.app", "password": "pw123456"}, 5),
+    ("POST", "/api/v1/auth/login", {"email": "test@niyyah.app", "password": "testpass123"}, 1),
+    ("POST", "/api/v1/auth/refresh", {"refresh_token": "{refresh_token}"}, 1),
+    ("POST", "/api/v1/auth/logout", {"refresh_token": "{refresh_token}"}, 0),
+    ("GET", "/api/v1/auth/me", None, 1),
+    ("GET", "/api/v1/personas", None, 2),
+    ("POST", "/api/v1/personas", {"name": "Mujahid", "domain": "Health"}, 6),
+    ("GET", "/api/v1/personas/{persona}", None, 2),
+    ("PATCH", "/api/v1/personas/{persona}", {"name": "Alim"}, 5),
+    ("DELETE", "/api/v1/personas/{other_persona}", None, 8),
+    ("POST", "/api/v1/personas/reorder", {"ids": ["{other_persona}", "{persona}"]}, 2),
+    ("POST", "/api/v1/personas/{persona}/move", {"after_id": "{other_persona}"}, 7),
+    ("POST", "/api/v1/personas/{persona}/milestones", {"goal": "Memorize Juz Amma"}, 5),
+    ("DELETE", "/api/v1/personas/{persona}/milestones/{milestone}", None, 5),
+    ("GET", "/api/v1/schedule", None, 1),
+    ("POST", "/api/v1/schedule", {"persona_id": "{persona}", "start_time": "21:00", "end_time": "22:00", "activity": "Isha"}, 6),
+    ("PATCH", "/api/v1/schedule/{block}", {"activity": "Fajr + Adhkar"}, 4),
+    ("DELETE", "/api/v1/schedule/{block}", None, 4),
+    ("POST", "/api/v1/schedule/reorder", {"ids": ["{other_block}", "{block}"]}, 2),
+    ("POST", "/api/v1/schedule/{block}/move", {"after_id": None}, 5),
+    ("GET", "/api/v1/principles", None, 1),
+    ("POST", "/api/v1/principles", {"name": "Ihsan", "meaning": "Excellence"}, 4),
+    ("PATCH", "/api/v1/principles/{principle}", {"name": "Sidq"}, 4),
+    ("DELETE", "/api/v1/principles/{principle}", None, 4),
+    ("POST", "/api/v1/principles/reorder", {"ids": ["{other_principle}", "{principle}"]}, 2),
+    ("POST", "/api/v1/principles/{principle}/move", {"after_id": None}, 5),
+    ("GET", "/api/v1/tracker/non-negotiables", None, 2),
+    ("POST", "/api/v1/tracker/non-negotiables", {"title": "Tahajjud"}, 8),
+    ("PATCH", "/api/v1/tracker/non-negotiables/{habit}", {"title": "Fajr in jamaah"}, 5),
+    ("DELETE", "/api/v1/tracker/non-negotiables/{habit}", None, 14),
+    ("POST", "/api/v1/tracker/non-negotiables/reorder", {"ids": ["{other_habit}", "{habit}"]}, 2),
+    ("POST", "/api/v1/tracker/non-negotiables/{habit}/move", {"after_id": None}, 6),
+    ("POST", "/api/v1/tracker/check", {"non_negotiable_id": "{habit}"}, 13),
+    ("DELETE", "/api/v1/tracker/check/{check}", None, 12),
+    ("GET", "/api/v1/tracker/today", None, 2),
+    ("GET", f"/api/v1/tracker/range?from={TODAY}&to={TODAY}", None, 1),
+    ("GET", f"/api/v1/analytics/trend?period=month&from={TODAY.year - 1}-01-01", None, 2),
+    ("GET", f"/api/v1/analytics/trend?period=week&from={TODAY.year}-01-01&non_negotiable_id={{habit}}", None, 2),
+    ("GET", f"/api/v1/analytics/breakdown?from={TODAY.year - 1}-01-15", None, 3),
+    ("GET", "/api/v1/settings", None, 1),
+    ("PATCH", "/api/v1/settings", {"theme": "dark"}, 4),
+    ("GET", "/api/v1/dashboard", None, 4),
+    ("GET", f"/api/v1/calendar/{TODAY.year}/{TODAY.month}", None, 1),
+    ("GET", f"/api/v1/calendar/{TODAY.year}/{TODAY.month}/{TODAY.day}", None, 1),
+    ("GET", "/api/v1/sync", None, 7),
+    ("GET", "/api/v1/prayer-times", None, 1),
+    ("POST", "/api/v1/prayer-times/blocks", {}, 11),
+    ("GET", "/api/v1/export", None, 11),
+    ("GET", "/api/v1/export?format=csv", None, 11),
+    ("POST", "/api/v1/import", {"non_negotiables": [{"id": 1, "title": "Witr"}], "daily_checks": [{"non_negotiable_id": 1, "check_date": "2026-01-02"}]}, 18),
+    ("GET", "/health", None, 0),
+    ("GET", "/health/cache", None, 0),
+    ("GET", "/health/pool", None, 0),
+    ("GET", "/health/events", None, 0),
+    ("GET", "/metrics", None, 0),
+]
+
+
+@pytest_asyncio.fixture
+async def world(auth_client: AsyncClient) -> dict:
+    async def post(url: str, json: dict) -> dict:
+        return (await auth_client.post(url, json=json)).json()
+
+    ids: dict = {}
+    ids["persona"] = (await post("/api/v1/personas", {"name": "Siddiq", "domain": "Practice"}))["id"]
+    ids["other_persona"] = (await post("/api/v1/personas", {"name": "Mu'allim", "domain": "Teaching"}))["id"]
+    ids["milestone"] = (await post(f"/api/v1/personas/{ids['persona']}/milestones", {"goal": "Finish tafsir"}))["id"]
+    await post(f"/api/v1/personas/{ids['persona']}/milestones", {"goal": "Teach a halaqa"})
+    for key, start in (("block", "05:00"), ("other_block", "06:00")):
+        block = {"persona_id": ids["persona"], "start_time": start, "end_time": "07:00", "activity": "Fajr"}
+        ids[key] = (await post("/api/v1/schedule", block))["id"]
+    for key, name in (("principle", "Sabr"), ("other_principle", "Shukr")):
+        ids[key] = (await post("/api/v1/principles", {"name": name, "meaning": "..."}))["id"]
+    for key, title in (("habit", "Fajr"), ("other_habit", "Quran")):
+        ids[key] = (await post("/api/v1/tracker/non-negotiables", {"title": title}))["id"]
+        check = await post("/api/v1/tracker/check", {"non_negotiable_id": ids[key], "check_date": "2026-01-01"})
+    ids["check"] = check["id"]
+    await auth_client.patch("/api/v1/settings", json={"latitude": 21.42, "longitude": 39.83, "prayer_calculation_method": "Makkah"})
+    await post("/api/v1/tracker/check", {"non_negotiable_id": ids["other_habit"]})
+    login = await post("/api/v1/auth/login", {"email": "test@niyyah.app", "password": "testpass123"})
+    ids["refresh_token"] = login["refresh_token"]
+    return ids
+
+
+def _fill(value, ids: dict):
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}"):
+        return ids[value[1:-1]]
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [_fill(v, ids) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, ids) for k, v in value.items()}
+    return value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method,url,body,budget", BUDGETS, ids=[f"{m} {u}" for m, u, _, _ in BUDGETS])
+async def test_endpoint_query_budget(auth_client: AsyncClient, world: dict, query_budget, method, url, body, budget):
+    with query_budget(budget):
+        resp = await auth_client.request(method, _fill(url, world), json=_fill(body, world))
+    assert resp.status_code < 400, resp.text
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_do_not_scale_with_items(auth_client: AsyncClient, world: dict, query_budget):
+    items = [{"non_negotiable_id": world["habit"], "check_date": f"2026-02-{day:02d}"} for day in range(1, 29)]
+    with query_budget(20):
+        resp = await auth_client.post("/api/v1/tracker/checks:batch", json={"items": items})
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_report_query_budget(auth_client: AsyncClient, world: dict, query_budget):
+    # Reports are Pro-only; upgrading revokes the token, so log in again
+    async with TestSession() as db:
+        await update_account(db, await db.scalar(select(User).where(User.email == "test@niyyah.app")), subscription_tier="pro")
+    login = await auth_client.post("/api/v1/auth/login", json={"email": "test@niyyah.app", "password": "testpass123"})
+    auth_client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+    url = f"/api/v1/reports/{TODAY.year}/{TODAY.month}"
+    with query_budget(4):
+        resp = await auth_client.get(url)
+    assert resp.status_code == 200
+    with query_budget(0):
+        resp = await auth_client.get(url)
+    assert resp.headers["x-report-cache"] == "hit"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_runs_no_queries(auth_client: AsyncClient, world: dict, query_budget, monkeypatch):
+    # Streams are long-lived, so they must not hold a connection; cut this one short
+    monkeypatch.setattr(settings, "events_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(settings, "events_max_stream_seconds", 0.2)
+    with query_budget(0):
+        resp = await auth_client.get("/api/v1/events")
+    assert resp.status_code == 200
+    assert b"event: ready" in resp.content
+
+
+@pytest_asyncio.fixture
+async def etags(auth_client: AsyncClient, world: dict) -> dict:
+    urls = ("/api/v1/personas", "/api/v1/tracker/non-negotiables", "/api/v1/settings", "/api/v1/dashboard")
+    return {url: (await auth_client.get(url)).headers["etag"] for url in urls}
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(0)
+async def test_not_modified_skips_the_database(auth_client: AsyncClient, etags: dict):
+    for url, etag in etags.items():
+        resp = await auth_client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
@@ -0,0 +1,111 @@
+import pytest
+from httpx import AsyncClient
+
+from app.services import ratelimit
+from app.services.ratelimit import retry_after
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_window_seconds", 60)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_login_per_ip", 5)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_login_per_email", 3)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_register_per_ip", 2)
+    return ratelimit.settings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [6_000_000.0]
+    monkeypatch.setattr(ratelimit, "clock", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_login_limited_per_email_before_hashing(client: AsyncClient, limits, clock, monkeypatch):
+    from app.services import auth
+
+    await client.post("/api/v1/auth/register", json={"email": "stuffed@niyyah.app", "password": "pass"})
+    hashed = []
+    verify = auth.verify_password
+
+    async def counting_verify(password, password_hash):
+        hashed.append(password)
+        return await verify(password, password_hash)
+
+    monkeypatch.setattr(auth, "verify_password", counting_verify)
+    for _ in range(3):
+        resp = await client.post("/api/v1/auth/login", json={"email": "stuffed@niyyah.app", "password": "guess"})
+        assert resp.status_code == 401
+
+    resp = await client.post("/api/v1/auth/login", json={"email": "Stuffed@niyyah.app", "password": "guess"})
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0
+    assert len(hashed) == 3
+
+    other = await client.post("/api/v1/auth/login", json={"email": "other@niyyah.app", "password": "guess"})
+    assert other.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_limited_per_ip(client: AsyncClient, limits, clock):
+    for n in range(5):
+        resp = await client.post("/api/v1/auth/login", json={"email": f"spray{n}@niyyah.app", "password": "guess"})
+        assert resp.status_code == 401
+    resp = await client.post("/api/v1/auth/login", json={"email": "spray9@niyyah.app", "password": "guess"})
+    assert resp.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_register_limited_per_ip(client: AsyncClient, limits, clock):
+    for n in range(2):
+        resp = await client.post("/api/v1/auth/register", json={"email": f"bot{n}@niyyah.app", "password": "pass"})
+        assert resp.status_code == 201
+    resp = await client.post("/api/v1/auth/register", json={"email": "bot2@niyyah.app", "password": "pass"})
+    assert resp.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_window_slides(client: AsyncClient, limits, clock):
+    body = {"email": "slide@niyyah.app", "password": "guess"}
+    clock[0] = 6_000_000.0 + 30
+    for _ in range(3):
+        await client.post("/api/v1/auth/login", json=body)
+    blocked = await client.post("/api/v1/auth/login", json=body)
+    assert blocked.status_code == 429
+    # Three hits in the current window: full until well into the next one.
+    assert blocked.headers["Retry-After"] == "50"
+
+    clock[0] += 49
+    assert (await client.post("/api/v1/auth/login", json=body)).status_code == 429
+    clock[0] += 1
+    assert (await client.post("/api/v1/auth/login", json=body)).status_code == 401
+    assert (await client.post("/api/v1/auth/login", json=body)).status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_disabled(client: AsyncClient, limits, clock, monkeypatch):
+    monkeypatch.setattr(limits, "rate_limit_enabled", False)
+    for _ in range(4):
+        resp = await client.post("/api/v1/auth/login", json={"email": "free@niyyah.app", "password": "guess"})
+        assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_fails_open_without_redis(client: AsyncClient, limits, clock, monkeypatch):
+    from redis.exceptions import ConnectionError
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(ratelimit.MemorySlidingWindowLimiter, "hit", unavailable)
+    for _ in range(4):
+        resp = await client.post("/api/v1/auth/login", json={"email": "open@niyyah.app", "password": "guess"})
+        assert resp.status_code == 401
+
+
+def test_retry_after():
+    # The previous window's 10 hits must decay to 7 (70% overlap, 18s in) to fit one more.
+    assert retry_after(limit=10, window=60, elapsed=15, current=2, previous=10) == 3
+    assert retry_after(limit=10, window=60, elapsed=15, current=10, previous=0) == 51
+    assert retry_after(limit=1, window=60, elapsed=59.5, current=1, previous=0) == 61
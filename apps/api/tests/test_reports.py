@@ -0,0 +1,177 @@
+import asyncio
+import re
+import struct
+import zlib
+from datetime import date, datetime, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.models.tracker import NonNegotiable
+from app.models.user import User
+from app.services import reports
+from app.services.report_render import DONE
+from tests.conftest import TestSession, count_queries
+
+URL = "/api/v1/reports/2025/3"
+
+
+@pytest_asyncio.fixture
+async def pro_client(client: AsyncClient) -> AsyncClient:
+    await client.post("/api/v1/auth/register", json={"email": "pro@niyyah.app", "password": "testpass123"})
+    async with TestSession() as db:
+        await db.execute(update(User).where(User.email == "pro@niyyah.app").values(subscription_tier="pro"))
+        await db.commit()
+    login = await client.post("/api/v1/auth/login", json={"email": "pro@niyyah.app", "password": "testpass123"})
+    client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+    return client
+
+
+@pytest_asyncio.fixture
+async def month(pro_client: AsyncClient) -> dict:
+    persona = (await pro_client.post("/api/v1/personas", json={"name": "Hafiz", "domain": "Quran", "color": "#0ea5e9"})).json()
+    await pro_client.post(f"/api/v1/personas/{persona['id']}/milestones", json={"goal": "Juz Amma", "target_date": "2025-03-20"})
+    await pro_client.post(f"/api/v1/personas/{persona['id']}/milestones", json={"goal": "Next year", "target_date": "2026-03-20"})
+    habits = {}
+    for title in ("Quran", "Tahajjud"):
+        habits[title] = (await pro_client.post("/api/v1/tracker/non-negotiables", json={"title": title})).json()["id"]
+    async with TestSession() as db:
+        await db.execute(update(NonNegotiable).values(created_at=datetime(2025, 3, 5, tzinfo=timezone.utc)))
+        await db.commit()
+    items = [{"non_negotiable_id": habits["Quran"], "check_date": f"2025-03-{day:02d}"} for day in range(5, 15)]
+    items.append({"non_negotiable_id": habits["Tahajjud"], "check_date": "2025-03-31"})
+    await pro_client.post("/api/v1/tracker/checks:batch", json={"items": items})
+    habits["user_id"] = (await pro_client.get("/api/v1/auth/me")).json()["id"]
+    return habits
+
+
+def _pdf_text(pdf: bytes) -> str:
+    streams = re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    return "".join(zlib.decompress(s).decode("latin-1") for s in streams)
+
+
+@pytest.mark.asyncio
+async def test_free_tier_is_refused(auth_client: AsyncClient):
+    resp = await auth_client.get(URL)
+    assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_future_months(pro_client: AsyncClient):
+    assert (await pro_client.get("/api/v1/reports/2025/13")).status_code == 404
+    assert (await pro_client.get(f"/api/v1/reports/{date.today().year + 1}/1")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_load_report_is_month_scoped(month):
+    async with TestSession() as db:
+        with count_queries() as statements:
+            report = await reports.load_report(db, month["user_id"], 2025, 3, date(2026, 1, 1))
+    assert len(statements) == 4
+    quran, tahajjud = report.habits
+    assert quran.days == " " * 4 + "x" * 10 + "." * 17
+    assert (quran.completed, quran.possible, quran.best_run) == (10, 27, 10)
+    assert (tahajjud.completed, tahajjud.best_run) == (1, 1)
+    assert report.closed and report.pct == 20
+    assert [m.goal for m in report.personas[0].milestones] == ["Juz Amma"]
+
+    async with TestSession() as db:
+        in_progress = await reports.load_report(db, month["user_id"], 2025, 3, date(2025, 3, 10))
+    assert not in_progress.closed and in_progress.habits[0].days.endswith("x" * 6 + " " * 21)
+
+
+@pytest.mark.asyncio
+async def test_pdf_report(pro_client: AsyncClient, month):
+    resp = await pro_client.get(URL)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.headers["content-disposition"] == 'attachment; filename="niyyah-report-2025-03.pdf"'
+    pdf = resp.content
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref")
+    text = _pdf_text(pdf)
+    for expected in ("(Progress report: March 2025)", "(Overall completion: 20% \\(11 of 54 habit-days\\))",
+                     "(Quran)", "(10/27  10d)", "(Hafiz - Quran)", "([  ] Juz Amma \\(due 2025-03-20\\))"):
+        assert expected in text, expected
+
+
+@pytest.mark.asyncio
+async def test_png_report(pro_client: AsyncClient, month):
+    resp = await pro_client.get(URL, params={"format": "png"})
+    assert resp.headers["content-type"] == "image/png"
+    png = resp.content
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    idat = png[png.index(b"IDAT") + 4:png.index(b"IEND") - 8]
+    raw = zlib.decompress(idat)
+    assert len(raw) == height * (1 + width * 3)
+
+    def pixel(x: int, y: int) -> tuple:
+        start = y * (1 + width * 3) + 1 + x * 3
+        return tuple(raw[start:start + 3])
+
+    # First habit row, 5 March (first checked day): centre of its cell
+    assert pixel(16 + 200 + 4 * 16 + 7, 100 + 9) == DONE
+
+
+@pytest.mark.asyncio
+async def test_closed_month_is_served_from_cache(pro_client: AsyncClient, month, monkeypatch):
+    renders = []
+    render = reports._render
+
+    async def counting(report, fmt):
+        renders.append(fmt)
+        return await render(report, fmt)
+
+    monkeypatch.setattr(reports, "_render", counting)
+    first = await pro_client.get(URL)
+    assert first.headers["x-report-cache"] == "miss"
+
+    # Activity in another month leaves March's data, and so its artifact, untouched
+    await pro_client.post("/api/v1/tracker/check", json={"non_negotiable_id": month["Quran"]})
+    again = await pro_client.get(URL)
+    assert again.headers["x-report-cache"] == "hit"
+    assert again.content == first.content and again.headers["etag"] == first.headers["etag"]
+    assert renders == ["pdf"]
+
+    # A check backfilled into March is a new version of the report
+    await pro_client.post("/api/v1/tracker/check", json={"non_negotiable_id": month["Tahajjud"], "check_date": "2025-03-30"})
+    backfilled = await pro_client.get(URL)
+    assert backfilled.headers["x-report-cache"] == "miss"
+    assert backfilled.headers["etag"] != first.headers["etag"]
+    assert renders == ["pdf", "pdf"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_data_is_served_without_queries(pro_client: AsyncClient, month):
+    first = await pro_client.get(URL)
+    with count_queries() as statements:
+        again = await pro_client.get(URL)
+    assert statements == []
+    assert again.headers["x-report-cache"] == "hit"
+    assert again.content == first.content and again.headers["etag"] == first.headers["etag"]
+
+    # Any write to habits or personas sends the next request back through the queries
+    await pro_client.patch(f"/api/v1/tracker/non-negotiables/{month['Quran']}", json={"title": "Quran recitation"})
+    with count_queries() as statements:
+        renamed = await pro_client.get(URL)
+    assert len(statements) == 4
+    assert renamed.headers["etag"] != first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_render(pro_client: AsyncClient, month, monkeypatch):
+    renders = []
+
+    async def slow(report, fmt):
+        renders.append(fmt)
+        await asyncio.sleep(0.05)
+        return b"%PDF-1.4 stub"
+
+    monkeypatch.setattr(reports, "_render", slow)
+    responses = await asyncio.gather(*(pro_client.get(URL) for _ in range(3)))
+    assert [r.content for r in responses] == [b"%PDF-1.4 stub"] * 3
+    assert renders == ["pdf"]
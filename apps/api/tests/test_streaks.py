@@ -0,0 +1,139 @@
+import bisect
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from hypothesis import given, settings, strategies as st
+
+from app.services.streaks import Run, build_runs, plan_delete, plan_insert
+
+ORIGIN = date(2026, 1, 1)
+
+
+class MemoryRunIndex:
+    """Applies the engine's planning functions to an in-memory run list."""
+
+    def __init__(self, grace: int):
+        self.grace = grace
+        self.days: list[date] = []
+        self.runs: list[Run] = []
+
+    def _touching(self, lo: date, hi: date) -> list[Run]:
+        return [r for r in self.runs if r.start <= hi and r.end >= lo]
+
+    def check(self, day: date):
+        if day in self.days:
+            return
+        bisect.insort(self.days, day)
+        reach = timedelta(days=self.grace + 1)
+        neighbors = self._touching(day - reach, day + reach)
+        merged = plan_insert(day, neighbors)
+        if merged is not None:
+            self.runs = sorted([r for r in self.runs if r not in neighbors] + [merged], key=lambda r: r.start)
+
+    def uncheck(self, day: date):
+        if day not in self.days:
+            return
+        self.days.remove(day)
+        (run,) = self._touching(day, day)
+        i = bisect.bisect_left(self.days, day)
+        prev = self.days[i - 1] if i > 0 and self.days[i - 1] >= run.start else None
+        nxt = self.days[i] if i < len(self.days) and self.days[i] <= run.end else None
+        replacement = plan_delete(day, run, prev, nxt, self.grace)
+        self.runs = sorted([r for r in self.runs if r != run] + replacement, key=lambda r: r.start)
+
+
+def brute_force(days: set[date], grace: int) -> tuple[int, int]:
+    """(current, longest) by walking every calendar day of the history."""
+    if not days:
+        return 0, 0
+    spans, start, gap = [], None, 0
+    day, last = min(days), max(days)
+    while day <= last:
+        if day in days:
+            if start is None:
+                start = day
+            gap, end = 0, day
+        else:
+            gap += 1
+            if gap > grace and start is not None:
+                spans.append((end - start).days + 1)
+                start = None
+        day += timedelta(days=1)
+    spans.append((end - start).days + 1)
+    return spans[-1], max(spans)
+
+
+ops = st.lists(st.tuples(st.booleans(), st.integers(min_value=0, max_value=60)), max_size=120)
+
+
+@settings(max_examples=300, deadline=None)
+@given(ops=ops, grace=st.integers(min_value=0, max_value=2))
+def test_incremental_index_matches_brute_force(ops, grace):
+    index = MemoryRunIndex(grace)
+    for is_check, offset in ops:
+        day = ORIGIN + timedelta(days=offset)
+        index.check(day) if is_check else index.uncheck(day)
+
+        assert index.runs == build_runs(index.days, grace)
+        current = index.runs[-1].length if index.runs else 0
+        longest = max((r.length for r in index.runs), default=0)
+        assert (current, longest) == brute_force(set(index.days), grace)
+
+
+async def _streak(client: AsyncClient, nn_id: int) -> dict:
+    resp = await client.get("/api/v1/tracker/non-negotiables")
+    return next(n for n in resp.json() if n["id"] == nn_id)["streak"]
+
+
+async def _check(client: AsyncClient, nn_id: int, day: date) -> int:
+    resp = await client.post("/api/v1/tracker/check", json={"non_negotiable_id": nn_id, "check_date": day.isoformat()})
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_backdated_check_bridges_runs(auth_client: AsyncClient):
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    today = date.today()
+    for offset in (4, 3, 1, 0):
+        await _check(auth_client, nn_id, today - timedelta(days=offset))
+    assert (await _streak(auth_client, nn_id))["current_streak"] == 2
+
+    await _check(auth_client, nn_id, today - timedelta(days=2))
+    streak = await _streak(auth_client, nn_id)
+    assert (streak["current_streak"], streak["longest_streak"]) == (5, 5)
+
+
+@pytest.mark.asyncio
+async def test_uncheck_splits_run(auth_client: AsyncClient):
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()["id"]
+    today = date.today()
+    ids = {offset: await _check(auth_client, nn_id, today - timedelta(days=offset)) for offset in range(5)}
+
+    await auth_client.delete(f"/api/v1/tracker/check/{ids[1]}")
+    streak = await _streak(auth_client, nn_id)
+    assert (streak["current_streak"], streak["longest_streak"]) == (1, 3)
+
+    await auth_client.delete(f"/api/v1/tracker/check/{ids[0]}")
+    streak = await _streak(auth_client, nn_id)
+    assert (streak["current_streak"], streak["longest_streak"], streak["last_check_date"]) == (3, 3, (today - timedelta(days=2)).isoformat())
+
+
+@pytest.mark.asyncio
+async def test_grace_day_setting(auth_client: AsyncClient):
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Adhkar"})).json()["id"]
+    today = date.today()
+    for offset in (4, 3, 1, 0):
+        await _check(auth_client, nn_id, today - timedelta(days=offset))
+    assert (await _streak(auth_client, nn_id))["current_streak"] == 2
+
+    resp = await auth_client.patch("/api/v1/settings", json={"streak_grace_days": 1})
+    assert resp.json()["streak_grace_days"] == 1
+    assert (await _streak(auth_client, nn_id))["current_streak"] == 5
+
+    later = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Walk"})).json()["id"]
+    for offset in (2, 0):
+        await _check(auth_client, later, today - timedelta(days=offset))
+    assert (await _streak(auth_client, later))["current_streak"] == 3
+
+    assert (await auth_client.patch("/api/v1/settings", json={"streak_grace_days": 5})).status_code == 422
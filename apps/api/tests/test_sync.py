@@ -0,0 +1,95 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def _sync(client: AsyncClient, cursor: str | None = None) -> dict:
+    resp = await client.get("/api/v1/sync", params={"since": cursor} if cursor else None)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_full_sync_then_empty_delta(auth_client: AsyncClient):
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})
+    await auth_client.post("/api/v1/principles", json={"name": "Sidq", "meaning": "Truthfulness"})
+
+    full = await _sync(auth_client)
+    assert full["full"] is True
+    assert [nn["title"] for nn in full["non_negotiables"]] == ["Fajr"]
+    assert [p["name"] for p in full["principles"]] == ["Sidq"]
+
+    delta = await _sync(auth_client, full["cursor"])
+    assert delta["full"] is False
+    assert delta["cursor"] == full["cursor"]
+    assert delta["non_negotiables"] == [] and delta["principles"] == [] and delta["deleted"] == []
+
+
+@pytest.mark.asyncio
+async def test_delta_returns_only_changed_rows(auth_client: AsyncClient):
+    fajr = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})
+    cursor = (await _sync(auth_client))["cursor"]
+
+    await auth_client.patch(f"/api/v1/tracker/non-negotiables/{fajr['id']}", json={"title": "Fajr in jamaah"})
+    await auth_client.patch("/api/v1/settings", json={"theme": "dark"})
+
+    delta = await _sync(auth_client, cursor)
+    assert [nn["title"] for nn in delta["non_negotiables"]] == ["Fajr in jamaah"]
+    assert delta["settings"]["theme"] == "dark"
+    assert int(delta["cursor"]) > int(cursor)
+
+
+@pytest.mark.asyncio
+async def test_deletes_leave_tombstones(auth_client: AsyncClient):
+    persona = (await auth_client.post("/api/v1/personas", json={"name": "Scholar", "domain": "Knowledge"})).json()
+    milestone = (await auth_client.post(f"/api/v1/personas/{persona['id']}/milestones", json={"goal": "Read tafsir"})).json()
+    cursor = (await _sync(auth_client))["cursor"]
+
+    await auth_client.delete(f"/api/v1/personas/{persona['id']}")
+
+    delta = await _sync(auth_client, cursor)
+    assert delta["personas"] == []
+    assert {(t["entity"], t["id"]) for t in delta["deleted"]} == {
+        ("personas", persona["id"]),
+        ("milestones", milestone["id"]),
+    }
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(auth_client: AsyncClient):
+    resp = await auth_client.get("/api/v1/sync", params={"since": "abc"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_older_than_pruned_tombstones_gets_full_sync(auth_client: AsyncClient):
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import select, update
+
+    from tests.conftest import TestSession
+    from app.models.sync import SyncTombstone
+    from app.scripts.prune_sync_tombstones import prune
+
+    old = (await auth_client.post("/api/v1/principles", json={"name": "Sabr", "meaning": "Patience"})).json()
+    recent = (await auth_client.post("/api/v1/principles", json={"name": "Shukr", "meaning": "Gratitude"})).json()
+    stale = (await _sync(auth_client))["cursor"]
+    await auth_client.delete(f"/api/v1/principles/{old['id']}")
+    between = (await _sync(auth_client, stale))["cursor"]
+    await auth_client.delete(f"/api/v1/principles/{recent['id']}")
+
+    now = datetime.now(timezone.utc)
+    async with TestSession() as db:
+        await db.execute(update(SyncTombstone).where(SyncTombstone.entity_id == old["id"]).values(deleted_at=now - timedelta(days=100)))
+        await db.commit()
+    assert await prune(TestSession, now - timedelta(days=90), batch_size=10) == {"users": 1, "tombstones": 1}
+    async with TestSession() as db:
+        assert (await db.scalars(select(SyncTombstone.entity_id))).all() == [recent["id"]]
+
+    # The cursor from before the pruned delete can no longer be brought up to date
+    resync = await _sync(auth_client, stale)
+    assert resync["full"] is True and resync["principles"] == []
+    delta = await _sync(auth_client, between)
+    assert delta["full"] is False
+    assert delta["deleted"] == [{"entity": "principles", "id": recent["id"]}]
+    assert await prune(TestSession, now - timedelta(days=90), batch_size=10) == {"users": 0, "tombstones": 0}
@@ -1,5 +1,13 @@
+from datetime import date
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.orm import selectinload
+
+from app.models.tracker import DailyCheck, NonNegotiable, Streak
+from app.schemas.tracker import TrackerDayResponse
+from tests.conftest import TestSession
 
 
 @pytest.mark.asyncio
@@ -38,6 +46,23 @@ async def test_today_endpoint(auth_client: AsyncClient):
     assert "non_negotiables" in resp.json()
 
 
+@pytest.mark.asyncio
+async def test_today_body_matches_orm_serialization(auth_client: AsyncClient):
+    ids = [(await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": t})).json()["id"] for t in ("Fajr", "قرآن", "Walk")]
+    await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": ids[1]})
+    async with TestSession() as db:
+        await db.execute(delete(Streak).where(Streak.non_negotiable_id == ids[2]))
+        await db.commit()
+
+    resp = await auth_client.get("/api/v1/tracker/today")
+    async with TestSession() as db:
+        nns = (await db.execute(select(NonNegotiable).options(selectinload(NonNegotiable.streak)).order_by(NonNegotiable.rank))).scalars().all()
+        checks = (await db.execute(select(DailyCheck))).scalars().all()
+        expected = TrackerDayResponse(date=date.today(), checks=checks, non_negotiables=nns).model_dump_json().encode()
+    assert resp.content == expected
+    assert resp.json()["non_negotiables"][2]["streak"] is None
+
+
 @pytest.mark.asyncio
 async def test_streak_increments(auth_client: AsyncClient):
     from datetime import date, timedelta
@@ -54,3 +79,132 @@ async def test_streak_increments(auth_client: AsyncClient):
     nns = resp.json()
     target = next(n for n in nns if n["id"] == nn_id)
     assert target["streak"]["current_streak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_range_bitset(auth_client: AsyncClient):
+    from datetime import date, timedelta
+
+    from app.services.bitset import decode_bitset
+
+    a = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    b = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()["id"]
+    end = date.today()
+    start = end - timedelta(days=9)
+    for offset in (0, 3, 9):
+        await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": a, "check_date": (start + timedelta(days=offset)).isoformat()})
+
+    resp = await auth_client.get("/api/v1/tracker/range", params={"from": start.isoformat(), "to": end.isoformat()})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["days"] == 10
+    assert data["ids"] == [a, b]
+    assert decode_bitset(data["data"][0], 10) == [0, 3, 9]
+    assert decode_bitset(data["data"][1], 10) == []
+
+
+@pytest.mark.asyncio
+async def test_range_single_habit_rle(auth_client: AsyncClient):
+    from datetime import date, timedelta
+
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Other"})
+    start = date.today() - timedelta(days=4)
+    for offset in (1, 2):
+        await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": nn_id, "check_date": (start + timedelta(days=offset)).isoformat()})
+
+    resp = await auth_client.get("/api/v1/tracker/range", params={
+        "from": start.isoformat(), "to": date.today().isoformat(), "non_negotiable_id": nn_id, "encoding": "rle",
+    })
+    assert resp.json()["ids"] == [nn_id]
+    assert resp.json()["data"] == [[1, 2, 2]]
+
+    missing = await auth_client.get("/api/v1/tracker/range", params={"from": start.isoformat(), "to": start.isoformat(), "non_negotiable_id": 9999})
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_range_rejects_oversized_window(auth_client: AsyncClient):
+    resp = await auth_client.get("/api/v1/tracker/range", params={"from": "2024-01-01", "to": "2025-12-31"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_checks(auth_client: AsyncClient):
+    from datetime import date, timedelta
+
+    a = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    b = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()["id"]
+    today = date.today()
+    days = [(today - timedelta(days=i)).isoformat() for i in range(3)]
+    existing = await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": b, "check_date": days[0]})
+
+    resp = await auth_client.post("/api/v1/tracker/checks:batch", json={"items": [
+        {"non_negotiable_id": a, "check_date": days[2]},
+        {"non_negotiable_id": a, "check_date": days[1]},
+        {"non_negotiable_id": a},
+        {"non_negotiable_id": b, "check_date": days[0]},
+        {"non_negotiable_id": b, "check_date": days[0], "op": "uncheck"},
+        {"non_negotiable_id": b, "check_date": days[1], "op": "uncheck"},
+        {"non_negotiable_id": 9999},
+    ]})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["status"] for r in results] == [
+        "created", "created", "created", "already_checked", "deleted", "not_checked", "not_found",
+    ]
+    assert all(r["check_id"] for r in results[:3])
+    assert results[4]["check_id"] == existing.json()["id"]
+
+    nns = (await auth_client.get("/api/v1/tracker/non-negotiables")).json()
+    streaks = {n["id"]: n["streak"] for n in nns}
+    assert streaks[a]["current_streak"] == 3
+    assert streaks[b]["current_streak"] == 0
+
+    month = (await auth_client.get(f"/api/v1/calendar/{today.year}/{today.month}")).json()
+    today_row = next(d for d in month if d["date"] == days[0])
+    assert (today_row["total"], today_row["completed"]) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_batch_check_then_uncheck_is_noop(auth_client: AsyncClient):
+    nn_id = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Adhkar"})).json()["id"]
+    resp = await auth_client.post("/api/v1/tracker/checks:batch", json={"items": [
+        {"non_negotiable_id": nn_id},
+        {"non_negotiable_id": nn_id, "op": "uncheck"},
+    ]})
+    assert [(r["status"], r["check_id"]) for r in resp.json()["results"]] == [("not_checked", None), ("not_checked", None)]
+    today = await auth_client.get("/api/v1/tracker/today")
+    assert today.json()["checks"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_net_effect_and_events_only_writes(auth_client: AsyncClient, monkeypatch):
+    from datetime import date
+
+    from app.services import events
+
+    fajr = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Fajr"})).json()["id"]
+    quran = (await auth_client.post("/api/v1/tracker/non-negotiables", json={"title": "Quran"})).json()["id"]
+    existing = (await auth_client.post("/api/v1/tracker/check", json={"non_negotiable_id": quran})).json()["id"]
+    published = []
+
+    async def capture(user_id, event, data):
+        published.append((event, data))
+
+    monkeypatch.setattr(events, "publish", capture)
+    resp = await auth_client.post("/api/v1/tracker/checks:batch", json={"items": [
+        {"non_negotiable_id": fajr},
+        {"non_negotiable_id": fajr, "op": "uncheck"},
+        {"non_negotiable_id": quran, "op": "uncheck"},
+        {"non_negotiable_id": quran},
+        {"non_negotiable_id": fajr, "check_date": "2026-01-01", "op": "uncheck"},
+        {"non_negotiable_id": fajr, "check_date": "2026-01-01"},
+    ]})
+    results = resp.json()["results"]
+    assert [r["status"] for r in results] == ["not_checked", "not_checked", "already_checked", "already_checked", "not_checked", "created"]
+    assert results[2]["check_id"] == results[3]["check_id"] == existing
+    assert results[5]["check_id"]
+    assert published == [("checks", {
+        "items": [{"non_negotiable_id": fajr, "check_date": date(2026, 1, 1), "op": "check"}], "resources": ["non_negotiables"],
+    })]
@@ -7,7 +7,7 @@ import { useCurrentBlock } from "@/hooks/use-current-block";
 import { Plus, Trash2 } from "lucide-react";
 
 interface Persona { id: number; name: string; color: string }
-interface Block { id: number; persona_id: number; start_time: string; end_time: string; activity: string; day_type: string; is_prayer_block: boolean; order: number }
+interface Block { id: number; persona_id: number; start_time: string; end_time: string; activity: string; day_type: string; is_prayer_block: boolean; rank: string }
 
 export default function SchedulePage() {
   const [blocks, setBlocks] = useState<Block[]>([]);